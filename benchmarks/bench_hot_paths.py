@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the conductor and prompt-building hot paths.
+
+Each case is timed in alternating rounds with a fixed calibration loop, and
+scored as the median over the rounds of its cost relative to the calibration.
+That ratio is what baselines/hot_paths.json tracks: absolute microseconds move
+with the machine, its load and CPU frequency, while the ratio mostly moves when
+the code does. Exits non-zero if any case's ratio exceeds its baseline by more
+than the threshold. Runs offline: the Slack app is built
+without a token check and the LLM provider is the stub.
+
+Conductor log lines are disabled while timing (their handlers would dominate),
+so the numbers are the cost of the code itself.
+
+Usage:
+    python benchmarks/bench_hot_paths.py
+    python benchmarks/bench_hot_paths.py --only count_active_threads --threshold 0.5
+    python benchmarks/bench_hot_paths.py --update     # record new baselines after a deliberate change
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+os.environ['SLACK_OFFLINE'] = '1'
+os.environ['LLM_PROVIDER'] = 'stub'
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from slack_io import conductor, autonomous_loop
+from slack_io.agent_engine import persona_system_prompt, build_user_prompt, format_ctx_for_prompt
+from slack_io.persona_registry import PERSONAS, CHANNEL_POLICY, CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
+
+BASELINES_PATH = Path(__file__).resolve().parent / 'baselines' / 'hot_paths.json'
+THREAD_STATE_SIZE = 10_000
+BENCH_CHANNEL = ('CBENCH', 'bench-backend')
+
+
+def _setup():
+    """Deterministic state: a channel that always passes p_reply, cooldowns, a large THREAD_STATE."""
+    random.seed(0)
+    cid, name = BENCH_CHANNEL
+    CHANNEL_POLICY[name] = dict(CHANNEL_POLICY['eng-backend'], p_reply=1.0)
+    CHANNEL_ID_TO_NAME[cid] = name
+    CHANNEL_NAME_TO_ID[name] = cid
+    conductor.LAST_PROACTIVE_CHECK = float('inf')  # never fires proactive posts
+    now = time.time()
+    for i, persona in enumerate(PERSONAS):
+        conductor.PERSONA_COOLDOWN[persona] = now + (3600 if i % 3 == 0 else -3600)
+
+
+def _thread_state(size):
+    now = time.time()
+    return {
+        f'{now - i:.6f}': {'turns': i % 8, 'last_persona': 'Mike_BE', 'last_ts': now - (i % 120)}
+        for i in range(size)
+    }
+
+
+def _event(text, **extra):
+    return dict({'type': 'message', 'channel': BENCH_CHANNEL[0], 'ts': f'{time.time():.6f}',
+                 'user': 'U0BENCH01', 'text': text}, **extra)
+
+
+def _messages(n):
+    texts = [
+        'Anyone seeing the latency spike on the payments API?',
+        'Rolling back fixed it for me, but the root cause is still unclear.\nWill dig in after lunch.',
+        'Could this be related to the config change yesterday? ' * 5,
+    ]
+    return [{'user': f'U{i:08d}', 'text': texts[i % len(texts)], 'ts': f'{1760000000 + i}.000100'} for i in range(n)]
+
+
+def _history(n):
+    channels = list(CHANNEL_POLICY)
+    return [{'channel': channels[i % len(channels)], 'user': 'Mike_BE', 'text': _messages(1)[0]['text']}
+            for i in range(n)]
+
+
+def cases():
+    """name -> (setup, fn); setup runs once before timing, fn is the timed call."""
+    ctx = format_ctx_for_prompt(_messages(8))
+    ack, bot = _event('thanks'), _event('Build #4812 passed', subtype='bot_message', user='B0BENCH01', username='ci-bot')
+    question = _event('Why is the deploy blocked? Anyone seeing failing tests?')
+    big_state, history, msgs = _thread_state(THREAD_STATE_SIZE), _history(100), _messages(8)
+    persona_cfgs = list(PERSONAS.items())
+
+    def with_state(state):
+        def _set():
+            conductor.THREAD_STATE.clear()
+            conductor.THREAD_STATE.update(state)
+        return _set
+
+    return {
+        # maybe_handle_event paths that return before scheduling any reply
+        'maybe_handle_event.unknown_bot': (with_state({}), lambda: conductor.maybe_handle_event(bot)),
+        'maybe_handle_event.reply_gate': (with_state({}), lambda: conductor.maybe_handle_event(ack)),
+        'maybe_handle_event.active_threads': (with_state(big_state), lambda: conductor.maybe_handle_event(question)),
+        'eligible_personas': (with_state({}), lambda: conductor._eligible_personas(BENCH_CHANNEL[1], ['Mike_BE'])),
+        'count_active_threads': (with_state(big_state), lambda: conductor._count_active_threads(BENCH_CHANNEL[0])),
+        'persona_system_prompt': (None, lambda: [persona_system_prompt(n, c) for n, c in persona_cfgs]),
+        'build_user_prompt': (None, lambda: build_user_prompt('eng-backend', question['text'], ctx, True)),
+        'format_ctx_for_prompt': (None, lambda: format_ctx_for_prompt(msgs)),
+        'format_history_for_prompt': (None, lambda: autonomous_loop._format_history_for_prompt(history, 'sre-ops')),
+    }
+
+
+_CALIBRATION_DATA = {f'U{i:08d}': {'turns': i % 8, 'text': f'message {i}'} for i in range(64)}
+
+
+def calibration():
+    """Fixed work of the same flavour as the cases: dict scans, comparisons, string formatting."""
+    return sum(len(f"{k}: {v['text']}") for k, v in _CALIBRATION_DATA.items() if v['turns'] < 6)
+
+
+def _loops(fn, min_time):
+    """Iterations of fn that take about min_time seconds."""
+    loops, elapsed = 1, 0.0
+    while elapsed < min_time / 10:
+        loops *= 2
+        elapsed = _batch(fn, loops) * loops
+    return max(1, int(loops * min_time / elapsed))
+
+
+def _batch(fn, loops):
+    """Mean seconds per call over `loops` calls."""
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - t0) / loops
+
+
+def measure(fn, rounds, min_time):
+    """(us per call, cost relative to the calibration loop), medians over alternating rounds of both."""
+    fn_loops, calib_loops = _loops(fn, min_time), _loops(calibration, min_time)
+    times, ratios = [], []
+    for _ in range(rounds):
+        calib = _batch(calibration, calib_loops)
+        t = _batch(fn, fn_loops)
+        times.append(t)
+        ratios.append(t / calib)
+    return statistics.median(times) * 1e6, statistics.median(ratios)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark conductor and prompt-building hot paths')
+    parser.add_argument('--rounds', type=int, default=15,
+                        help='Alternating calibration/case rounds per case; the median counts (default: 15)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='Seconds per round and loop (default: 0.05)')
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help='Allowed relative slowdown vs baseline before failing (default: 0.3 = 30%%)')
+    parser.add_argument('--only', help='Run cases whose name contains this')
+    parser.add_argument('--update', action='store_true', help='Write the results as the new baselines')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    _setup()
+    baselines = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    results, regressions = {}, []
+    print(f"{'case':<36}{'us/call':>10}{'x calib':>10}{'baseline':>10}{'change':>9}")
+    for name, (setup, fn) in cases().items():
+        if args.only and args.only not in name:
+            continue
+        if setup:
+            setup()
+        us, ratio = measure(fn, args.rounds, args.min_time)
+        results[name] = round(ratio, 3)
+        base = baselines.get(name)
+        change = f'{(ratio / base - 1) * 100:+8.1f}%' if base else f"{'new':>9}"
+        print(f'{name:<36}{us:>10.2f}{ratio:>10.2f}{base if base else 0:>10.2f}{change}')
+        if base and ratio > base * (1 + args.threshold):
+            regressions.append(name)
+
+    if args.update:
+        BASELINES_PATH.parent.mkdir(exist_ok=True)
+        BASELINES_PATH.write_text(json.dumps(dict(baselines, **results), indent=2, sort_keys=True) + '\n')
+        print(f'\nWrote {len(results)} baselines to {BASELINES_PATH}')
+        return 0
+    if regressions:
+        print(f"\nSlower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Compare HTML parsing backends of the docs scraper on the saved fixture pages.
+
+For every page and backend, reports the time to parse and extract what the
+scraper needs (best of N runs) and the peak memory allocated while doing it,
+and checks that every backend extracts identical data.
+
+Usage:
+    python benchmarks/bench_parsers.py
+    python benchmarks/bench_parsers.py --repeat 20
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from slack_io.scrapers import SlackAPIMethodsScraper
+from slack_docs_fixtures import saved_pages
+
+# (label, parser, targeted)
+BACKENDS = [
+    ('html.parser (full)', 'html.parser', False),
+    ('lxml (full)', 'lxml', False),
+    ('html.parser (targeted)', 'html.parser', True),
+    ('lxml (targeted)', 'lxml', True),
+]
+
+
+def extract(scraper: SlackAPIMethodsScraper, page: str, html: str):
+    """Run the same parse + extraction the scraper does for this page."""
+    if page == 'index':
+        return scraper._parse_methods_list(scraper.make_soup(html, 'list'))
+    url = scraper.BASE_URL + page
+    category = page.split('.')[0]
+    return (
+        scraper._parse_category_methods(scraper.make_soup(html, 'category'), category),
+        scraper._parse_method_details(scraper.make_soup(html, 'details'), page, url),
+    )
+
+
+def measure(scraper, page, html, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = extract(scraper, page, html)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    extract(scraper, page, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scraper HTML parsing backends')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per page and backend (default: 5)')
+    args = parser.parse_args()
+
+    pages = saved_pages()
+    if not pages:
+        print('No fixture pages found; run benchmarks/slack_docs_fixtures.py first')
+        return 1
+
+    totals = {label: [0.0, 0] for label, _, _ in BACKENDS}
+    mismatches = 0
+    print(f"{'page':<28}{'backend':<26}{'parse ms':>10}{'peak KiB':>10}")
+    for page, path in pages.items():
+        html = path.read_text(encoding='utf-8')
+        reference = None
+        for label, backend, targeted in BACKENDS:
+            scraper = SlackAPIMethodsScraper(rate_limit_delay=0, parser=backend, targeted=targeted)
+            result, seconds, peak = measure(scraper, page, html, args.repeat)
+            if reference is None:
+                reference = result
+            elif result != reference:
+                mismatches += 1
+                print(f"  !! {label} extracted different data for {page}")
+            totals[label][0] += seconds
+            totals[label][1] = max(totals[label][1], peak)
+            print(f"{page:<28}{label:<26}{seconds * 1000:>10.2f}{peak / 1024:>10.0f}")
+
+    baseline = totals[BACKENDS[0][0]][0]
+    print(f"\n{'backend':<26}{'ms/page':>10}{'max KiB':>10}{'speedup':>10}")
+    for label, (seconds, peak) in totals.items():
+        print(f"{label:<26}{seconds * 1000 / len(pages):>10.2f}{peak / 1024:>10.0f}{baseline / seconds:>9.1f}x")
+
+    if mismatches:
+        print(f"\n{mismatches} backend/page combinations disagreed with html.parser")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
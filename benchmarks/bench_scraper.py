@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+End-to-end scraper benchmark and mode-consistency check.
+
+Runs SlackAPIMethodsScraper against the local docs stand-in (no network) in
+several modes and reports pages per second for each. The stand-in's pages are
+generated from slack_api_all_methods.json, so the catalog comparison only
+shows that every mode (concurrent, cached, incremental, offline) still yields
+the same result; it can't catch changes in the real site's markup.
+
+Scope: this is not a markup regression suite yet. That needs a corpus of real
+docs pages, captured with `slack_docs_fixtures.py --record` (network access
+required) and committed under fixtures/slack_docs_recorded/; none has been
+captured so far. Once that directory exists the recorded check always runs:
+the index and every SAVED_METHODS page must be there, parsing each with the
+targeted parser and with a full html.parser tree must agree, and each must
+yield links, a description and arguments. Exits non-zero on any mismatch.
+
+Usage:
+    python benchmarks/bench_scraper.py
+    python benchmarks/bench_scraper.py --details --latency-ms 30 --workers 8
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from slack_io.scrapers import SlackAPIMethodsScraper
+from docs_standin import DocsStandIn
+from slack_docs_fixtures import CATALOG_PATH, RECORDED_DIR, SAVED_METHODS, recorded_pages
+
+CATALOG_KEYS = ('name', 'category', 'url', 'description')
+
+
+def run(standin, scraper, details):
+    scraper.BASE_URL = standin.base_url
+    before = standin.requests
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        methods = scraper.scrape_all_methods(include_details=details)
+    elapsed = time.perf_counter() - t0
+    pages = scraper.stats['parsed'] + scraper.stats['parse_reused'] or (standin.requests - before)
+    return methods, elapsed, standin.requests - before, pages
+
+
+def check(methods, expected, base_url, details):
+    """Return a list of human-readable differences against the reference catalog."""
+    problems = []
+    got = []
+    for m in methods:
+        entry = {k: m.get(k) for k in CATALOG_KEYS}
+        entry['url'] = (entry['url'] or '').replace(base_url, SlackAPIMethodsScraper.BASE_URL)
+        got.append(entry)
+    if details:
+        # scrape_method_details replaces description with the page text, so only compare the rest
+        for m in methods:
+            if not m.get('parameters'):
+                problems.append(f"{m['name']}: no parameters extracted")
+        got = [{k: v for k, v in g.items() if k != 'description'} for g in got]
+        expected = [{k: v for k, v in e.items() if k != 'description'} for e in expected]
+    if len(got) != len(expected):
+        problems.append(f"expected {len(expected)} methods, got {len(got)}")
+    for i, (g, e) in enumerate(zip(got, expected)):
+        if g != e:
+            problems.append(f"#{i}: expected {e}, got {g}")
+            if len(problems) > 10:
+                break
+    return problems
+
+
+def check_recorded(parser):
+    """Differences between targeted and full-tree parsing of the recorded live pages, plus empty results."""
+    targeted = SlackAPIMethodsScraper(rate_limit_delay=0, parser=parser)
+    full = SlackAPIMethodsScraper(rate_limit_delay=0, parser='html.parser', targeted=False)
+    pages = recorded_pages()
+    problems = [f'{name}: not recorded' for name in ['index'] + SAVED_METHODS if name not in pages]
+    for name, path in pages.items():
+        html = path.read_text(encoding='utf-8')
+        if name == 'index':
+            parses = {'list': lambda sc, soup: sc._parse_methods_list(soup)}
+        else:
+            url = SlackAPIMethodsScraper.BASE_URL + name
+            parses = {
+                'details': lambda sc, soup: sc._parse_method_details(soup, name, url),
+                'category': lambda sc, soup: sc._parse_category_methods(soup, name.split('.')[0]),
+            }
+        for kind, parse in parses.items():
+            got = parse(targeted, targeted.make_soup(html, kind))
+            want = parse(full, full.make_soup(html, kind))
+            if got != want:
+                problems.append(f'{name} ({kind}): targeted {parser} parse differs from the full tree')
+            if not want:
+                problems.append(f'{name} ({kind}): nothing extracted')
+            elif kind == 'details' and not (want['description'] and want['parameters']):
+                problems.append(f'{name}: no description or arguments extracted')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the docs scraper against a local stand-in')
+    parser.add_argument('--details', action='store_true', help='Also fetch every method detail page')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=20, help='Simulated per-request latency (default: 20)')
+    parser.add_argument('--parser', default='lxml', choices=['lxml', 'html.parser'])
+    args = parser.parse_args()
+
+    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+        expected = [{k: m[k] for k in CATALOG_KEYS} for m in json.load(f)]
+
+    failures = 0
+    with DocsStandIn(latency_s=args.latency_ms / 1000) as standin, tempfile.TemporaryDirectory() as cache_dir:
+        scenarios = [
+            ('sequential', dict(max_workers=1)),
+            ('concurrent', dict(max_workers=args.workers)),
+            ('cold cache', dict(max_workers=args.workers, cache_dir=cache_dir)),
+            ('incremental', dict(max_workers=args.workers, cache_dir=cache_dir, incremental=True)),
+            ('offline', dict(max_workers=args.workers, cache_dir=cache_dir, offline=True, incremental=True)),
+        ]
+        print(f"{'scenario':<14}{'seconds':>9}{'requests':>10}{'pages':>8}{'pages/s':>10}  result")
+        for label, kwargs in scenarios:
+            scraper = SlackAPIMethodsScraper(rate_limit_delay=0, parser=args.parser, **kwargs)
+            methods, elapsed, requests, pages = run(standin, scraper, args.details)
+            problems = check(methods, expected, standin.base_url, args.details)
+            failures += bool(problems)
+            status = 'ok' if not problems else f'{len(problems)} mismatches'
+            print(f"{label:<14}{elapsed:>9.2f}{requests:>10}{pages:>8}{pages / elapsed:>10.1f}  {status}")
+            for p in problems[:10]:
+                print(f"    {p}")
+
+    if RECORDED_DIR.exists():
+        problems = check_recorded(args.parser)
+        print(f"\nrecorded pages: {len(recorded_pages())}, {'ok' if not problems else f'{len(problems)} problems'}")
+        for p in problems:
+            print(f"    {p}")
+        failures += bool(problems)
+    else:
+        print(f"\nReal markup: not checked, no corpus in {RECORDED_DIR} "
+              f"(capture one with slack_docs_fixtures.py --record and commit it)")
+
+    if failures:
+        print(f"\n{failures} check(s) failed")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Slack docs site.
+
+Serves the methods list and method pages under /reference/methods/: saved
+fixture pages when one exists, otherwise a page rendered from the fixture
+templates. Responses carry ETag and Last-Modified and honour conditional
+requests, so the scraper's cache can be exercised too. An optional per-request
+latency makes concurrency effects visible.
+
+Usage:
+    python benchmarks/docs_standin.py --port 8765 --latency-ms 50
+"""
+
+import argparse
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from slack_docs_fixtures import load_catalog, render_method_page, render_methods_index, saved_pages
+
+PREFIX = '/reference/methods/'
+LAST_MODIFIED = formatdate(1730000000, usegmt=True)
+
+
+class DocsStandIn:
+    """Threaded HTTP server serving fixture pages; use as a context manager."""
+
+    def __init__(self, port: int = 0, latency_s: float = 0.0):
+        self.catalog = load_catalog()
+        self.names = {m['name'] for m in self.catalog}
+        self.saved = saved_pages()
+        self.latency_s = latency_s
+        self.requests = 0
+        self.not_modified = 0
+        self._pages = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}{PREFIX}"
+
+    def page(self, name: str):
+        """Return (body bytes, etag) for a page name ('index' for the list), or None."""
+        with self._lock:
+            if name in self._pages:
+                return self._pages[name]
+        if name in self.saved:
+            html = self.saved[name].read_text(encoding='utf-8')
+        elif name == 'index':
+            html = render_methods_index(self.catalog)
+        elif name in self.names:
+            html = render_method_page(self.catalog, name)
+        else:
+            return None
+        body = html.encode('utf-8')
+        entry = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:16])
+        with self._lock:
+            self._pages[name] = entry
+        return entry
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                with standin._lock:
+                    standin.requests += 1
+                if standin.latency_s:
+                    time.sleep(standin.latency_s)
+                path = self.path.split('?', 1)[0]
+                name = path[len(PREFIX):].strip('/') if path.startswith(PREFIX) else None
+                entry = standin.page(name or 'index') if name is not None else None
+                if entry is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body, etag = entry
+                if self.headers.get('If-None-Match') == etag:
+                    with standin._lock:
+                        standin.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', LAST_MODIFIED)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fixture Slack docs pages locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added delay per request')
+    args = parser.parse_args()
+    standin = DocsStandIn(args.port, args.latency_ms / 1000).start()
+    print(f"Serving fixture docs at {standin.base_url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Fixture pages for the Slack docs scraper.
+
+The docs site can't be reached from CI, so the benchmarks run against pages
+that mirror its structure: a Docusaurus-style shell (large inline styles and
+scripts, navbar, footer), a sidebar listing every category with the current
+one expanded, and method articles with an Arguments table and code samples.
+The pages are generated from slack_api_all_methods.json, so scraping them
+reproduces that catalog by construction: they exercise the scraper's modes
+and measure its speed, but say nothing about the real site's markup. Pages
+captured from the live site with `--record` are kept apart, in
+fixtures/slack_docs_recorded/, and bench_scraper.py checks the parser
+against those.
+
+Usage:
+    python benchmarks/slack_docs_fixtures.py            # (re)write the generated fixture pages
+    python benchmarks/slack_docs_fixtures.py --record   # capture the real pages (needs network access)
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from html import escape
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+CATALOG_PATH = ROOT / 'slack_api_all_methods.json'
+FIXTURE_DIR = Path(__file__).resolve().parent / 'fixtures' / 'slack_docs'
+RECORDED_DIR = Path(__file__).resolve().parent / 'fixtures' / 'slack_docs_recorded'
+
+# Sidebar labels that differ from the category prefix on the real site
+CATEGORY_LABELS = {'slackLists': 'lists'}
+
+# Method pages saved to disk (the rest are rendered on demand by the stand-in server)
+SAVED_METHODS = ['chat.postMessage', 'conversations.history', 'users.list', 'admin.apps.approve']
+
+ARG_POOL = [
+    ('channel', 'Channel, private group, or IM channel to send message to.'),
+    ('cursor', 'Paginate through collections of data by setting the cursor parameter.'),
+    ('limit', 'The maximum number of items to return.'),
+    ('user', 'The ID of the user to look up.'),
+    ('team_id', 'Encoded team id, required if org token is used.'),
+    ('ts', 'Timestamp of the message to act on.'),
+    ('text', 'How this field works and whether it is required depends on other fields you use.'),
+    ('include_locale', 'Set this to true to receive the locale for the user.'),
+    ('oldest', 'Only messages after this Unix timestamp will be included in results.'),
+    ('latest', 'Only messages before this Unix timestamp will be included in results.'),
+    ('inclusive', 'Include messages with oldest or latest timestamps in results.'),
+    ('app_id', 'The id of the app to act on.'),
+    ('request_id', 'The id of the request to act on.'),
+    ('blocks', 'A JSON-based array of structured blocks, presented as a URL-encoded string.'),
+    ('thread_ts', "Provide another message's ts value to make this message a reply."),
+]
+
+
+def load_catalog() -> List[Dict]:
+    with open(CATALOG_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def categories(catalog: List[Dict]) -> Dict[str, List[str]]:
+    """Category -> method names, in catalog order."""
+    out: Dict[str, List[str]] = {}
+    for method in catalog:
+        out.setdefault(method['category'], []).append(method['name'])
+    return out
+
+
+def _seed(name: str) -> int:
+    return int(hashlib.sha256(name.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def _shell(title: str, description: str, sidebar: str, article: str) -> str:
+    # Inline CSS/JS comparable in weight to what the real site ships in every page
+    css = '\n'.join(
+        f'.theme-doc-{i}{{--ifm-spacing-{i}:{i % 17}px;margin:{i % 5}px {i % 7}px;color:var(--ifm-color-{i % 9})}}'
+        for i in range(900)
+    )
+    search_index = json.dumps([{'id': i, 'title': f'doc {i}', 'path': f'/reference/doc-{i}'} for i in range(600)])
+    nav_links = ''.join(
+        f'<li class="navbar__item"><a class="navbar__link" href="/guides/topic-{i}">Topic {i}</a></li>'
+        for i in range(40)
+    )
+    footer_links = ''.join(
+        f'<li class="footer__item"><a class="footer__link-item" href="https://slack.com/help/{i}">Help {i}</a></li>'
+        for i in range(60)
+    )
+    return (
+        '<!doctype html>\n<html lang="en" dir="ltr" class="docs-wrapper plugin-docs">\n<head>\n'
+        '<meta charset="UTF-8">\n'
+        '<meta name="viewport" content="width=device-width,initial-scale=1">\n'
+        f'<title>{escape(title)} | Slack Developer Docs</title>\n'
+        f'<meta name="description" content="{escape(description)}">\n'
+        f'<meta property="og:description" content="{escape(description)}">\n'
+        f'<style>{css}</style>\n'
+        f'<script type="application/json" id="search-index">{search_index}</script>\n'
+        '<script>window.__DOCUSAURUS_INSERT_BASEURL_BANNER=false;(function(){var t=localStorage.getItem("theme");'
+        'document.documentElement.setAttribute("data-theme",t||"light")})();</script>\n'
+        '</head>\n<body class="navigation-with-keyboard">\n'
+        f'<nav class="navbar navbar--fixed-top"><ul class="navbar__items">{nav_links}</ul></nav>\n'
+        '<div class="main-wrapper docsWrapper">\n'
+        f'<aside class="theme-doc-sidebar-container"><nav class="menu thin-scrollbar">{sidebar}</nav></aside>\n'
+        f'<main class="docMainContainer"><article>{article}</article></main>\n'
+        '</div>\n'
+        f'<footer class="footer"><ul class="footer__items">{footer_links}</ul></footer>\n'
+        '<script src="/assets/js/runtime~main.js"></script><script src="/assets/js/main.js"></script>\n'
+        '</body>\n</html>\n'
+    )
+
+
+def _sidebar(cats: Dict[str, List[str]], expanded: str = None) -> str:
+    items = []
+    for category, names in cats.items():
+        items.append(
+            '<li class="menu__list-item menu__list-item--collapsed">'
+            f'<a class="menu__link menu__link--sublist" href="/reference/methods/{names[0]}">'
+            f'{escape(CATEGORY_LABELS.get(category, category))}</a>'
+        )
+        if category == expanded:
+            items.append('<ul class="menu__list">')
+            items.extend(
+                f'<li class="menu__list-item"><a class="menu__link" href="/reference/methods/{n}">{escape(n)}</a></li>'
+                for n in names
+            )
+            items.append('</ul>')
+        items.append('</li>')
+    return f'<ul class="theme-doc-sidebar-menu menu__list">{"".join(items)}</ul>'
+
+
+def render_methods_index(catalog: List[Dict]) -> str:
+    """The methods landing page: one entry per category, linking to its first method."""
+    cats = categories(catalog)
+    cards = ''.join(
+        f'<div class="card"><h3><a href="/reference/methods/{names[0]}">'
+        f'{escape(CATEGORY_LABELS.get(category, category))}</a></h3>'
+        f'<p>{len(names)} methods in the {escape(category)} family.</p></div>'
+        for category, names in cats.items()
+    )
+    article = (
+        '<h1>Web API methods</h1>'
+        '<p>The Web API is a collection of HTTP RPC-style methods, all with URLs in the form '
+        'https://slack.com/api/METHOD_FAMILY.method.</p>'
+        f'<div class="cards">{cards}</div>'
+    )
+    return _shell('Web API methods', 'Reference for every Slack Web API method.', _sidebar(cats), article)
+
+
+def render_method_page(catalog: List[Dict], name: str) -> str:
+    """A method reference page; its sidebar doubles as the category listing."""
+    cats = categories(catalog)
+    category = name.split('.')[0]
+    seed = _seed(name)
+    n_args = 2 + seed % 7
+    args = [ARG_POOL[(seed >> (i * 3) + i) % len(ARG_POOL)] for i in range(n_args)]
+    seen = set()
+    rows = ['<tr><th>Argument</th><th>Description</th><th>Example</th></tr>',
+            '<tr><td>token</td><td>Authentication token bearing required scopes. Required</td>'
+            '<td>xxxx-xxxxxxxxx-xxxx</td></tr>']
+    for i, (arg, desc) in enumerate(args):
+        if arg in seen:
+            continue
+        seen.add(arg)
+        required = ' Required' if (seed >> i) & 1 and i < 2 else ' Optional'
+        rows.append(f'<tr><td>{arg}</td><td>{escape(desc)}{required}</td><td>{arg}_example</td></tr>')
+    description = f'Calls {name} on behalf of the authenticated app.'
+    request = f'POST https://slack.com/api/{name}\nAuthorization: Bearer xoxb-1234\nContent-type: application/json'
+    response = json.dumps({'ok': True, 'method': name, 'response_metadata': {'next_cursor': ''}}, indent=2)
+    usage = ''.join(
+        f'<p>Usage note {i} for {escape(name)}: rate limits, pagination and scopes apply as documented.</p>'
+        for i in range(4 + seed % 5)
+    )
+    article = (
+        f'<header><h1>{escape(name)}</h1></header>'
+        f'<p>{escape(description)}</p>'
+        '<h2>Facts</h2><p>Method access: HTTP, JavaScript, Python, Java.</p>'
+        f'<h2>Arguments</h2><table>{"".join(rows)}</table>'
+        f'<h2>Usage info</h2>{usage}'
+        '<h2>Example request</h2>'
+        f'<pre class="prism-code language-http"><code>{escape(request)}</code></pre>'
+        '<h2>Example response</h2>'
+        f'<pre class="prism-code language-json"><code>{escape(response)}</code></pre>'
+    )
+    return _shell(name, description, _sidebar(cats, expanded=category), article)
+
+
+def saved_pages() -> Dict[str, Path]:
+    """Page name -> path of every saved fixture ('index' is the methods list)."""
+    return {p.stem: p for p in sorted(FIXTURE_DIR.glob('*.html'))}
+
+
+def recorded_pages() -> Dict[str, Path]:
+    """Page name -> path of every page captured from the live site."""
+    return {p.stem: p for p in sorted(RECORDED_DIR.glob('*.html'))}
+
+
+def write_fixtures():
+    catalog = load_catalog()
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    (FIXTURE_DIR / 'index.html').write_text(render_methods_index(catalog), encoding='utf-8')
+    for name in SAVED_METHODS:
+        (FIXTURE_DIR / f'{name}.html').write_text(render_method_page(catalog, name), encoding='utf-8')
+    print(f"Wrote {len(SAVED_METHODS) + 1} pages to {FIXTURE_DIR}")
+
+
+def record_fixtures():
+    """Save the live versions of the fixture pages to RECORDED_DIR (needs network access)."""
+    import requests
+
+    base = 'https://docs.slack.dev/reference/methods/'
+    session = requests.Session()
+    RECORDED_DIR.mkdir(parents=True, exist_ok=True)
+    for name, url in [('index', base)] + [(n, base + n) for n in SAVED_METHODS]:
+        response = session.get(url, timeout=10)
+        response.raise_for_status()
+        (RECORDED_DIR / f'{name}.html').write_text(response.text, encoding='utf-8')
+        print(f"Recorded {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the scraper fixture pages')
+    parser.add_argument('--record', action='store_true', help='Capture pages from the live docs site')
+    args = parser.parse_args()
+    if args.record:
+        record_fixtures()
+    else:
+        write_fixtures()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
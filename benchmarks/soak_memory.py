@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Memory soak test: drive a simulated week of traffic and check memory stays flat.
+
+Runs the app on the virtual clock (slack_io.sim) with the stand-in Slack and
+the stub LLM, injecting synthetic message events (slack_io.loadgen) at a steady
+rate. At the end of every simulated day it records traced memory and the sizes
+of the long-lived structures (slack_io.memdiag). After the first (warm-up) day,
+traced memory may grow by at most --max-growth-kib in total, and THREAD_STATE
+must stay below --max-threads entries; otherwise the biggest growth sites are
+printed and the script exits non-zero.
+
+Usage:
+    python benchmarks/soak_memory.py
+    python benchmarks/soak_memory.py --days 7 --events-per-hour 60 --max-growth-kib 512
+"""
+
+import argparse
+import gc
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ['SLACK_OFFLINE'] = '1'
+os.environ['LLM_PROVIDER'] = 'stub'
+os.environ.pop('EVENT_LOG', None)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from slack_io import bolt_app  # noqa: F401  (registers the handlers)
+from slack_io.loadgen import EventFactory
+from slack_io.memdiag import structure_sizes
+from slack_io.persona_registry import CHANNEL_POLICY
+from slack_io.sim import Simulation
+
+DAY_S = 24 * 3600
+START = 1760000000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulated-week memory soak test')
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--events-per-hour', type=float, default=30.0, help='Mean synthetic event rate (default: 30)')
+    parser.add_argument('--max-growth-kib', type=float, default=512.0,
+                        help='Allowed traced-memory growth after the first day (default: 512 KiB)')
+    parser.add_argument('--max-threads', type=int, default=2000, help='Upper bound on THREAD_STATE entries')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    os.chdir(tempfile.mkdtemp(prefix='soak-'))  # the conductor's provenance log lands here
+    channels = {f'CSOAK{i:03d}': name for i, name in enumerate(CHANNEL_POLICY)}
+    sim = Simulation(start=START, channels=channels, seed=args.seed).install()
+    sim.slack.max_messages = 100  # full within the warm-up day, so the stand-in itself stays flat afterwards
+    factory = EventFactory(channels, {'human': 0.7, 'persona': 0.2, 'bot': 0.1}, thread_ratio=0.5,
+                           seed=args.seed, clock=sim.clock.time)
+    rng = random.Random(args.seed)
+    mean_gap = 3600.0 / args.events_per_hour
+
+    def arrive():
+        event = factory.make()
+        sim.deliver(event, {'event': event, 'event_id': f"Ev{event['ts']}"},
+                    'bot_message' if event.get('subtype') == 'bot_message' and rng.random() < 0.5 else 'message')
+        sim.after(rng.expovariate(1.0 / mean_gap), arrive)
+
+    sim.after(0, arrive)
+    tracemalloc.start(1)
+    t0 = time.time()
+    days, first = [], None
+    print(f"{'day':>4}{'events':>8}{'posts':>7}{'traced KiB':>12}{'threads':>9}{'cooldowns':>10}")
+    for day in range(1, args.days + 1):
+        sim.run(until=START + day * DAY_S)
+        sim.slack.posts.clear()
+        gc.collect()
+        traced, _ = tracemalloc.get_traced_memory()
+        sizes = structure_sizes()
+        snap = tracemalloc.take_snapshot()
+        days.append((traced, sizes))
+        if day == 1:
+            first = snap
+        print(f'{day:>4}{sim.events_delivered:>8}{sim.slack.calls.get("chat.postMessage", 0):>7}'
+              f'{traced / 1024:>12.0f}{sizes["THREAD_STATE"]["entries"]:>9}{sizes["PERSONA_COOLDOWN"]["entries"]:>10}')
+
+    growth = (days[-1][0] - days[0][0]) / 1024
+    threads = max(s['THREAD_STATE']['entries'] for _, s in days)
+    print(f'\n{args.days} simulated days in {time.time() - t0:.1f}s; growth after day 1: {growth:+.0f} KiB, '
+          f'max THREAD_STATE: {threads}')
+    failed = growth > args.max_growth_kib or threads > args.max_threads
+    if failed:
+        print('\nMemory is not flat; biggest growth since day 1:')
+        for stat in snap.compare_to(first, 'lineno')[:10]:
+            print(f'  {stat.size_diff / 1024:+8.1f} KiB  {stat.traceback[0]}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,16 +6,20 @@ Usage:
     python scrape_slack_api.py                    # List all methods
     python scrape_slack_api.py --details          # Include detailed info
     python scrape_slack_api.py --method chat.postMessage  # Scrape specific method
+    python scrape_slack_api.py --details --workers 16 --rate-limit 0.25 --resume scrape.ckpt.json
+    python scrape_slack_api.py --cache-dir .scrape_cache --incremental   # Fast refresh + diff
+    python scrape_slack_api.py --cache-dir .scrape_cache --offline       # Replay from cache
 """
 
 import argparse
+import json
 import sys
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from slack_io.scrapers import SlackAPIMethodsScraper
+from slack_io.scrapers import SlackAPIMethodsScraper, diff_catalogs
 
 
 def main():
@@ -45,12 +49,73 @@ def main():
         '--rate-limit',
         type=float,
         default=1.0,
-        help='Delay between requests in seconds (default: 1.0)'
+        help='Average delay between requests to the same host in seconds (default: 1.0)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=8,
+        help='Number of pages fetched concurrently (default: 8)'
+    )
+    parser.add_argument(
+        '--resume',
+        type=str,
+        help='Checkpoint file; finished pages are saved there and skipped on rerun'
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        help='On-disk HTTP cache; pages are revalidated with ETag/Last-Modified'
+    )
+    parser.add_argument(
+        '--offline',
+        action='store_true',
+        help='Replay pages from --cache-dir only, without network access'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only re-parse pages whose content changed and write a diff against the previous --output'
+    )
+    parser.add_argument(
+        '--max-age',
+        type=float,
+        default=0,
+        help='Seconds a cached page is used without revalidation (default: 0)'
+    )
+    parser.add_argument(
+        '--diff',
+        type=str,
+        help='Write a diff against the existing --output file here (default with --incremental: <output>.diff.json)'
+    )
+
+    parser.add_argument(
+        '--parser',
+        choices=['lxml', 'html.parser'],
+        default='lxml',
+        help='HTML parsing backend (default: lxml)'
+    )
+    parser.add_argument(
+        '--full-parse',
+        action='store_true',
+        help='Build the whole document tree instead of only the tags the scraper reads'
     )
 
     args = parser.parse_args()
 
-    scraper = SlackAPIMethodsScraper(rate_limit_delay=args.rate_limit)
+    if (args.offline or args.incremental) and not args.cache_dir:
+        parser.error('--offline and --incremental need --cache-dir')
+
+    scraper = SlackAPIMethodsScraper(
+        rate_limit_delay=args.rate_limit,
+        max_workers=args.workers,
+        cache_dir=args.cache_dir,
+        offline=args.offline,
+        incremental=args.incremental,
+        max_age=args.max_age,
+        parser=args.parser,
+        targeted=not args.full_parse,
+    )
 
     if args.method:
         # Scrape specific method
@@ -79,7 +144,7 @@ def main():
 
     else:
         # Scrape all methods
-        methods = scraper.scrape_all_methods(include_details=args.details)
+        methods = scraper.scrape_all_methods(include_details=args.details, resume_path=args.resume)
 
         if not methods:
             print("No methods found")
@@ -103,6 +168,17 @@ def main():
         if len(methods) > 10:
             print(f"  ... and {len(methods) - 10} more")
 
+        # Diff against the previous catalog before it is overwritten
+        diff_path = args.diff or (f"{Path(args.output).with_suffix('')}.diff.json" if args.incremental else None)
+        if diff_path and Path(args.output).exists() and not args.by_category:
+            with open(args.output, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            diff = diff_catalogs(previous, methods)
+            with open(diff_path, 'w', encoding='utf-8') as f:
+                json.dump(diff, f, indent=2, ensure_ascii=False)
+            print(f"\nDiff vs previous catalog: {len(diff['added'])} added, "
+                  f"{len(diff['removed'])} removed, {len(diff['changed'])} changed -> {diff_path}")
+
         # Save to file
         if args.by_category:
             scraper.save_by_category(methods, args.output)
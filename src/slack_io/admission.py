@@ -0,0 +1,162 @@
+"""
+Admission control for reply generation.
+
+Every reply the conductor decides to send is admitted here first. Work is
+capped per channel (from `CHANNEL_POLICY`, falling back to the defaults below)
+and across the workspace, both for jobs waiting to run and for jobs currently
+inside the LLM. When the caps are hit, lower-value work is shed first:
+persona-to-persona chatter goes before replies to humans. Jobs that waited
+past their deadline are expired instead of being generated late.
+"""
+import time, threading, logging
+from typing import Dict, List, Optional
+from .persona_registry import CHANNEL_POLICY
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs (per-channel values can be overridden with "max_inflight"/"max_queued" in CHANNEL_POLICY)
+DEFAULT_MAX_INFLIGHT = 2     # generations running at once in one channel
+DEFAULT_MAX_QUEUED = 6       # replies waiting to run in one channel
+GLOBAL_MAX_INFLIGHT = 8
+GLOBAL_MAX_QUEUED = 32
+JOB_DEADLINE_S = 30          # a reply that can't start within this is no longer relevant
+START_RETRY_S = 0.25         # a job with no in-flight slot goes back to the pool for this long
+
+# Higher value survives longer under load
+JOB_VALUE = {"human": 2, "persona": 1}
+
+class Job:
+    __slots__ = ("channel", "kind", "value", "created", "deadline", "state")
+
+    def __init__(self, channel: str, kind: str, deadline_s: float):
+        self.channel = channel
+        self.kind = kind
+        self.value = JOB_VALUE.get(kind, 0)
+        self.created = time.time()
+        self.deadline = self.created + deadline_s
+        self.state = "queued"   # queued -> running -> done, or shed / expired
+
+    def __repr__(self):
+        return f"Job({self.kind}@{self.channel}, {self.state})"
+
+class AdmissionController:
+    def __init__(self, global_max_inflight: int = GLOBAL_MAX_INFLIGHT, global_max_queued: int = GLOBAL_MAX_QUEUED,
+                 deadline_s: float = JOB_DEADLINE_S):
+        self.global_max_inflight = global_max_inflight
+        self.global_max_queued = global_max_queued
+        self.deadline_s = deadline_s
+        self._queued: List[Job] = []
+        self._inflight: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    def _limits(self, channel: str):
+        policy = CHANNEL_POLICY.get(channel, {})
+        return policy.get("max_inflight", DEFAULT_MAX_INFLIGHT), policy.get("max_queued", DEFAULT_MAX_QUEUED)
+
+    def _drop(self, job: Job, state: str):
+        self._queued.remove(job)
+        job.state = state
+        metrics.incr(f"admission.{state}.{job.kind}")
+        self._cond.notify_all()
+
+    def _expire_stale(self, now: float):
+        for job in [j for j in self._queued if j.deadline < now]:
+            self._drop(job, "expired")
+
+    def _victim(self, candidates: List[Job], value: int) -> Optional[Job]:
+        # Lowest value first, oldest among equals; never shed work worth as much as the newcomer
+        lower = [j for j in candidates if j.value < value]
+        if not lower:
+            return None
+        return min(lower, key=lambda j: (j.value, j.created))
+
+    def admit(self, channel: str, kind: str) -> Optional[Job]:
+        """Reserve a queue slot for one reply, shedding cheaper work if needed.
+
+        Returns None when the reply itself should be dropped.
+        """
+        job = Job(channel, kind, self.deadline_s)
+        with self._cond:
+            self._expire_stale(job.created)
+            _, max_queued = self._limits(channel)
+            in_channel = [j for j in self._queued if j.channel == channel]
+            if len(in_channel) >= max_queued:
+                victim = self._victim(in_channel, job.value)
+                if not victim:
+                    metrics.incr(f"admission.rejected.{kind}")
+                    logger.info(f"[ADMISSION] Rejected {kind} reply in #{channel} (channel queue full)")
+                    return None
+                self._drop(victim, "shed")
+                logger.info(f"[ADMISSION] Shed queued {victim.kind} reply in #{channel} for a {kind} reply")
+            if len(self._queued) >= self.global_max_queued:
+                victim = self._victim(self._queued, job.value)
+                if not victim:
+                    metrics.incr(f"admission.rejected.{kind}")
+                    logger.info(f"[ADMISSION] Rejected {kind} reply in #{channel} (global queue full)")
+                    return None
+                self._drop(victim, "shed")
+                logger.info(f"[ADMISSION] Shed queued {victim.kind} reply in #{victim.channel} for a {kind} reply")
+            self._queued.append(job)
+            metrics.incr(f"admission.admitted.{kind}")
+            self._publish()
+        return job
+
+    def start(self, job: Job) -> Optional[bool]:
+        """Move a job from queued to running if an in-flight slot is free.
+
+        Never blocks: returns None when the caps are full (the caller should
+        retry after START_RETRY_S without holding a pool worker), and False if
+        the job was shed or expired meanwhile; the caller should then skip
+        generation entirely.
+        """
+        max_inflight, _ = self._limits(job.channel)
+        with self._cond:
+            if job.state != "queued":
+                return False
+            now = time.time()
+            if now > job.deadline:
+                self._drop(job, "expired")
+                self._publish()
+                logger.info(f"[ADMISSION] Expired {job.kind} reply in #{job.channel} after {now - job.created:.1f}s")
+                return False
+            total = sum(self._inflight.values())
+            if self._inflight.get(job.channel, 0) >= max_inflight or total >= self.global_max_inflight:
+                metrics.incr(f"admission.deferred.{job.kind}")
+                return None
+            self._queued.remove(job)
+            self._inflight[job.channel] = self._inflight.get(job.channel, 0) + 1
+            job.state = "running"
+            metrics.observe(f"admission.wait_s.{job.kind}", time.time() - job.created)
+            self._publish()
+        return True
+
+    def finish(self, job: Job):
+        with self._cond:
+            if job.state != "running":
+                return
+            job.state = "done"
+            self._inflight[job.channel] -= 1
+            self._publish()
+            self._cond.notify_all()
+
+    def cancel(self, job: Job):
+        """Give back a slot for a job that will never be started."""
+        with self._cond:
+            if job.state == "queued":
+                self._drop(job, "cancelled")
+                self._publish()
+
+    def _publish(self):
+        metrics.gauge("admission.queued", len(self._queued))
+        metrics.gauge("admission.inflight", sum(self._inflight.values()))
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = {"queued": len(self._queued), "inflight": sum(self._inflight.values())}
+        counters = metrics.snapshot()["counters"]
+        for outcome in ("admitted", "shed", "expired", "rejected"):
+            out[outcome] = {k.rsplit(".", 1)[1]: v for k, v in counters.items() if k.startswith(f"admission.{outcome}.")}
+        return out
+
+ADMISSION = AdmissionController()
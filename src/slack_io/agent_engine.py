@@ -1,25 +1,31 @@
 # src/slack_io/agent_engine.py
-import os, re
-from typing import List, Dict
-from openai import OpenAI
-from .slack_client import app as bolt_app
+import os, re, time
+from typing import Callable, List, Dict, Optional
+from .slack_client import READ_CLIENT
+from . import metrics
+from .context_cache import CONTEXT_CACHE
+from .usage import LEDGER, cached_tokens
+from .llm_provider import LLMClient, provider_from_env
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI-shaped client over the configured backend(s); see llm_provider.provider_from_env
+client = LLMClient(provider_from_env())
 MODEL = os.getenv("MODEL_NAME", "gpt-4o-mini")
 
 # Slack timestamps look like "1730071234.56789" (digits dot digits)
 REF_RE = re.compile(r"\[\[ref:(\d{10,}\.\d{1,6})\]\]")   # capture TS values
 MAX_CTX = 10
 
+# Generation knobs
+MAX_TOKENS = 180                                        # hard cap per completion
+MAX_SENTENCES = 3                                       # prompts ask for 1-3 sentences; stop streaming after this many
+STREAMING = os.getenv("LLM_STREAMING", "1") != "0"      # stream completions (TTFT, early stop, cancellation)
+SENTENCE_END_RE = re.compile(r"[.!?][\"')\]]*\s+")
+ABBREVIATIONS = ("e.g.", "i.e.", "etc.", "vs.", "approx.")
+
 def fetch_recent_context(channel_id: str, thread_ts: str | None, k: int = MAX_CTX) -> List[Dict]:
     """Prefer thread replies if thread_ts is set; else fall back to channel history."""
-    cl = bolt_app.client
-    if thread_ts:
-        r = cl.conversations_replies(channel=channel_id, ts=thread_ts, limit=50)
-        msgs = r.get("messages", [])
-    else:
-        r = cl.conversations_history(channel=channel_id, limit=50)
-        msgs = r.get("messages", [])
+    # cached per thread/channel; only messages newer than the last fetch come from Slack
+    msgs = CONTEXT_CACHE.fetch(READ_CLIENT, channel_id, thread_ts)
     # newest last; keep non-edit, non-join messages
     out = []
     for m in msgs:
@@ -154,7 +160,9 @@ def _get_role_guidance(role: str) -> str:
     
     return random.choice(cues)
 
-def generate_reply(persona_name: str, channel_name: str, channel_id: str, event_text: str, thread_ts: str | None) -> Dict:
+def generate_reply(persona_name: str, channel_name: str, channel_id: str, event_text: str, thread_ts: str | None,
+                   should_cancel: Optional[Callable[[], bool]] = None, stream: Optional[bool] = None,
+                   producer: str = "reply") -> Dict:
     # Import here to avoid circular dependency
     from .persona_registry import PERSONAS
     
@@ -169,13 +177,107 @@ def generate_reply(persona_name: str, channel_name: str, channel_id: str, event_
     extra_guidance = _get_role_guidance(persona_cfg.get("role", ""))
     up = build_user_prompt(channel_name, event_text, ctx_txt, is_thread=bool(thread_ts), extra_guidance=extra_guidance)
 
+    messages = [{"role":"system","content":sys},{"role":"user","content":up}]
+    if stream is None:
+        stream = STREAMING
+    t0 = time.time()
+    out = _stream_completion(messages, should_cancel) if stream else _completion(messages)
+    # usage per persona/channel/producer (see usage.py)
+    LEDGER.record(persona_name, channel_name, producer, out["usage"], time.time() - t0, messages)
+    return out
+
+def _completion(messages: List[Dict]) -> Dict:
+    t0 = time.time()
     resp = client.chat.completions.create(
         model=MODEL,
-        messages=[{"role":"system","content":sys},{"role":"user","content":up}],
+        messages=messages,
         temperature=0.7,  # Better balance for natural responses
-        max_tokens=180,  # Increased from 140 for more natural length
+        max_tokens=MAX_TOKENS,  # Increased from 140 for more natural length
     )
+    metrics.observe("llm.latency_s", time.time() - t0)
     text = resp.choices[0].message.content.strip()
+    usage = {
+        "prompt_tokens": getattr(resp.usage, "prompt_tokens", None),
+        "completion_tokens": getattr(resp.usage, "completion_tokens", None),
+        "cached_tokens": cached_tokens(resp.usage),
+        "ttft_s": None,
+        "stopped_early": False,
+    }
+    metrics.incr("llm.completion_tokens", usage["completion_tokens"] or 0)
 
     # No need to strip citations - let messages flow naturally
-    return {"text": text, "supports": []}
\ No newline at end of file
+    return {"text": text, "supports": [], "usage": usage, "cancelled": False}
+
+def _truncate_sentences(text: str, n: int = MAX_SENTENCES) -> Optional[str]:
+    """Text cut after the n-th complete sentence, or None if there aren't n yet."""
+    count = 0
+    for m in SENTENCE_END_RE.finditer(text):
+        if text[:m.start() + 1].lower().endswith(ABBREVIATIONS):
+            continue
+        count += 1
+        if count == n:
+            return text[:m.end()].rstrip()
+    return None
+
+def _stream_completion(messages: List[Dict], should_cancel: Optional[Callable[[], bool]] = None) -> Dict:
+    """Stream a completion, stopping after MAX_SENTENCES sentences or when should_cancel() turns true."""
+    t0 = time.time()
+    ttft = None
+    parts: List[str] = []
+    chunks = 0
+    usage_obj = None
+    stopped_early = cancelled = False
+    stream = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=0.7,
+        max_tokens=MAX_TOKENS,
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    try:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage_obj = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if not delta:
+                continue
+            if ttft is None:
+                ttft = time.time() - t0
+                metrics.observe("llm.ttft_s", ttft)
+            parts.append(delta)
+            chunks += 1
+            if should_cancel and should_cancel():
+                cancelled = True
+                break
+            cut = _truncate_sentences("".join(parts))
+            if cut is not None:
+                parts = [cut]
+                stopped_early = True
+                break
+    finally:
+        close = getattr(stream, "close", None)
+        if close and (cancelled or stopped_early):
+            close()
+    metrics.observe("llm.latency_s", time.time() - t0)
+
+    # Usage only arrives on the final chunk; estimate one token per delta when we hung up first
+    # (LEDGER.record estimates the prompt side from the messages)
+    completion_tokens = getattr(usage_obj, "completion_tokens", None) or chunks
+    usage = {
+        "estimated": usage_obj is None,
+        "prompt_tokens": getattr(usage_obj, "prompt_tokens", None),
+        "completion_tokens": completion_tokens,
+        "cached_tokens": cached_tokens(usage_obj),
+        "ttft_s": ttft,
+        "stopped_early": stopped_early,
+    }
+    metrics.incr("llm.completion_tokens", completion_tokens)
+    if stopped_early:
+        metrics.incr("llm.stopped_early")
+    if cancelled:
+        metrics.incr("llm.cancelled")
+        return {"text": "", "supports": [], "usage": usage, "cancelled": True}
+    return {"text": "".join(parts).strip(), "supports": [], "usage": usage, "cancelled": False}
\ No newline at end of file
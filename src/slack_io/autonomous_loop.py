@@ -3,19 +3,28 @@ Autonomous simulation loop that mimics slackbench_sim but posts to real Slack.
 This creates a hybrid: autonomous conversation generation + real Slack interaction.
 """
 import time, random, logging, threading
-from typing import List, Dict
-from .slack_client import app as bolt_app
+from typing import List, Dict, Optional
+from .slack_client import app as bolt_app, READ_CLIENT
 from .persona_registry import PERSONAS, CHANNEL_POLICY, CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
 from .agent_engine import generate_reply
-from .queue import ChannelQueue
+from .conductor import queue_for
+from .scheduler import SCHEDULER
+from .pacing import Pacer
+from .content_backlog import BACKLOG
+from .usage import LEDGER
 
 logger = logging.getLogger(__name__)
 
 # Track what's been posted to avoid duplicating
 posted_messages = {}  # track recent messages
 SIMULATION_HISTORY = []  # in-memory conversation history
+_HISTORY_LOCK = threading.Lock()
 
 TURN_INTERVAL_S = 25  # Reduced from 45s to 25s - more frequent messages
+# Per-channel target is this scaled by the channel's p_reply (or CHANNEL_POLICY "autonomous_per_min");
+# each channel's pacer adapts around it (see pacing.py)
+TARGET_TURNS_PER_MIN = 60 / TURN_INTERVAL_S
+PACERS: Dict[str, Pacer] = {}  # channel name -> pacer
 PERSONA_COOLDOWN_S = 30  # Reduced from 60s to 30s - more persona activity
 
 def _get_channel_id(channel_name: str) -> str:
@@ -23,7 +32,7 @@ def _get_channel_id(channel_name: str) -> str:
     if channel_name in CHANNEL_NAME_TO_ID:
         return CHANNEL_NAME_TO_ID[channel_name]
     try:
-        resp = bolt_app.client.conversations_list(types="public_channel,private_channel")
+        resp = READ_CLIENT.conversations_list(types="public_channel,private_channel")
         for ch in resp.get("channels", []):
             if ch["name"] == channel_name:
                 CHANNEL_ID_TO_NAME[ch["id"]] = ch["name"]
@@ -43,16 +52,28 @@ def _format_history_for_prompt(sim_history: List[Dict], channel: str, limit: int
         lines.append(f"[{user}] {text}")
     return "\n".join(lines[-limit:])
 
-def autonomous_turn():
-    """Generate and post one autonomous message (one simulation turn)"""
+def _append_history(entry: dict):
+    with _HISTORY_LOCK:
+        SIMULATION_HISTORY.append(entry)
+        # Trim history to keep it manageable (last 100 messages)
+        if len(SIMULATION_HISTORY) > 100:
+            SIMULATION_HISTORY[:] = SIMULATION_HISTORY[-100:]
+
+def _active_channels() -> List[str]:
+    return [ch for ch, pol in CHANNEL_POLICY.items() if pol.get("p_reply", 0) > 0.3]
+
+def autonomous_turn(channel_name: Optional[str] = None):
+    """Generate and post one autonomous message (one simulation turn).
+
+    With no channel given, a random active channel is used.
+    """
     try:
-        # Pick a random active channel
-        active_channels = [ch for ch, pol in CHANNEL_POLICY.items() if pol.get("p_reply", 0) > 0.3]
-        if not active_channels:
-            logger.info("[AUTONOMOUS] No active channels available")
-            return
-        
-        channel_name = random.choice(active_channels)
+        if channel_name is None:
+            active_channels = _active_channels()
+            if not active_channels:
+                logger.info("[AUTONOMOUS] No active channels available")
+                return
+            channel_name = random.choice(active_channels)
         channel_id = _get_channel_id(channel_name)
         
         if not channel_id:
@@ -63,6 +84,9 @@ def autonomous_turn():
         policy = CHANNEL_POLICY.get(channel_name)
         if not policy:
             return
+        if not LEDGER.budget_scale(channel_name):
+            logger.info(f"[AUTONOMOUS] Token budget for #{channel_name} is spent; skipping turn")
+            return
         
         eligible_personas = [p for p in policy.get("candidates", [])]
         if not eligible_personas:
@@ -71,35 +95,35 @@ def autonomous_turn():
         # Pick a persona
         persona = random.choice(eligible_personas)
         persona_cfg = PERSONAS[persona]
+        username = persona_cfg["username"]
+        icon = persona_cfg["icon"]
         
-        # Decide if this is a new message or reply to thread
-        is_reply = len(SIMULATION_HISTORY) > 0 and random.random() < 0.6
+        # Decide if this is a new message or reply to thread (threads must be in this channel)
+        with _HISTORY_LOCK:
+            recent = [m for m in SIMULATION_HISTORY if m.get("channel") == channel_name][-5:]
+        is_reply = len(recent) > 0 and random.random() < 0.6
         
-        if is_reply and SIMULATION_HISTORY:
+        if is_reply:
             # Reply to recent message
-            recent_msg = random.choice(SIMULATION_HISTORY[-5:])
+            recent_msg = random.choice(recent)
             thread_ts = recent_msg.get("thread_ts") or recent_msg.get("ts")
             parent_text = recent_msg.get("text", "")
             
-            # Generate reply
-            context = _format_history_for_prompt(SIMULATION_HISTORY, channel_name, limit=8)
-            
             # Use the agent engine to generate reply
             result = generate_reply(
                 persona, 
                 channel_name, 
                 channel_id,
                 f"In response to: {parent_text[:150]}", 
-                thread_ts=thread_ts
+                thread_ts=thread_ts,
+                producer="autonomous"
             )
             
             post_text = result["text"]
             
-            # Post to Slack in thread
-            username = persona_cfg["username"]
-            icon = persona_cfg["icon"]
-            
-            bolt_app.client.chat_postMessage(
+            # Post to Slack in thread, through the channel's shared rate-limited queue
+            queue_for(channel_id).enqueue(
+                bolt_app.client.chat_postMessage,
                 channel=channel_id,
                 text=post_text,
                 username=username,
@@ -110,7 +134,7 @@ def autonomous_turn():
             logger.info(f"[AUTONOMOUS] {persona} replied in thread in #{channel_name}")
             
             # Add to simulation history
-            SIMULATION_HISTORY.append({
+            _append_history({
                 "user": username,
                 "text": post_text,
                 "channel": channel_name,
@@ -120,73 +144,82 @@ def autonomous_turn():
             })
             
         else:
-            # New top-level message
-            context = _format_history_for_prompt(SIMULATION_HISTORY, channel_name, limit=6)
-            
-            # Generate a proactive message based on role
-            from .agent_engine import _get_role_guidance
-            
-            role = persona_cfg.get("role", "")
-            guidance = _get_role_guidance(role)
-            prompt = f"Contribute to the channel discussion with your perspective."
-            
-            result = generate_reply(
-                persona,
-                channel_name,
-                channel_id,
-                prompt,  # Simple, natural prompt
-                thread_ts=None
-            )
-            
-            post_text = result["text"]
-            
-            # Post to Slack
-            username = persona_cfg["username"]
-            icon = persona_cfg["icon"]
-            
-            resp = bolt_app.client.chat_postMessage(
+            # New top-level message: take a pre-generated one if the backlog has any for this channel
+            item = BACKLOG.pop("root", channel_name)
+            if item and item["persona"] in PERSONAS:
+                persona = item["persona"]
+                username = PERSONAS[persona]["username"]
+                icon = PERSONAS[persona]["icon"]
+                post_text = item["text"]
+            else:
+                prompt = f"Contribute to the channel discussion with your perspective."
+                
+                result = generate_reply(
+                    persona,
+                    channel_name,
+                    channel_id,
+                    prompt,  # Simple, natural prompt
+                    thread_ts=None,
+                    producer="autonomous"
+                )
+                
+                post_text = result["text"]
+            
+            # Post to Slack; the new message's ts is only known once the queue has sent it
+            fut = queue_for(channel_id).enqueue(
+                bolt_app.client.chat_postMessage,
                 channel=channel_id,
                 text=post_text,
                 username=username,
                 icon_emoji=icon
             )
             
-            ts = resp["ts"]
-            
-            logger.info(f"[AUTONOMOUS] {persona} posted new message in #{channel_name}")
-            
-            # Add to simulation history
-            SIMULATION_HISTORY.append({
-                "user": username,
-                "text": post_text,
-                "channel": channel_name,
-                "thread_ts": ts,
-                "ts": ts,
-                "timestamp": time.time()
-            })
-        
-        # Trim history to keep it manageable (last 100 messages)
-        if len(SIMULATION_HISTORY) > 100:
-            SIMULATION_HISTORY[:] = SIMULATION_HISTORY[-100:]
+            def _record(f):
+                if f.exception():
+                    logger.error(f"[AUTONOMOUS] Post in #{channel_name} failed: {f.exception()}")
+                    return
+                ts = f.result()["ts"]
+                logger.info(f"[AUTONOMOUS] {persona} posted new message in #{channel_name}")
+                _append_history({
+                    "user": username,
+                    "text": post_text,
+                    "channel": channel_name,
+                    "thread_ts": ts,
+                    "ts": ts,
+                    "timestamp": time.time()
+                })
+            
+            if fut:
+                fut.add_done_callback(_record)
             
     except Exception as e:
         logger.error(f"[AUTONOMOUS] Error in autonomous turn: {e}", exc_info=True)
 
+def _pacer_for(channel_name: str) -> Pacer:
+    if channel_name not in PACERS:
+        policy = CHANNEL_POLICY.get(channel_name, {})
+        target = policy.get("autonomous_per_min", TARGET_TURNS_PER_MIN * policy.get("p_reply", 0.5))
+        PACERS[channel_name] = Pacer(target, channel=channel_name)
+    return PACERS[channel_name]
+
 def start_autonomous_loop():
-    """Start the autonomous simulation loop in a background thread"""
-    def run_loop():
-        logger.info("[AUTONOMOUS] Starting autonomous conversation loop")
-        while True:
-            try:
-                time.sleep(TURN_INTERVAL_S)
-                autonomous_turn()
-            except Exception as e:
-                logger.error(f"[AUTONOMOUS] Error in loop: {e}", exc_info=True)
-                time.sleep(5)  # Brief pause before retry
-    
-    thread = threading.Thread(target=run_loop, daemon=True)
-    thread.start()
-    logger.info(f"[AUTONOMOUS] Autonomous loop started (turn interval: {TURN_INTERVAL_S}s)")
+    """Register the autonomous simulation with the scheduler.
+
+    Every active channel is its own job with its own cadence (one adaptive
+    pacer per channel); turns run concurrently on the shared priority pool,
+    and a channel whose previous turn is still running skips its slot.
+    """
+    channels = _active_channels()
+    for channel_name in channels:
+        SCHEDULER.add(
+            f"autonomous:{channel_name}",
+            lambda ch=channel_name: autonomous_turn(ch),
+            _pacer_for(channel_name).next_interval,
+            # Lowest-priority producer: human replies preempt it on the shared pool
+            priority="autonomous",
+        )
+    total = sum(_pacer_for(ch).target_per_min for ch in channels)
+    logger.info(f"[AUTONOMOUS] Autonomous loop started ({len(channels)} channels, target: {total:.1f} turns/min)")
 
 def add_real_message_to_history(event: dict):
     """Add a real Slack message to the simulation history (for hybrid mode)"""
@@ -200,7 +233,7 @@ def add_real_message_to_history(event: dict):
         # Get channel name
         channel_name = CHANNEL_ID_TO_NAME.get(channel_id, channel_id)
         
-        SIMULATION_HISTORY.append({
+        _append_history({
             "user": user,
             "text": text,
             "channel": channel_name,
@@ -209,10 +242,6 @@ def add_real_message_to_history(event: dict):
             "timestamp": time.time(),
             "real": True  # Mark as real message
         })
-        
-        # Trim if needed
-        if len(SIMULATION_HISTORY) > 100:
-            SIMULATION_HISTORY[:] = SIMULATION_HISTORY[-100:]
             
     except Exception as e:
         logger.error(f"[AUTONOMOUS] Error adding message to history: {e}", exc_info=True)
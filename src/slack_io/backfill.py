@@ -0,0 +1,214 @@
+"""
+Bulk backfill of a new workspace from a conversation corpus.
+
+The corpus is JSONL, one message per line:
+
+    {"id": "m1", "channel": "eng-backend", "persona": "Mike_BE", "text": "..."}
+    {"id": "m2", "channel": "eng-backend", "persona": "Kevin_QA", "text": "...", "thread_id": "m1"}
+
+`thread_id` is the source id of the message being replied to (a reply to a
+reply is posted in the root's thread); lines without one are thread roots.
+`username`/`icon` can stand in for `persona` for authors outside PERSONAS.
+
+Every channel is posted by its own worker, roots first and then replies, in
+corpus order, each at chat.postMessage's per-channel limit (about one message
+a second), so a corpus spread over N channels posts about N times faster than
+one-by-one. Each post is appended to the id map (`<source id> -> new ts`) as
+soon as Slack returns it; the map doubles as the checkpoint, so a rerun skips
+everything already posted and threads resume under their original roots.
+
+    python -m slack_io.backfill corpus.jsonl --map data/backfill/corpus.map.jsonl
+"""
+import os, json, time, argparse, threading, logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from . import metrics
+from .ratelimit import KeyedRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# knobs
+BACKFILL_DIR = os.getenv("BACKFILL_DIR", "data/backfill")
+BACKFILL_WORKERS = 8        # channels posted at once
+POST_PER_S = 1.0            # chat.postMessage allowance per channel (Slack: ~1/s, short bursts tolerated)
+POST_BURST = 1
+
+POST_LIMITER = KeyedRateLimiter(rate=POST_PER_S, capacity=POST_BURST)
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Corpus messages in file order; blank lines are skipped, duplicate ids are an error."""
+    messages, seen = [], set()
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            msg = json.loads(line)
+            for field in ("id", "channel", "text"):
+                if field not in msg:
+                    raise ValueError(f"{path}:{lineno}: missing {field!r}")
+            msg["id"] = str(msg["id"])
+            if msg["id"] in seen:
+                raise ValueError(f"{path}:{lineno}: duplicate id {msg['id']!r}")
+            seen.add(msg["id"])
+            messages.append(msg)
+    return messages
+
+
+def plan(messages: List[Dict]) -> Dict[str, List[Dict]]:
+    """Channel name -> messages in posting order (roots, then replies), each with its root's source id.
+
+    Replies whose thread can't be traced to a root in the same channel are dropped with a warning.
+    """
+    by_id = {m["id"]: m for m in messages}
+
+    def root_of(msg):
+        seen = set()
+        while msg.get("thread_id") and msg["id"] not in seen:
+            seen.add(msg["id"])
+            parent = by_id.get(str(msg["thread_id"]))
+            if parent is None:
+                return None
+            msg = parent
+        return None if msg["id"] in seen else msg
+
+    roots: Dict[str, List[Dict]] = {}
+    replies: Dict[str, List[Dict]] = {}
+    orphans = 0
+    for msg in messages:
+        if not msg.get("thread_id"):
+            roots.setdefault(msg["channel"], []).append(dict(msg, root=None))
+            continue
+        root = root_of(msg)
+        if root is None or root["channel"] != msg["channel"]:
+            orphans += 1
+            continue
+        replies.setdefault(msg["channel"], []).append(dict(msg, root=root["id"]))
+    if orphans:
+        logger.warning(f"[BACKFILL] Dropping {orphans} replies with no root in their channel")
+        metrics.incr("backfill.orphans", orphans)
+    return {ch: roots.get(ch, []) + replies.get(ch, []) for ch in dict.fromkeys(m["channel"] for m in messages)}
+
+
+def author(msg: Dict) -> Dict:
+    """username/icon_emoji for a corpus message (the persona's, unless the line overrides them)."""
+    from .persona_registry import PERSONAS
+    cfg = PERSONAS.get(msg.get("persona"), {})
+    return {"username": msg.get("username") or cfg.get("username") or msg.get("persona") or "backfill",
+            "icon_emoji": msg.get("icon") or cfg.get("icon")}
+
+
+class Backfill:
+    def __init__(self, map_path: str, workers: int = BACKFILL_WORKERS, limiter: KeyedRateLimiter = POST_LIMITER):
+        self.map_path = map_path
+        self.workers = workers
+        self.limiter = limiter
+        self.ts_map: Dict[str, str] = self._load_map()
+        self._map_lock = threading.Lock()
+        self.stats = {"posted": 0, "skipped": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def _load_map(self) -> Dict[str, str]:
+        ts_map = {}
+        if os.path.exists(self.map_path):
+            offset = 0
+            with open(self.map_path, "r+b") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line) if line.endswith(b"\n") else None
+                    except ValueError:
+                        entry = None
+                    if entry is None:
+                        break  # torn last line from a crash; that post is redone
+                    ts_map[entry["id"]] = entry["ts"]
+                    offset += len(line)
+                # cut the torn line off, or the next append would extend it into one corrupt
+                # line that hides every entry after it on the following resume
+                f.truncate(offset)
+            logger.info(f"[BACKFILL] Resuming: {len(ts_map)} messages already posted")
+        return ts_map
+
+    def _record(self, source_id: str, channel_id: str, ts: str):
+        line = json.dumps({"id": source_id, "channel": channel_id, "ts": ts}) + "\n"
+        with self._map_lock:
+            self.ts_map[source_id] = ts
+            with open(self.map_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+        for k, v in deltas.items():
+            metrics.incr(f"backfill.{k}", v)
+
+    def _post_channel(self, channel_id: str, channel_name: str, messages: List[Dict]):
+        from .slack_client import call_api
+        from slack_sdk.errors import SlackApiError
+        key = f"chat.postMessage:{channel_id}"
+        for msg in messages:
+            if msg["id"] in self.ts_map:
+                self._count(skipped=1)
+                continue
+            args = dict(channel=channel_id, text=msg["text"], **author(msg))
+            if msg["root"]:
+                thread_ts = self.ts_map.get(msg["root"])
+                if not thread_ts:
+                    self._count(failed=1)  # its root failed to post
+                    continue
+                args["thread_ts"] = thread_ts
+            if not args["icon_emoji"]:
+                del args["icon_emoji"]
+            try:
+                resp = call_api("chat.postMessage", key=key, limiter=self.limiter, **args)
+            except SlackApiError as e:
+                logger.error(f"[BACKFILL] #{channel_name} {msg['id']}: {e.response.get('error')}")
+                self._count(failed=1)
+                continue
+            self._record(msg["id"], channel_id, resp["ts"])
+            self._count(posted=1)
+        logger.info(f"[BACKFILL] #{channel_name} done")
+
+    def run(self, plan_by_channel: Dict[str, List[Dict]], channels: Dict[str, str]) -> Dict:
+        """Post a plan (channel name -> ordered messages) into channels (id -> name); returns counts and throughput."""
+        os.makedirs(os.path.dirname(self.map_path) or ".", exist_ok=True)
+        ids = {name: cid for cid, name in channels.items()}
+        missing = [name for name in plan_by_channel if name not in ids]
+        if missing:
+            logger.warning(f"[BACKFILL] Skipping channels not in the workspace: {missing}")
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="backfill") as pool:
+            futures = [pool.submit(self._post_channel, ids[name], name, msgs)
+                       for name, msgs in plan_by_channel.items() if name in ids]
+            for fut in futures:
+                fut.result()
+        elapsed = time.time() - t0
+        out = dict(self.stats, elapsed_s=round(elapsed, 2))
+        out["posts_per_s"] = round(out["posted"] / max(elapsed, 1e-9), 2)
+        return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill a workspace from a JSONL conversation corpus")
+    parser.add_argument("corpus", help="JSONL corpus (id, channel, persona, text, thread_id)")
+    parser.add_argument("--map", help="Source id -> ts map, also the checkpoint (default: <BACKFILL_DIR>/<corpus>.map.jsonl)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="Channels posted at once")
+    parser.add_argument("--rate", type=float, default=POST_PER_S, help="Posts per second per channel")
+    parser.add_argument("--restart", action="store_true", help="Ignore the map and post everything again")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from .slack_client import resolve_channels
+    map_path = args.map or os.path.join(BACKFILL_DIR, os.path.splitext(os.path.basename(args.corpus))[0] + ".map.jsonl")
+    if args.restart and os.path.exists(map_path):
+        os.remove(map_path)
+    posting = plan(load_corpus(args.corpus))
+    limiter = KeyedRateLimiter(rate=args.rate, capacity=POST_BURST)
+    backfill = Backfill(map_path, args.workers, limiter)
+    print(json.dumps(backfill.run(posting, resolve_channels(list(posting))), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 from dotenv import load_dotenv
 from .slack_client import app as bolt_app
 from .conductor import maybe_handle_event
+from .ingest import accept_event
+from .event_log import record_event
+from .coalesce import READS
+from .memdiag import MEMDIAG, start_memory_diagnostics
+from .usage import start_usage_reporting
 from .persona_registry import CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
 from .seed_scheduler import start_seeders
 from .autonomous_loop import start_autonomous_loop, add_real_message_to_history
@@ -44,6 +49,12 @@ def handle_message_events(body, event, logger, say):
     username = event.get("username", "unknown")
     text_preview = event.get("text", "")[:50]
     logger.info(f"[BOLT] Received message - Channel: {ch}, TS: {ts}, Subtype: {subtype}, User: {username}, Text: {text_preview}...")
+    record_event(event, body, "message")
+    READS.invalidate(event.get("channel"))
+    
+    # Both listeners see bot messages and Slack may redeliver; only act once
+    if not accept_event(event, body, source="message"):
+        return
     
     # Add to autonomous history if it's a real message
     add_real_message_to_history(event)
@@ -59,6 +70,10 @@ def handle_message_events(body, event, logger, say):
 def handle_bot_messages(body, event, logger, say):
     # This will catch bot messages that might be skipped by the regular message handler
     logger.info(f"[BOLT] Received bot message - Channel: {event.get('channel')}, User: {event.get('username')}")
+    record_event(event, body, "bot_message")
+    READS.invalidate(event.get("channel"))
+    if not accept_event(event, body, source="bot_message"):
+        return
     try:
         maybe_handle_event(event)
     except Exception as e:
@@ -102,6 +117,10 @@ def run_socket_mode():
     # Load channel maps at startup
     load_channel_maps(app, logging.getLogger(__name__))
 
+    if MEMDIAG:
+        start_memory_diagnostics()
+    start_usage_reporting()
+
     # Start autonomous simulation loop (like slackbench_sim)
     start_autonomous_loop()
     
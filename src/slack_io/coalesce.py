@@ -0,0 +1,132 @@
+"""
+Single-flight coalescing for Slack reads.
+
+Several repliers scheduled on one thread, the autonomous loop and the digest
+helpers often ask for the same history/replies at the same moment. Identical
+reads (same method and arguments) share one in-flight request, and a result
+is reused for READ_FRESH_S afterwards. Any new message in a channel (an
+incoming event or one of our own posts) drops the channel's fresh results, so
+the window never hides a message we know about; a read that started before
+such a message is shared with concurrent callers but not kept.
+
+`READ_CLIENT` is a drop-in for `app.client` whose read methods are coalesced.
+Counters: `slack.read.requests.<method>`, `slack.read.calls.<method>` (sent to
+Slack), `slack.read.coalesced.inflight|fresh`; gauge `slack.read.dedup_ratio`.
+"""
+import time, threading, logging
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+READ_FRESH_S = 1.0          # how long a finished read is reused (0 = only share in-flight requests)
+READ_MAX_ENTRIES = 512      # fresh results kept at once
+READ_METHODS = ("conversations.history", "conversations.replies", "conversations.info",
+                "conversations.list", "users.info")
+
+
+class Coalescer:
+    def __init__(self, fresh_s: float = READ_FRESH_S, max_entries: int = READ_MAX_ENTRIES):
+        self.fresh_s = fresh_s
+        self.max_entries = max_entries
+        self._inflight: Dict[tuple, Future] = {}
+        self._fresh: Dict[tuple, tuple] = {}        # key -> (finished at, channel, result)
+        self._generation: Dict[str, int] = {}      # channel -> messages seen; a read spanning a change isn't kept
+        self._requests = 0
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def _count(self, method: str, outcome: str):
+        metrics.incr(f"slack.read.requests.{method}")
+        if outcome == "call":
+            metrics.incr(f"slack.read.calls.{method}")
+        else:
+            metrics.incr(f"slack.read.coalesced.{outcome}")
+        with self._lock:
+            self._requests += 1
+            self._calls += outcome == "call"
+            ratio = 1 - self._calls / self._requests
+        metrics.gauge("slack.read.dedup_ratio", round(ratio, 4))
+
+    def call(self, method: str, fn: Callable, **kwargs):
+        """fn(**kwargs), unless an identical read is in flight or finished within the freshness window."""
+        key = (method,) + tuple(sorted(kwargs.items()))
+        channel = kwargs.get("channel")
+        now = time.time()
+        with self._lock:
+            hit = self._fresh.get(key)
+            if hit and now - hit[0] <= self.fresh_s:
+                outcome, fut = "fresh", None
+            elif key in self._inflight:
+                outcome, fut = "inflight", self._inflight[key]
+            else:
+                outcome, fut = "call", Future()
+                self._inflight[key] = fut
+                generation = self._generation.get(channel, 0)
+        self._count(method, outcome)
+        if outcome == "fresh":
+            return hit[2]
+        if outcome == "inflight":
+            return fut.result()
+
+        try:
+            result = fn(**kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(key, None)
+            if self.fresh_s > 0 and self._generation.get(channel, 0) == generation:
+                if len(self._fresh) >= self.max_entries:
+                    self._expire(time.time())
+                self._fresh[key] = (time.time(), channel, result)
+        fut.set_result(result)
+        return result
+
+    def _expire(self, now: float):
+        for key in [k for k, (t, _, _) in self._fresh.items() if now - t > self.fresh_s]:
+            del self._fresh[key]
+        while len(self._fresh) >= self.max_entries:
+            del self._fresh[next(iter(self._fresh))]
+
+    def invalidate(self, channel: Optional[str]):
+        """A message landed in `channel`: its cached reads are stale."""
+        if not channel:
+            return
+        with self._lock:
+            self._generation[channel] = self._generation.get(channel, 0) + 1
+            for key in [k for k, (_, ch, _) in self._fresh.items() if ch == channel]:
+                del self._fresh[key]
+
+    def clear(self):
+        with self._lock:
+            self._fresh.clear()
+            self._generation.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"requests": self._requests, "calls": self._calls, "inflight": len(self._inflight),
+                    "fresh": len(self._fresh),
+                    "dedup_ratio": round(1 - self._calls / self._requests, 4) if self._requests else 0.0}
+
+
+READS = Coalescer()
+
+
+class CoalescedClient:
+    """Passes everything through to the client from `get_client`, coalescing READ_METHODS."""
+
+    def __init__(self, get_client: Callable, coalescer: Coalescer = READS):
+        self._get_client = get_client
+        self._coalescer = coalescer
+
+    def __getattr__(self, name: str):
+        fn = getattr(self._get_client(), name)
+        method = name.replace("_", ".", 1)
+        if method not in READ_METHODS:
+            return fn
+        return lambda **kwargs: self._coalescer.call(method, fn, **kwargs)
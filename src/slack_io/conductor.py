@@ -1,10 +1,17 @@
 # conductor.py
-import time, random, json, logging
+import time, random, json, logging, threading
 from typing import Dict, List
-from .slack_client import app as bolt_app
-from .persona_registry import PERSONAS, CHANNEL_POLICY, CHANNEL_ID_TO_NAME
+from .slack_client import app as bolt_app, READ_CLIENT
+from .persona_registry import PERSONAS, CHANNEL_POLICY, CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
 from .agent_engine import generate_reply
 from .queue import ChannelQueue
+from .admission import ADMISSION, START_RETRY_S
+from .priority import POOL
+from .pacing import note_human_activity
+from .persona_router import ROUTER
+from . import reply_gate, metrics
+from .usage import LEDGER
+from .speculation import SPECULATOR, SPEC_MIN_P_REPLY, SPEC_TOP_K
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +27,28 @@ MIN_DELAY_S, MAX_DELAY_S = 1, 3         # Reduced from 2-8s to 1-3s for faster r
 PERSONA_COOLDOWN_S = 12                 # Reduced from 25s to 12s for more activity
 SELF_REPLY_GRACE_S = 2                  # Reduced from 4s to 2s for quicker replies
 MAX_ACTIVE_THREADS = 8                  # Increased from 5 to 8 for more concurrent threads
+THREAD_STATE_TTL_S = 6 * 3600           # forget threads idle this long (the process runs for days)
+STATE_PRUNE_EVERY_S = 300
 
 # Proactive posting (to create more conversation opportunities)
 PROACTIVE_POST_INTERVAL_S = 90  # Reduced from 180s to 90s - check every 1.5 minutes
 LAST_PROACTIVE_CHECK = 0  # Last time we checked for proactive posts
+LAST_STATE_PRUNE = 0
 
-def _queue_for(channel_id: str) -> ChannelQueue:
-    if channel_id not in CHANNEL_QUEUES:
-        CHANNEL_QUEUES[channel_id] = ChannelQueue(bolt_app.client, cooldown=0.8)  # Reduced from 1.1s to 0.8s
-    return CHANNEL_QUEUES[channel_id]
+_QUEUES_LOCK = threading.Lock()
+
+def queue_for(channel_id: str) -> ChannelQueue:
+    """The shared rate-limited post queue for a channel (one per channel, for every producer)."""
+    with _QUEUES_LOCK:
+        if channel_id not in CHANNEL_QUEUES:
+            CHANNEL_QUEUES[channel_id] = ChannelQueue(bolt_app.client, cooldown=0.8)  # Reduced from 1.1s to 0.8s
+        return CHANNEL_QUEUES[channel_id]
 
 def _channel_name(channel_id: str) -> str:
     name = CHANNEL_ID_TO_NAME.get(channel_id)
     if name: return name
     try:
-        info = bolt_app.client.conversations_info(channel=channel_id)
+        info = READ_CLIENT.conversations_info(channel=channel_id)
         name = info["channel"]["name"]
         CHANNEL_ID_TO_NAME[channel_id] = name
         return name
@@ -57,6 +71,19 @@ def _update_state(thread_ts: str, persona: str, ts: float):
     st["last_ts"] = ts
     PERSONA_COOLDOWN[persona] = time.time() + PERSONA_COOLDOWN_S
 
+def _prune_state(now: float):
+    """Drop idle threads and expired cooldowns so the per-thread state stays bounded."""
+    global LAST_STATE_PRUNE
+    if now - LAST_STATE_PRUNE < STATE_PRUNE_EVERY_S:
+        return
+    LAST_STATE_PRUNE = now
+    for thread_ts, st in list(THREAD_STATE.items()):
+        if now - st["last_ts"] > THREAD_STATE_TTL_S:
+            THREAD_STATE.pop(thread_ts, None)
+    for persona, until in list(PERSONA_COOLDOWN.items()):
+        if until < now:
+            PERSONA_COOLDOWN.pop(persona, None)
+
 def _count_active_threads(channel_id: str, within_seconds: float = 60) -> int:
     """Count threads that have been active recently in this channel"""
     now = time.time()
@@ -91,9 +118,11 @@ def _should_skip(event: dict) -> bool:
 
 def _fanout_count(ch_name: str) -> int:
     # 1–3 responders based on channel “busyness”
-    if ch_name in ("sre-ops","eng-backend","deployments"): return random.choice([1,2,2,3])
-    if ch_name in ("product","qa-testing","eng-frontend"): return random.choice([1,2])
-    return 1
+    if ch_name in ("sre-ops","eng-backend","deployments"): n = random.choice([1,2,2,3])
+    elif ch_name in ("product","qa-testing","eng-frontend"): n = random.choice([1,2])
+    else: n = 1
+    # fewer responders as the channel nears its token budget
+    return max(1, round(n * LEDGER.budget_scale(ch_name)))
 
 def maybe_handle_event(event: dict):
     logger.info(f"{'='*60}")
@@ -106,6 +135,9 @@ def maybe_handle_event(event: dict):
     logger.info(f"[CONDUCTOR] Username: {event.get('username')}")
     logger.info(f"{'='*60}")
     
+    received_at = time.time()
+    _prune_state(received_at)
+
     # Periodically check if we should trigger proactive posts
     maybe_trigger_proactive_post()
     
@@ -114,6 +146,7 @@ def maybe_handle_event(event: dict):
     text = event.get("text","") or ""
     thread_ts = event.get("thread_ts") or ts
     ch_name = _channel_name(channel_id)
+    SPECULATOR.note_message(thread_ts, ts)
     
     # Only skip if this is a known non-persona bot message
     # We WANT personas to be able to reply to each other
@@ -138,6 +171,9 @@ def maybe_handle_event(event: dict):
         # If no clear indicator, be permissive and allow it
         else:
             logger.info(f"[CONDUCTOR] Ambiguous bot message, allowing: subtype={subtype}, username={username}, user={user}")
+    elif username not in persona_usernames:
+        # Real people are talking here; autonomous pacing eases off
+        note_human_activity(ch_name)
     
 
     # Gate by channel policy & reply probability
@@ -145,8 +181,9 @@ def maybe_handle_event(event: dict):
     if not policy:
         logger.info(f"[CONDUCTOR] No policy for #{ch_name} ({channel_id})")
         return
-    if random.random() > policy["p_reply"]:
-        logger.info(f"[CONDUCTOR] Random skip (p_reply threshold)")
+    budget_scale = LEDGER.budget_scale(ch_name)
+    if random.random() > policy["p_reply"] * budget_scale:
+        logger.info(f"[CONDUCTOR] Random skip (p_reply threshold{f', budget scale {budget_scale:.2f}' if budget_scale < 1 else ''})")
         return
     if _should_skip(event):
         return
@@ -182,7 +219,21 @@ def maybe_handle_event(event: dict):
         logger.info(f"[CONDUCTOR] Persona cooldowns: {[(p, round(PERSONA_COOLDOWN.get(p, 0) - time.time(), 1)) for p in PERSONAS if PERSONA_COOLDOWN.get(p, 0) > time.time()]}")
         return
 
-    repliers = random.sample(eligible, k=min(n_repliers, len(eligible)))
+    # Skip acks, emoji and join noise before spending any LLM calls on them
+    decision = reply_gate.evaluate(text, subtype, threshold=policy.get("reply_threshold", reply_gate.REPLY_THRESHOLD))
+    planned = min(n_repliers, len(eligible))
+    reply_gate.record(decision, planned)
+    if not decision.reply:
+        logger.info(f"[CONDUCTOR] Reply gate skip ({decision.reason}, score={decision.score:.2f})")
+        return
+    if decision.addressed:
+        n_repliers = 1
+    else:
+        # high-scoring messages draw more than the channel's usual fan-out, never fewer
+        n_repliers = max(n_repliers, max(1, round(decision.responders * LEDGER.budget_scale(ch_name))))
+
+    # Weighted by how well each persona's profile matches the message
+    repliers = ROUTER.sample(text, eligible, k=min(n_repliers, len(eligible)))
     logger.info(f"[CONDUCTOR] Selected {len(repliers)} repliers: {repliers}")
 
     # For each chosen persona, generate + post with small staggered delay
@@ -193,10 +244,16 @@ def maybe_handle_event(event: dict):
     logger.info(f"[CONDUCTOR] Scheduling {len(repliers)} replies")
     logger.info(f"[CONDUCTOR] is_thread: {is_thread}, original_ts: {original_ts}")
     
-    for i, persona in enumerate(repliers):
+    # Reserve slots up front so queued work is visible to admission control
+    kind = "persona" if sender_is_persona else "human"
+    jobs = [(persona, ADMISSION.admit(ch_name, kind)) for persona in repliers]
+    jobs = [(persona, job) for persona, job in jobs if job]
+    
+    for i, (persona, job) in enumerate(jobs):
         delay = random.uniform(MIN_DELAY_S, MAX_DELAY_S) + i * 0.5  # Reduced stagger from 1.2s to 0.5s
         logger.info(f"[CONDUCTOR] Scheduling {persona} with {delay:.1f}s delay, is_thread={is_thread}")
-        _schedule_reply(persona, ch_name, channel_id, text, original_ts, delay, is_thread)
+        _schedule_reply(persona, ch_name, channel_id, text, original_ts, delay, is_thread, job=job, kind=kind,
+                        received_at=received_at)
 
 
 def mark_persona_cooldown(persona: str, seconds: float = PERSONA_COOLDOWN_S):
@@ -210,23 +267,27 @@ def schedule_followups_for_thread(ch_name: str, channel_id: str, starter_persona
         return
     
     n = max_repliers or _fanout_count(ch_name)
-    repliers = random.sample(eligible, k=min(n, len(eligible)))
+    repliers = ROUTER.sample(event_text, eligible, k=min(n, len(eligible)))
+    jobs = [(persona, ADMISSION.admit(ch_name, "persona")) for persona in repliers]
+    jobs = [(persona, job) for persona, job in jobs if job]
 
-    for i, persona in enumerate(repliers):
+    for i, (persona, job) in enumerate(jobs):
         delay =  random.uniform(MIN_DELAY_S, MAX_DELAY_S) + i * 1.2
-        _schedule_reply(persona, ch_name, channel_id, event_text, thread_ts, delay, is_thread=True)
+        _schedule_reply(persona, ch_name, channel_id, event_text, thread_ts, delay, is_thread=True, job=job)
 
 def maybe_trigger_proactive_post():
     """Periodically have a persona post something new to keep conversations going"""
-    import time as time_module
     global LAST_PROACTIVE_CHECK
     
-    now = time_module.time()
+    now = time.time()
     if now - LAST_PROACTIVE_CHECK < PROACTIVE_POST_INTERVAL_S:
         return
     
     LAST_PROACTIVE_CHECK = now
-    
+    # Runs on the shared pool so the event handler never waits on the LLM
+    POOL.submit("proactive", _proactive_post)
+
+def _proactive_post():
     try:
         # Pick a random channel and persona
         active_channels = [ch for ch, pol in CHANNEL_POLICY.items() if pol.get("p_reply", 0) > 0.4]
@@ -234,7 +295,7 @@ def maybe_trigger_proactive_post():
             return
         
         ch_name = random.choice(active_channels)
-        ch_id = CHANNEL_ID_TO_NAME.get(ch_name)
+        ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
         if not ch_id:
             # Try to get it
             ch_id = _channel_name_inverse(ch_name)
@@ -249,6 +310,11 @@ def maybe_trigger_proactive_post():
             logger.info(f"[CONDUCTOR] No eligible personas for proactive post in {ch_name}")
             return
         
+        budget_scale = LEDGER.budget_scale(ch_name)
+        if budget_scale < 1 and random.random() > budget_scale:
+            logger.info(f"[CONDUCTOR] Skipping proactive post in {ch_name} (token budget)")
+            return
+
         persona = random.choice(eligible)
         
         # Generate a proactive message (e.g., status update, question, observation)
@@ -263,13 +329,13 @@ def maybe_trigger_proactive_post():
         prompt = random.choice(prompts)
         
         from .agent_engine import generate_reply
-        result = generate_reply(persona, ch_name, ch_id, prompt, thread_ts=None)
+        result = generate_reply(persona, ch_name, ch_id, prompt, thread_ts=None, producer="proactive")
         
         # Post it
         username = PERSONAS[persona]["username"]
         icon = PERSONAS[persona]["icon"]
         
-        _queue_for(ch_id).enqueue(
+        queue_for(ch_id).enqueue(
             bolt_app.client.chat_postMessage,
             channel=ch_id, text=result["text"], username=username, icon_emoji=icon
         )
@@ -292,7 +358,7 @@ def _channel_name_inverse(ch_name: str) -> str:
                 return ch_id
         
         # If not found, try the API
-        resp = bolt_app.client.conversations_list(types="public_channel,private_channel")
+        resp = READ_CLIENT.conversations_list(types="public_channel,private_channel")
         for ch in resp.get("channels", []):
             if ch["name"] == ch_name:
                 CHANNEL_ID_TO_NAME[ch["id"]] = ch["name"]
@@ -305,7 +371,7 @@ def _channel_name_inverse(ch_name: str) -> str:
 def _get_recent_digest(ch_id: str, limit: int = 8) -> str:
     """Get recent messages as a digest string"""
     try:
-        r = bolt_app.client.conversations_history(channel=ch_id, limit=limit)
+        r = READ_CLIENT.conversations_history(channel=ch_id, limit=limit)
         lines = []
         for m in reversed(r.get("messages", [])):
             if m.get("subtype") in {"message_changed", "channel_join", "channel_leave"}:
@@ -317,12 +383,64 @@ def _get_recent_digest(ch_id: str, limit: int = 8) -> str:
     except Exception:
         return ""
 
-def _schedule_reply(persona: str, ch_name: str, channel_id: str, event_text: str, thread_ts: str, delay_s: float, is_thread: bool = False):
+def _speculate_next(ch_name: str, channel_id: str, thread_ts: str, poster: str, text: str, post_future):
+    """After a persona posts in a thread, pre-generate replies from the likeliest next responders."""
+    if post_future.exception():
+        return
+    ts = (post_future.result() or {}).get("ts")
+    policy = CHANNEL_POLICY.get(ch_name)
+    # speculation is the first spend to go under budget pressure
+    if not ts or not policy or policy["p_reply"] < SPEC_MIN_P_REPLY or LEDGER.budget_scale(ch_name) < 1:
+        return
+    SPECULATOR.note_message(thread_ts, ts)
+    st = THREAD_STATE.get(thread_ts)
+    if st and st["turns"] >= MAX_TURNS_PER_THREAD:
+        return
+    if not reply_gate.evaluate(text, threshold=policy.get("reply_threshold", reply_gate.REPLY_THRESHOLD)).reply:
+        return
+    eligible = _eligible_personas(ch_name, [poster])
+    if not eligible:
+        return
+    scores = ROUTER.scores(text, eligible)
+    for i in scores.argsort()[::-1][:SPEC_TOP_K]:
+        persona = eligible[int(i)]
+        SPECULATOR.speculate(persona, thread_ts, ts, text, lambda cancel, persona=persona: generate_reply(
+            persona, ch_name, channel_id, text, thread_ts=thread_ts, should_cancel=cancel, producer="speculation"))
+
+def _schedule_reply(persona: str, ch_name: str, channel_id: str, event_text: str, thread_ts: str, delay_s: float, is_thread: bool = False, job=None, kind: str = "persona", received_at: float = None):
     def _do():
+        # Shed or expired while waiting: don't spend an LLM call on it
+        started = ADMISSION.start(job) if job else True
+        if started is None:
+            # no in-flight slot yet: wait in the pool, not on a worker
+            if POOL.submit(kind, _do, delay_s=START_RETRY_S) is None:
+                ADMISSION.cancel(job)
+            return
+        if not started:
+            logger.info(f"[CONDUCTOR] {persona} reply in #{ch_name} dropped by admission control ({job.state})")
+            return
+        try:
+            _generate_and_post()
+        finally:
+            if job:
+                ADMISSION.finish(job)
+
+    def _thread_full() -> bool:
+        st = THREAD_STATE.get(thread_ts)
+        return bool(st and st["turns"] >= MAX_TURNS_PER_THREAD)
+
+    def _generate_and_post():
         logger.info(f"[CONDUCTOR] {persona} replying {'in thread' if is_thread else 'top-level'} in #{ch_name}")
         
         # generate natural reply
-        out = generate_reply(persona, ch_name, channel_id, event_text, thread_ts=thread_ts if is_thread else None)
+        # A reply pre-generated while idle is used if the thread hasn't moved on since
+        out = SPECULATOR.take(persona, thread_ts, event_text) if is_thread else None
+        if out is None:
+            out = generate_reply(persona, ch_name, channel_id, event_text, thread_ts=thread_ts if is_thread else None,
+                                 should_cancel=_thread_full)
+        if out.get("cancelled"):
+            logger.info(f"[CONDUCTOR] {persona} reply cancelled mid-generation (thread {thread_ts} is full)")
+            return
         visible_text = out["text"]
 
         # post - only use thread_ts if this is actually a thread
@@ -330,16 +448,25 @@ def _schedule_reply(persona: str, ch_name: str, channel_id: str, event_text: str
         icon = PERSONAS[persona]["icon"]
         
         if is_thread:
-            _queue_for(channel_id).enqueue(
+            fut = queue_for(channel_id).enqueue(
                 bolt_app.client.chat_postMessage,
                 channel=channel_id, text=visible_text, username=username, icon_emoji=icon, thread_ts=thread_ts
             )
+            if fut and SPECULATOR.enabled:
+                fut.add_done_callback(lambda f: _speculate_next(ch_name, channel_id, thread_ts, persona, visible_text, f))
         else:
             # Top-level reply in channel
-            _queue_for(channel_id).enqueue(
+            fut = queue_for(channel_id).enqueue(
                 bolt_app.client.chat_postMessage,
                 channel=channel_id, text=visible_text, username=username, icon_emoji=icon
             )
+        if fut and received_at:
+            # event received -> reply posted, including the stagger delay and queueing; failed posts aren't replies
+            def _delivered(f):
+                if not f.cancelled() and f.exception() is None:
+                    metrics.observe("conductor.reply_latency_s", time.time() - received_at)
+                    metrics.incr(f"conductor.replies.{kind}")
+            fut.add_done_callback(_delivered)
         
         _update_state(thread_ts, persona, time.time())
         logger.info(f"[CONDUCTOR] {persona} posted reply")
@@ -347,14 +474,12 @@ def _schedule_reply(persona: str, ch_name: str, channel_id: str, event_text: str
         # (optional) local provenance log
         try:
             rec = {"t": time.time(), "persona": persona, "chan": ch_name, "thread_ts": thread_ts,
-                   "text": visible_text, "supports": supports}
+                   "text": visible_text, "supports": out.get("supports", []), "usage": out.get("usage")}
             with open("data/slack_runs_raw.jsonl","a",encoding="utf-8") as f:
                 f.write(json.dumps(rec)+"\n")
         except Exception:
             pass
 
-    # crude delay using the queue thread (non-blocking)
-    t0 = time.time()
-    while time.time() - t0 < delay_s:
-        time.sleep(0.2)
-    _do()
\ No newline at end of file
+    # stagger delay is handled by the pool; the caller returns immediately
+    if POOL.submit(kind, _do, delay_s=delay_s) is None and job:
+        ADMISSION.cancel(job)
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Pre-generated content backlog.
+
+For dataset runs, root posts (autonomous top-level messages, standups,
+announcements) don't need to be generated at post time. `generate()` produces
+them in bulk, many LLM calls in parallel, and appends them to a JSONL queue
+file; the seeders and the autonomous loop pop from it on their usual cadence
+and only fall back to live generation when it runs dry. Consumed item ids are
+appended to `<path>.consumed`, so a restart resumes where it left off.
+
+    python -m slack_io.content_backlog --roots 200 --standups 40 --announcements 20 --workers 16
+"""
+import os, json, time, uuid, random, argparse, threading, logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from .persona_registry import PERSONAS, CHANNEL_POLICY
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+BACKLOG_PATH = os.getenv("CONTENT_BACKLOG", "data/content_backlog.jsonl")
+GENERATE_WORKERS = 8        # parallel LLM calls during bulk generation
+
+# kind -> (channels, personas or None for the channel's candidates, goal)
+KINDS = {
+    "standup": (
+        ["eng-backend", "eng-frontend", "qa-testing", "product", "deployments", "design-ux"],
+        ["Gabriella_PM", "Tara_TPM", "Mike_BE", "Sarah_FE"],
+        "Kick off a quick standup thread. Ask for blockers and today’s focus.",
+    ),
+    "announcement": (
+        ["announcements"],
+        ["Tara_TPM", "Gabriella_PM"],
+        "Post a concise status update summarizing key decisions and next steps.",
+    ),
+    "root": (
+        None,  # every active channel (p_reply > 0.3), like the autonomous loop
+        None,
+        "Start a new discussion about something you're working on or noticed today.",
+    ),
+}
+
+class ContentBacklog:
+    """File-backed queue of ready-to-post items, indexed by (kind, channel)."""
+
+    def __init__(self, path: str = BACKLOG_PATH):
+        self.path = path
+        self.consumed_path = f"{path}.consumed"
+        self._queues: Dict[Tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        consumed = set()
+        if os.path.exists(self.consumed_path):
+            with open(self.consumed_path, "r", encoding="utf-8") as f:
+                consumed = {line.strip() for line in f if line.strip()}
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if item["id"] not in consumed:
+                    self._queues.setdefault((item["kind"], item["channel"]), deque()).append(item)
+
+    def add(self, items: List[Dict]):
+        """Append items to the queue file and make them available."""
+        if not items:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            for item in items:
+                self._queues.setdefault((item["kind"], item["channel"]), deque()).append(item)
+
+    def pop(self, kind: str, channel: Optional[str] = None, channels: Optional[Iterable[str]] = None,
+            consume: bool = True) -> Optional[Dict]:
+        """Take the oldest item of `kind` (for `channel`, one of `channels`, or any channel), or None.
+
+        With consume=False the item is only taken from memory; the caller marks it with `consume()`
+        once it is posted, or hands it back with `restore()`.
+        """
+        with self._lock:
+            if channel:
+                keys = [(kind, channel)]
+            else:
+                allowed = None if channels is None else set(channels)
+                keys = [k for k in self._queues if k[0] == kind and (allowed is None or k[1] in allowed)]
+            candidates = [self._queues[k] for k in keys if self._queues.get(k)]
+            if not candidates:
+                metrics.incr(f"backlog.empty.{kind}")
+                return None
+            q = min(candidates, key=lambda q: q[0]["created"])
+            item = q.popleft()
+            if consume:
+                self._consume(item)
+        metrics.incr(f"backlog.served.{kind}")
+        return item
+
+    def _consume(self, item: Dict):
+        with open(self.consumed_path, "a", encoding="utf-8") as f:
+            f.write(item["id"] + "\n")
+
+    def consume(self, item: Dict):
+        """Record a popped item as used, so a restart doesn't serve it again."""
+        with self._lock:
+            self._consume(item)
+
+    def restore(self, item: Dict):
+        """Put a popped, unconsumed item back at the head of its queue."""
+        with self._lock:
+            self._queues.setdefault((item["kind"], item["channel"]), deque()).appendleft(item)
+        metrics.incr(f"backlog.restored.{item['kind']}")
+
+    def depth(self, kind: Optional[str] = None) -> int:
+        with self._lock:
+            return sum(len(q) for (k, _), q in self._queues.items() if kind is None or k == kind)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out: Dict[str, int] = {}
+            for (kind, _), q in self._queues.items():
+                out[kind] = out.get(kind, 0) + len(q)
+            return out
+
+    def compact(self):
+        """Rewrite the queue file with only unconsumed items and clear the consumed list."""
+        with self._lock:
+            items = sorted((i for q in self._queues.values() for i in q), key=lambda i: i["created"])
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.path)
+            if os.path.exists(self.consumed_path):
+                os.remove(self.consumed_path)
+
+def _active_channels() -> List[str]:
+    return [ch for ch, pol in CHANNEL_POLICY.items() if pol.get("p_reply", 0) > 0.3]
+
+def plan(kind: str, n: int) -> List[Tuple[str, str]]:
+    """(channel, persona) pairs for n items of `kind`, spread round-robin over its channels."""
+    channels, personas, _ = KINDS[kind]
+    channels = channels or _active_channels()
+    out = []
+    for i in range(n):
+        ch = channels[i % len(channels)]
+        pool = personas or CHANNEL_POLICY.get(ch, {}).get("candidates", [])
+        out.append((ch, random.choice(pool)))
+    return out
+
+def _generate_one(kind: str, channel: str, persona: str) -> Dict:
+    from .agent_engine import client, MODEL, persona_system_prompt
+    from .usage import LEDGER, cached_tokens
+
+    goal = KINDS[kind][2]
+    sys = persona_system_prompt(persona, PERSONAS.get(persona, {}))
+    user = (f"Channel: #{channel}\n"
+            f"Goal: {goal}\n"
+            f"Rules:\n- Start a new thread (no replies).\n- No citations or IDs.\n"
+            f"Keep it concise (1-3 sentences).")
+    messages = [{"role": "system", "content": sys}, {"role": "user", "content": user}]
+    resp = client.chat.completions.create(
+        model=MODEL,
+        messages=messages,
+        temperature=0.8,  # a little more variety across a large batch
+        max_tokens=120,
+    )
+    usage = getattr(resp, "usage", None)
+    LEDGER.record(persona, channel, "backlog", {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_tokens": cached_tokens(usage),
+    }, messages=messages)
+    return {
+        "id": uuid.uuid4().hex,
+        "kind": kind,
+        "channel": channel,
+        "persona": persona,
+        "text": resp.choices[0].message.content.strip(),
+        "created": time.time(),
+        "usage": {"prompt_tokens": getattr(usage, "prompt_tokens", None),
+                  "completion_tokens": getattr(usage, "completion_tokens", None)},
+    }
+
+def generate(counts: Dict[str, int], backlog: "ContentBacklog" = None, workers: int = GENERATE_WORKERS,
+             flush_every: int = 20) -> int:
+    """Generate counts[kind] items per kind in parallel and append them to the backlog.
+
+    Results are flushed to disk every `flush_every` items, so an interrupted run keeps its work.
+    Returns the number of items added.
+    """
+    backlog = backlog or BACKLOG
+    jobs = [(kind, ch, persona) for kind, n in counts.items() for ch, persona in plan(kind, n)]
+    added, batch, failed = 0, [], 0
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(_generate_one, *job) for job in jobs]
+        for fut in as_completed(futures):
+            try:
+                batch.append(fut.result())
+            except Exception as e:
+                failed += 1
+                logger.error(f"[BACKLOG] Generation failed: {e}")
+                continue
+            if len(batch) >= flush_every:
+                backlog.add(batch)
+                added += len(batch)
+                batch = []
+    backlog.add(batch)
+    added += len(batch)
+    elapsed = time.time() - t0
+    logger.info(f"[BACKLOG] Generated {added} items in {elapsed:.1f}s ({added / max(elapsed, 1e-9):.1f}/s, {failed} failed)")
+    return added
+
+BACKLOG = ContentBacklog()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate root posts, standups and announcements")
+    parser.add_argument("--roots", type=int, default=0, help="Top-level posts for the autonomous loop")
+    parser.add_argument("--standups", type=int, default=0)
+    parser.add_argument("--announcements", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=GENERATE_WORKERS, help="Parallel LLM calls")
+    parser.add_argument("--compact", action="store_true", help="Drop consumed items from the queue file first")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.compact:
+        BACKLOG.compact()
+    generate({"root": args.roots, "standup": args.standups, "announcement": args.announcements},
+             workers=args.workers)
+    print(json.dumps(BACKLOG.stats()))
+
+if __name__ == "__main__":
+    main()
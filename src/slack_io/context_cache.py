@@ -0,0 +1,109 @@
+"""
+Incremental context fetching for reply generation.
+
+Keeps a window of the latest CTX_WINDOW messages per thread (or channel, for
+top-level posts) together with the newest `ts` seen. A repeat fetch asks Slack
+only for messages after that `ts` (`oldest`), merges them into the window and
+returns it oldest first, so a busy thread costs one near-empty page per reply
+instead of a 50-message download. Windows are refetched in full after
+CTX_CACHE_TTL_S (so edits and deletes eventually show up); expired ones are
+swept on every write and the least recently used are dropped beyond
+CTX_CACHE_MAX_KEYS, so the cache holds roughly the threads active in the last
+TTL. Only the CTX_FIELDS of each message are kept.
+"""
+import time, threading, logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+CTX_WINDOW = 50             # messages kept per thread/channel (and fetched on a full refresh)
+CTX_CACHE_TTL_S = 300       # full refetch after this long
+CTX_CACHE_MAX_KEYS = 256    # threads/channels cached at once
+CTX_FIELDS = ("ts", "user", "username", "text", "subtype", "thread_ts")  # what the prompt builders read
+
+
+def _ts(m: Dict) -> float:
+    return float(m.get("ts") or 0)
+
+
+def _trim(m: Dict) -> Dict:
+    return {k: m[k] for k in CTX_FIELDS if k in m}
+
+
+class ContextCache:
+    def __init__(self, window: int = CTX_WINDOW, ttl_s: float = CTX_CACHE_TTL_S, max_keys: int = CTX_CACHE_MAX_KEYS):
+        self.window = window
+        self.ttl_s = ttl_s
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()  # (channel, thread_ts) -> {msgs, newest, filled_at}
+        self._lock = threading.Lock()
+
+    def _read(self, client, channel_id: str, thread_ts: Optional[str], oldest: Optional[str]) -> List[Dict]:
+        args = {"channel": channel_id, "limit": self.window}
+        if oldest:
+            args["oldest"] = oldest
+        if not thread_ts:
+            # newest first: one page is the newest `window` messages, all the window can hold
+            return client.conversations_history(**args).get("messages", [])
+        # oldest first: page on, or a long gap would leave out the newest replies
+        msgs = []
+        while True:
+            r = client.conversations_replies(ts=thread_ts, **args)
+            msgs.extend(r.get("messages", []))
+            args["cursor"] = (r.get("response_metadata") or {}).get("next_cursor")
+            if not (r.get("has_more") and args["cursor"]):
+                return msgs
+
+    def fetch(self, client, channel_id: str, thread_ts: Optional[str] = None) -> List[Dict]:
+        """The latest window of a thread (or channel), oldest first."""
+        key = (channel_id, thread_ts)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry["filled_at"] > self.ttl_s:
+                entry = None
+            newest = entry["newest"] if entry else None
+        fresh = self._read(client, channel_id, thread_ts, newest)
+        metrics.incr("context.fetch.incremental" if newest else "context.fetch.full")
+        metrics.incr("context.messages_fetched", len(fresh))
+
+        with self._lock:
+            # a concurrent fetch may have merged messages meanwhile; merging by ts keeps both.
+            # A full refresh starts over so the window picks up edits.
+            current = self._entries.get(key) or entry
+            base = current["msgs"] if entry else []
+            merged = {m["ts"]: m for m in base}
+            merged.update((m["ts"], _trim(m)) for m in fresh if m.get("ts"))
+            msgs = sorted(merged.values(), key=_ts)[-self.window:]
+            if not msgs:
+                return []
+            filled_at = current["filled_at"] if entry else now
+            self._entries[key] = {"msgs": msgs, "newest": msgs[-1]["ts"], "filled_at": filled_at}
+            self._entries.move_to_end(key)
+            self._sweep(now)
+            return list(msgs)
+
+    def _sweep(self, now: float):
+        # least recently used first; an expired window would be refetched in full anyway
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if len(self._entries) <= self.max_keys and now - oldest["filled_at"] <= self.ttl_s:
+                return
+            self._entries.popitem(last=False)
+
+    def forget(self, channel_id: str, thread_ts: Optional[str] = None):
+        with self._lock:
+            self._entries.pop((channel_id, thread_ts), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+CONTEXT_CACHE = ContextCache()
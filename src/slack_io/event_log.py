@@ -0,0 +1,69 @@
+"""
+Compact log of the Slack events reaching the Bolt handlers.
+
+Set EVENT_LOG=path to append every event seen by `handle_message_events` and
+`handle_bot_messages` (before deduplication, so a replay exercises it too).
+The first line is a header with the channel map; each following line is
+`{"t": seconds since the first event, "src": handler, "id": event_id, "e": event}`
+with the event trimmed to the fields the app reads. `slack_io.replay` feeds a
+log back through the same handlers.
+"""
+import os, json, time, threading
+from typing import Dict, List, Optional, Tuple
+from .persona_registry import CHANNEL_ID_TO_NAME
+
+EVENT_LOG = os.getenv("EVENT_LOG")
+EVENT_FIELDS = ("type", "subtype", "channel", "ts", "thread_ts", "user", "username", "bot_id", "text", "client_msg_id")
+LOG_VERSION = 1
+
+def compact_event(event: dict) -> dict:
+    return {k: event[k] for k in EVENT_FIELDS if event.get(k) is not None}
+
+class EventRecorder:
+    def __init__(self, path: str):
+        self.path = path
+        self._t0: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, event: dict, body: dict, source: str):
+        now = time.time()
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            if self._t0 is None:
+                self._t0 = now
+                header = {"type": "header", "version": LOG_VERSION, "started": now, "channels": dict(CHANNEL_ID_TO_NAME)}
+                f.write(json.dumps(header) + "\n")
+            rec = {"t": round(now - self._t0, 3), "src": source, "id": (body or {}).get("event_id"), "e": compact_event(event)}
+            f.write(json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+RECORDER = EventRecorder(EVENT_LOG) if EVENT_LOG else None
+
+def record_event(event: dict, body: dict, source: str):
+    if RECORDER:
+        RECORDER.record(event, body, source)
+
+def read_log(path: str) -> Tuple[Dict, List[Dict], int]:
+    """Return (header, records, torn lines skipped) of an event log; a log may hold several recording sessions."""
+    header: Dict = {}
+    records: List[Dict] = []
+    offset = 0.0
+    torn = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                torn += 1  # a recorder killed mid-write; the next session starts on a fresh line
+                continue
+            if rec.get("type") == "header":
+                if not header:
+                    header = rec
+                else:
+                    # later session: keep its events after the earlier ones on the same timeline
+                    offset = rec["started"] - header["started"]
+                    header["channels"].update(rec.get("channels", {}))
+                continue
+            rec["t"] = round(rec["t"] + offset, 3)
+            records.append(rec)
+    return header, records, torn
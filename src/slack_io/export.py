@@ -0,0 +1,223 @@
+"""
+Resumable workspace export for SlackBench datasets.
+
+Pages through `conversations.history` for every simulated channel and fetches
+the replies of each thread concurrently, with every call going through the Web
+API tier buckets in slack_client. Rows are streamed to one NDJSON file per
+channel (or Parquet parts with `--format parquet`, needs pyarrow) as each page
+completes, so memory stays at about one history page whatever the workspace
+size. After every page the output position and the history cursor are saved
+to `<out>/checkpoint.json`; a rerun resumes from there and drops anything
+written after the last checkpoint.
+
+    python -m slack_io.export --out data/export --workers 4
+"""
+import os, json, time, argparse, threading, logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+EXPORT_DIR = os.getenv("EXPORT_DIR", "data/export")
+EXPORT_WORKERS = 4          # concurrent thread fetches (the tier bucket still caps the rate)
+CHANNEL_WORKERS = 2         # channels exported at once
+PAGE_SIZE = 200             # messages per history/replies page (Slack's recommended maximum)
+
+COLUMNS = ("channel", "channel_name", "ts", "thread_ts", "user", "username", "bot_id", "subtype", "text", "reply_count")
+
+
+def to_row(msg: Dict, channel_id: str, channel_name: str) -> Dict:
+    """The message as exported: Slack's fields plus the channel it came from."""
+    return dict(msg, channel=channel_id, channel_name=channel_name)
+
+
+class NDJSONSink:
+    """Appends rows to `<out>/<channel>.jsonl`; resuming truncates to the last committed offset."""
+
+    def __init__(self, out_dir: str, channel_name: str, state: Optional[Dict] = None):
+        self.path = os.path.join(out_dir, f"{channel_name}.jsonl")
+        self._f = open(self.path, "a+b")
+        self._f.truncate((state or {}).get("offset", 0))
+        self._f.seek(0, os.SEEK_END)
+        self._lock = threading.Lock()
+
+    def write(self, rows: List[Dict]):
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8")
+        with self._lock:
+            self._f.write(data)
+
+    def commit(self) -> Dict:
+        with self._lock:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+            return {"offset": self._f.tell()}
+
+    def close(self):
+        self._f.close()
+
+
+class ParquetSink:
+    """Writes each committed batch as `<out>/<channel>/part-NNNNN.parquet` (text columns plus the raw JSON)."""
+
+    def __init__(self, out_dir: str, channel_name: str, state: Optional[Dict] = None):
+        try:
+            import pyarrow, pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs pyarrow (pip install pyarrow)") from e
+        self._pa = pyarrow
+        self.dir = os.path.join(out_dir, channel_name)
+        os.makedirs(self.dir, exist_ok=True)
+        self.part = (state or {}).get("part", 0)
+        for name in os.listdir(self.dir):
+            # parts written after the last checkpoint are redone
+            if name.startswith("part-") and int(name[5:10]) >= self.part:
+                os.remove(os.path.join(self.dir, name))
+        self._rows: List[Dict] = []
+        self._lock = threading.Lock()
+
+    def write(self, rows: List[Dict]):
+        with self._lock:
+            self._rows.extend(rows)
+
+    def commit(self) -> Dict:
+        import pyarrow.parquet as pq
+        with self._lock:
+            rows, self._rows = self._rows, []
+        if rows:
+            cols = {c: [None if r.get(c) is None else str(r[c]) for r in rows] for c in COLUMNS}
+            cols["raw"] = [json.dumps(r, ensure_ascii=False) for r in rows]
+            path = os.path.join(self.dir, f"part-{self.part:05d}.parquet")
+            pq.write_table(self._pa.table(cols), f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            self.part += 1
+        return {"part": self.part}
+
+    def close(self):
+        pass
+
+
+SINKS = {"ndjson": NDJSONSink, "parquet": ParquetSink}
+
+
+class Exporter:
+    def __init__(self, out_dir: str = EXPORT_DIR, fmt: str = "ndjson", workers: int = EXPORT_WORKERS,
+                 channel_workers: int = CHANNEL_WORKERS, page_size: int = PAGE_SIZE, oldest: Optional[str] = None):
+        if fmt not in SINKS:
+            raise ValueError(f"Unknown export format {fmt!r} (expected one of {sorted(SINKS)})")
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.workers = workers
+        self.channel_workers = channel_workers
+        self.page_size = page_size
+        self.oldest = oldest
+        self.checkpoint_path = os.path.join(out_dir, "checkpoint.json")
+        self.checkpoint = self._load_checkpoint()
+        self._ck_lock = threading.Lock()
+        self.stats = {"messages": 0, "replies": 0, "threads": 0, "pages": 0}
+        self._stats_lock = threading.Lock()
+
+    def _load_checkpoint(self) -> Dict:
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                ck = json.load(f)
+            if ck.get("format") == self.fmt and ck.get("oldest") == self.oldest:
+                return ck
+            logger.warning(f"[EXPORT] Checkpoint is for a different format/range; starting over")
+        return {"format": self.fmt, "oldest": self.oldest, "channels": {}}
+
+    def _save_checkpoint(self, channel_id: str, state: Dict):
+        with self._ck_lock:
+            self.checkpoint["channels"][channel_id] = state
+            tmp = f"{self.checkpoint_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.checkpoint, f, indent=2)
+            os.replace(tmp, self.checkpoint_path)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for k, v in deltas.items():
+                self.stats[k] += v
+        for k, v in deltas.items():
+            metrics.incr(f"export.{k}", v)
+
+    def _export_thread(self, sink, channel_id: str, channel_name: str, parent_ts: str):
+        from .slack_client import iter_thread
+        batch = []
+        for msg in iter_thread(channel_id, parent_ts, limit=self.page_size):
+            if msg["ts"] == parent_ts:
+                continue  # already exported from history
+            batch.append(to_row(msg, channel_id, channel_name))
+            if len(batch) >= self.page_size:
+                sink.write(batch)
+                self._count(replies=len(batch))
+                batch = []
+        sink.write(batch)
+        self._count(replies=len(batch), threads=1)
+
+    def _export_channel(self, channel_id: str, channel_name: str, pool: ThreadPoolExecutor):
+        from .slack_client import iter_history
+        state = self.checkpoint["channels"].get(channel_id, {})
+        if state.get("done"):
+            logger.info(f"[EXPORT] #{channel_name} already exported")
+            return
+        sink = SINKS[self.fmt](self.out_dir, channel_name, state.get("sink"))
+        try:
+            pages = iter_history(channel_id, oldest=self.oldest, limit=self.page_size, cursor=state.get("cursor"))
+            for messages, cursor in pages:
+                sink.write([to_row(m, channel_id, channel_name) for m in messages])
+                self._count(messages=len(messages), pages=1)
+                threads = [m["ts"] for m in messages if m.get("reply_count")]
+                futures = [pool.submit(self._export_thread, sink, channel_id, channel_name, ts) for ts in threads]
+                for fut in wait(futures).done:
+                    fut.result()
+                # everything up to `cursor` is on disk
+                self._save_checkpoint(channel_id, {"cursor": cursor, "done": not cursor, "sink": sink.commit()})
+        finally:
+            sink.close()
+        logger.info(f"[EXPORT] #{channel_name} done")
+
+    def run(self, channels: Dict[str, str]) -> Dict:
+        """Export channels (id -> name); returns counts and throughput."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export-thread") as pool, \
+                ThreadPoolExecutor(max_workers=self.channel_workers, thread_name_prefix="export-channel") as chans:
+            futures = [chans.submit(self._export_channel, cid, name, pool) for cid, name in channels.items()]
+            for fut in futures:
+                fut.result()
+        elapsed = time.time() - t0
+        out = dict(self.stats, elapsed_s=round(elapsed, 2))
+        out["messages_per_s"] = round((out["messages"] + out["replies"]) / max(elapsed, 1e-9), 1)
+        return out
+
+
+def simulated_channels(names: Optional[List[str]] = None) -> Dict[str, str]:
+    """id -> name for the simulated channels (CHANNEL_POLICY), or just `names`."""
+    from .persona_registry import CHANNEL_POLICY
+    from .slack_client import resolve_channels
+    return resolve_channels(names or list(CHANNEL_POLICY))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the simulated channels (with threads) for SlackBench")
+    parser.add_argument("--out", default=EXPORT_DIR, help="Output directory (holds the checkpoint too)")
+    parser.add_argument("--format", choices=sorted(SINKS), default="ndjson")
+    parser.add_argument("--channels", help="Comma-separated channel names (default: every CHANNEL_POLICY channel)")
+    parser.add_argument("--oldest", help="Only messages after this ts")
+    parser.add_argument("--workers", type=int, default=EXPORT_WORKERS, help="Concurrent thread fetches")
+    parser.add_argument("--channel-workers", type=int, default=CHANNEL_WORKERS)
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and export everything again")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.restart and os.path.exists(os.path.join(args.out, "checkpoint.json")):
+        os.remove(os.path.join(args.out, "checkpoint.json"))
+    channels = simulated_channels(args.channels.split(",") if args.channels else None)
+    exporter = Exporter(args.out, args.format, args.workers, args.channel_workers, oldest=args.oldest)
+    print(json.dumps(exporter.run(channels), indent=2))
+
+
+if __name__ == "__main__":
+    main()
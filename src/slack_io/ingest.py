@@ -0,0 +1,85 @@
+"""
+Idempotent event ingestion.
+
+Bolt delivers the same persona post to both the generic `message` handler and
+the `bot_message` handler, and Slack redelivers events when we ack slowly.
+Every copy that reaches the conductor can cost an LLM call and a post, so
+events are deduplicated here on (channel, ts, event_id) before anything else
+looks at them.
+"""
+import time, threading, logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+DEDUP_WINDOW_S = 600        # Slack gives up redelivering well before 10 minutes
+DEDUP_MAX_ENTRIES = 5000    # hard cap so a burst can't grow the cache without bound
+
+class EventDeduper:
+    """Bounded, time-windowed set of recently seen event keys."""
+
+    def __init__(self, window_s: float = DEDUP_WINDOW_S, max_entries: int = DEDUP_MAX_ENTRIES):
+        self.window_s = window_s
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[Tuple, Tuple[float, str]]" = OrderedDict()  # key -> (first_seen, source)
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self._seen:
+            key, (seen_at, _) = next(iter(self._seen.items()))
+            if now - seen_at < self.window_s and len(self._seen) < self.max_entries:
+                break
+            self._seen.popitem(last=False)
+
+    def check(self, key: Tuple, source: str = "") -> Optional[str]:
+        """Record `key`; return None if it is new, else "duplicate" or "redelivery".
+
+        A copy arriving through a different handler than the first one is a
+        duplicate (both Bolt listeners matched); a copy arriving through the
+        same handler again is Slack redelivering it.
+        """
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            hit = self._seen.get(key)
+            if hit is None:
+                self._seen[key] = (now, source)
+                return None
+            return "redelivery" if hit[1] == source else "duplicate"
+
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+
+DEDUPER = EventDeduper()
+
+def event_key(event: dict, body: Optional[dict] = None) -> Tuple:
+    event_id = (body or {}).get("event_id") or event.get("client_msg_id")
+    return (event.get("channel"), event.get("ts"), event_id)
+
+def accept_event(event: dict, body: Optional[dict] = None, source: str = "") -> bool:
+    """Return True the first time an event is seen, False for any later copy."""
+    metrics.incr("ingest.received")
+    verdict = DEDUPER.check(event_key(event, body), source)
+    if verdict is None:
+        metrics.incr("ingest.accepted")
+        return True
+    metrics.incr(f"ingest.{verdict}")
+    logger.info(f"[INGEST] Dropping {verdict} event {event.get('channel')}/{event.get('ts')} (via {source or 'unknown'})")
+    return False
+
+def stats() -> dict:
+    return {
+        "received": metrics.get("ingest.received"),
+        "accepted": metrics.get("ingest.accepted"),
+        "duplicates": metrics.get("ingest.duplicate"),
+        "redeliveries": metrics.get("ingest.redelivery"),
+        "cache_size": len(DEDUPER),
+    }
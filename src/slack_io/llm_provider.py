@@ -0,0 +1,379 @@
+"""
+LLM provider layer.
+
+Everything that generates text goes through `agent_engine.client`, an
+OpenAI-shaped shim (`client.chat.completions.create(...)`) over one of these
+backends:
+
+- `OpenAIProvider`: any OpenAI-compatible HTTP endpoint (api.openai.com, or a
+  local server such as vLLM / llama.cpp via LLM_BASE_URL) with a keep-alive
+  connection pool, connect/read timeouts and retry with backoff on 429/5xx.
+- `StubProvider`: in-process canned replies, no network, for large simulations.
+- `RecordingProvider` / `ReplayProvider`: capture completions to JSONL and serve
+  them back for reproducible runs.
+- `FailoverProvider`: tries backends in order, parking failed ones for a while.
+
+Configured from the environment by `provider_from_env()`; the openai package is
+only imported when an HTTP backend is actually used.
+"""
+import os, json, time, random, hashlib, threading, logging
+from types import SimpleNamespace
+from typing import Dict, Iterable, List, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs (environment overrides in provider_from_env)
+DEFAULT_TIMEOUT_S = 30.0        # read timeout per request
+DEFAULT_CONNECT_TIMEOUT_S = 5.0
+DEFAULT_MAX_RETRIES = 3         # retries after the first attempt, per backend
+DEFAULT_POOL_SIZE = 32          # max connections per backend (keep-alive pool)
+DEFAULT_KEEPALIVE_S = 60.0      # idle keep-alive connections are dropped after this
+BACKOFF_BASE_S = 0.5
+BACKOFF_MAX_S = 8.0
+FAILOVER_COOLDOWN_S = 30.0      # how long a failed backend is skipped
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+LOCAL_BASE_URL = "http://127.0.0.1:8000/v1"
+
+
+class ProviderError(Exception):
+    """A backend failed; retryable errors are retried (and failed over) before surfacing."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class _Stream:
+    """Iterable of chunks with a close() that tells the producer to stop."""
+
+    def __init__(self, chunks: Iterable, on_close=None):
+        self._chunks = iter(chunks)
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._chunks)
+
+    def close(self):
+        if self._on_close:
+            self._on_close()
+            self._on_close = None
+
+
+def _completion(text: str, prompt_tokens: int, completion_tokens: int, model: str):
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, finish_reason="stop",
+                                 message=SimpleNamespace(role="assistant", content=text))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              total_tokens=prompt_tokens + completion_tokens),
+    )
+
+
+def _chunks(text: str, prompt_tokens: int, completion_tokens: int, delay_s: float = 0.0):
+    """Stream-shaped chunks of text (one per word), then a usage-only chunk."""
+    words = text.split(" ")
+    for i, word in enumerate(words):
+        if delay_s:
+            time.sleep(delay_s)
+        piece = word if i == len(words) - 1 else word + " "
+        yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=piece))], usage=None)
+    yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                                            total_tokens=prompt_tokens + completion_tokens))
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class Provider:
+    """Base backend: `create(**kwargs)` mirrors `chat.completions.create` and retries transient errors."""
+
+    name = "provider"
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES):
+        self.max_retries = max_retries
+
+    def _create(self, **kwargs):
+        raise NotImplementedError
+
+    def create(self, **kwargs):
+        attempt = 0
+        while True:
+            metrics.incr(f"llm.requests.{self.name}")
+            try:
+                return self._create(**kwargs)
+            except ProviderError as e:
+                metrics.incr(f"llm.errors.{self.name}")
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else \
+                    random.uniform(0, min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** attempt))
+                attempt += 1
+                metrics.incr(f"llm.retries.{self.name}")
+                logger.warning(f"[LLM] {self.name} failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+
+class OpenAIProvider(Provider):
+    """OpenAI-compatible HTTP endpoint with a tuned keep-alive pool."""
+
+    def __init__(self, name: str = "openai", base_url: Optional[str] = None, api_key: Optional[str] = None,
+                 timeout_s: float = DEFAULT_TIMEOUT_S, connect_timeout_s: float = DEFAULT_CONNECT_TIMEOUT_S,
+                 pool_size: int = DEFAULT_POOL_SIZE, keepalive_s: float = DEFAULT_KEEPALIVE_S,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        super().__init__(max_retries)
+        self.name = name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout_s = timeout_s
+        self.connect_timeout_s = connect_timeout_s
+        self.pool_size = pool_size
+        self.keepalive_s = keepalive_s
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        with self._lock:
+            if self._client is None:
+                import openai
+                # Same Limits class the SDK's own default uses, whichever HTTP library that is
+                limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_s,
+                )
+                timeout = openai.Timeout(self.timeout_s, connect=self.connect_timeout_s)
+                self._client = openai.OpenAI(
+                    api_key=self.api_key or "not-needed",  # local servers usually ignore the key
+                    base_url=self.base_url,
+                    timeout=timeout,
+                    max_retries=0,  # retries and failover happen here
+                    http_client=openai.DefaultHttpxClient(limits=limits, timeout=timeout),
+                )
+            return self._client
+
+    def _create(self, **kwargs):
+        import openai
+        try:
+            return self._get_client().chat.completions.create(**kwargs)
+        except openai.APIStatusError as e:
+            retry_after = None
+            try:
+                retry_after = float(e.response.headers.get("retry-after"))
+            except (TypeError, ValueError, AttributeError):
+                pass
+            raise ProviderError(f"HTTP {e.status_code}", retryable=e.status_code in RETRY_STATUS,
+                                retry_after=retry_after) from e
+        except openai.APIConnectionError as e:  # includes timeouts
+            raise ProviderError(type(e).__name__, retryable=True) from e
+
+
+class StubProvider(Provider):
+    """In-process stand-in model: short deterministic replies derived from the prompt."""
+
+    name = "stub"
+    OPENERS = ["Quick take:", "Good catch.", "Looking into it.", "Makes sense.", "Agreed."]
+    BODIES = [
+        "I'd check {topic} first and share what I find.",
+        "We should loop in the owner of {topic} before changing anything.",
+        "Let's write down next steps for {topic} in the ticket.",
+        "I can pick up {topic} this afternoon.",
+        "Do we have numbers on {topic} yet?",
+    ]
+
+    def __init__(self, latency_s: float = 0.0, token_delay_s: float = 0.0):
+        super().__init__(max_retries=0)
+        self.latency_s = latency_s
+        self.token_delay_s = token_delay_s
+
+    def reply_for(self, messages: List[Dict]) -> str:
+        prompt = messages[-1]["content"] if messages else ""
+        goal = next((line[5:].strip() for line in prompt.splitlines() if line.startswith("Goal:")), prompt)
+        topic = " ".join(goal.split()[:6]).rstrip(".?!,") or "this"
+        h = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+        return f"{self.OPENERS[h % len(self.OPENERS)]} {self.BODIES[(h >> 4) % len(self.BODIES)].format(topic=topic)}"
+
+    def _create(self, model: str = "stub", messages: List[Dict] = (), stream: bool = False, **kwargs):
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        text = self.reply_for(list(messages))
+        prompt_tokens = sum(_approx_tokens(m.get("content", "")) for m in messages)
+        if stream:
+            return _Stream(_chunks(text, prompt_tokens, _approx_tokens(text), self.token_delay_s))
+        return _completion(text, prompt_tokens, _approx_tokens(text), model)
+
+
+def request_key(kwargs: Dict) -> str:
+    """Stable key for a completion request (model, messages and sampling settings)."""
+    material = {k: kwargs.get(k) for k in ("model", "messages", "temperature", "max_tokens")}
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class RecordingProvider(Provider):
+    """Pass-through that appends every completion (text + usage) to a JSONL file."""
+
+    def __init__(self, inner: Provider, path: str):
+        super().__init__(max_retries=0)
+        self.inner = inner
+        self.name = f"record:{inner.name}"
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _write(self, key: str, text: str, usage):
+        rec = {"key": key, "text": text,
+               "prompt_tokens": getattr(usage, "prompt_tokens", None),
+               "completion_tokens": getattr(usage, "completion_tokens", None)}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec) + "\n")
+
+    def create(self, **kwargs):
+        key = request_key(kwargs)
+        resp = self.inner.create(**kwargs)
+        if not kwargs.get("stream"):
+            self._write(key, resp.choices[0].message.content, resp.usage)
+            return resp
+
+        parts, usage, written = [], [None], [False]
+
+        def flush():
+            if not written[0]:
+                written[0] = True
+                self._write(key, "".join(parts), usage[0])
+
+        def tee():
+            for chunk in resp:
+                if getattr(chunk, "usage", None):
+                    usage[0] = chunk.usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                yield chunk
+            flush()
+
+        def close():
+            flush()
+            if hasattr(resp, "close"):
+                resp.close()
+
+        return _Stream(tee(), on_close=close)
+
+
+class ReplayProvider(Provider):
+    """Serves completions recorded by RecordingProvider; misses go to `fallback` or fail."""
+
+    name = "replay"
+
+    def __init__(self, path: str, fallback: Optional[Provider] = None):
+        super().__init__(max_retries=0)
+        self.fallback = fallback
+        self.records: Dict[str, Dict] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    self.records[rec["key"]] = rec
+
+    def create(self, **kwargs):
+        rec = self.records.get(request_key(kwargs))
+        if rec is None:
+            metrics.incr("llm.replay.miss")
+            if self.fallback:
+                return self.fallback.create(**kwargs)
+            raise ProviderError("no recorded completion for this request")
+        metrics.incr("llm.replay.hit")
+        prompt_tokens = rec.get("prompt_tokens") or 0
+        completion_tokens = rec.get("completion_tokens") or _approx_tokens(rec["text"])
+        if kwargs.get("stream"):
+            return _Stream(_chunks(rec["text"], prompt_tokens, completion_tokens))
+        return _completion(rec["text"], prompt_tokens, completion_tokens, kwargs.get("model", ""))
+
+
+class FailoverProvider(Provider):
+    """Tries each backend in order; a backend that fails is skipped for FAILOVER_COOLDOWN_S."""
+
+    name = "failover"
+
+    def __init__(self, providers: List[Provider], cooldown_s: float = FAILOVER_COOLDOWN_S):
+        super().__init__(max_retries=0)
+        self.providers = providers
+        self.cooldown_s = cooldown_s
+        self._down_until: Dict[str, float] = {}
+
+    def create(self, **kwargs):
+        now = time.time()
+        healthy = [p for p in self.providers if self._down_until.get(p.name, 0) <= now]
+        # If everything is parked, try them all anyway rather than fail outright
+        order = healthy or self.providers
+        last_exc = None
+        for i, provider in enumerate(order):
+            try:
+                return provider.create(**kwargs)
+            except ProviderError as e:
+                last_exc = e
+                self._down_until[provider.name] = time.time() + self.cooldown_s
+                if i + 1 < len(order):
+                    metrics.incr("llm.failover")
+                    logger.warning(f"[LLM] {provider.name} unavailable ({e}); failing over to {order[i + 1].name}")
+        raise last_exc
+
+
+class _Completions:
+    def __init__(self, provider: Provider):
+        self._provider = provider
+
+    def create(self, **kwargs):
+        return self._provider.create(**kwargs)
+
+
+class LLMClient:
+    """OpenAI-shaped facade: `client.chat.completions.create(...)` on any Provider."""
+
+    def __init__(self, provider: Provider):
+        self.provider = provider
+        self.chat = SimpleNamespace(completions=_Completions(provider))
+
+
+def _backend(kind: str) -> Provider:
+    timeouts = dict(
+        timeout_s=float(os.getenv("LLM_TIMEOUT_S", DEFAULT_TIMEOUT_S)),
+        connect_timeout_s=float(os.getenv("LLM_CONNECT_TIMEOUT_S", DEFAULT_CONNECT_TIMEOUT_S)),
+        pool_size=int(os.getenv("LLM_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        keepalive_s=float(os.getenv("LLM_KEEPALIVE_S", DEFAULT_KEEPALIVE_S)),
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+    )
+    if kind == "openai":
+        return OpenAIProvider("openai", base_url=os.getenv("LLM_BASE_URL") or None,
+                              api_key=os.getenv("LLM_API_KEY") or os.getenv("OPENAI_API_KEY"), **timeouts)
+    if kind == "local":
+        return OpenAIProvider("local", base_url=os.getenv("LLM_LOCAL_BASE_URL", LOCAL_BASE_URL),
+                              api_key=os.getenv("LLM_LOCAL_API_KEY"), **timeouts)
+    if kind == "stub":
+        return StubProvider(latency_s=float(os.getenv("LLM_STUB_LATENCY_S", "0")))
+    raise ValueError(f"Unknown LLM provider {kind!r} (expected openai, local or stub)")
+
+
+def provider_from_env() -> Provider:
+    """
+    Build the provider chain from the environment:
+
+    LLM_PROVIDER     comma-separated backends tried in order: openai, local, stub (default: openai)
+    LLM_BASE_URL     base URL for the openai backend (any OpenAI-compatible server)
+    LLM_LOCAL_BASE_URL  base URL for the local backend (default: http://127.0.0.1:8000/v1)
+    LLM_TIMEOUT_S, LLM_CONNECT_TIMEOUT_S, LLM_MAX_RETRIES, LLM_POOL_SIZE, LLM_KEEPALIVE_S
+    LLM_RECORD       append every completion to this JSONL file
+    LLM_REPLAY       serve completions from this JSONL file (misses fall through to the backends,
+                     or fail when LLM_REPLAY_STRICT=1)
+    """
+    kinds = [k.strip() for k in os.getenv("LLM_PROVIDER", "openai").split(",") if k.strip()]
+    backends = [_backend(k) for k in kinds]
+    provider = backends[0] if len(backends) == 1 else FailoverProvider(backends)
+    if os.getenv("LLM_RECORD"):
+        provider = RecordingProvider(provider, os.environ["LLM_RECORD"])
+    if os.getenv("LLM_REPLAY"):
+        strict = os.getenv("LLM_REPLAY_STRICT") == "1"
+        provider = ReplayProvider(os.environ["LLM_REPLAY"], fallback=None if strict else provider)
+    return provider
@@ -0,0 +1,395 @@
+"""
+Synthetic event firehose: find the highest event rate the app sustains.
+
+Message events (human posts, other bots' posts and persona posts, top-level
+or in threads, spread over channels in proportion to their `p_reply`) are
+injected at a target rate for `--step` seconds, then the rate is raised by
+`--factor`, until a step fails: injection falls behind, events wait too long
+before the conductor sees them, replies take too long to post, work piles up
+in the pool/admission/post queues, admission control and the pool start
+shedding work, or humans stop getting replies. The last passing rate is
+reported as the maximum sustainable events/s.
+
+Shedding keeps latency and depth in budget once the app saturates, so those
+alone don't show it: every step also counts the reply jobs rejected, shed or
+expired by admission control and refused by the pool (`shed`, per handled
+event), and the share of replies planned for human messages that actually got
+posted (`reply_yield`), which has to stay within YIELD_DROP of the best
+earlier step's (the first step reads low: replies still staggered at its end
+are counted in the next one). Replies per handled human message are reported as well
+(`replies_per_human`), but cooldowns and thread caps lower that at any rate
+that outpaces the personas, so it isn't a saturation signal by itself.
+
+Everything runs in real time on the app's own pool and post queues, against
+the stand-in Slack client (sim.py; persona posts are echoed back like Slack
+does) and the stub LLM with `--llm-latency` seconds per call. Events go through
+Bolt's Socket Mode dispatch path (`--via socket`, default; Bolt's middleware
+drops events carrying the app's own bot_id there) or straight to the Bolt
+handlers (`--via handlers`).
+
+    python -m slack_io.loadgen --start 2 --factor 2 --step 20 --mix human=0.6,persona=0.3,bot=0.1
+"""
+import os, json, time, heapq, random, argparse, itertools, threading, logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# knobs
+ECHO_DELAY_S = 0.4          # Slack delivers our own posts back after roughly this long
+LAG_BUDGET_S = 1.0          # mean wait from injection to the conductor
+LATENCY_BUDGET_S = 15.0     # mean event -> reply posted (includes the 1-3s stagger)
+DEPTH_BUDGET = 50           # pool + admission + post queue backlog at the end of a step
+MIN_ACHIEVED = 0.9          # fraction of the target rate the injector must reach
+SHED_BUDGET = 0.05          # reply jobs rejected/shed/expired/refused per handled event
+YIELD_DROP = 0.3            # largest tolerated drop in posted/planned human replies vs the best earlier step
+SHED_COUNTERS = ("admission.rejected.", "admission.shed.", "admission.expired.", "priority.refused.")
+SAMPLE_EVERY_S = 0.5
+
+TEXTS = {
+    "top": [
+        "Anyone seeing the latency spike on the payments API?",
+        "Deploy is blocked by failing integration tests, how should we proceed?",
+        "Can someone review my PR for the login page?",
+        "Proposal: move the nightly batch to the new queue. Thoughts?",
+        "Heads up, staging is down for maintenance until 3pm.",
+        "Why are we still paging on the disk alert? It fires every night.",
+        "FYI the design review moved to Thursday",
+        "What's the ETA on the search regression fix?",
+    ],
+    "reply": [
+        "thanks", "lgtm", "ok", ":+1:",
+        "I can take a look after standup.",
+        "Do we know when this started?",
+        "Rolling back fixed it for me, but the root cause is still unclear.",
+        "Could this be related to the config change yesterday?",
+    ],
+    "bot": [
+        "Build #4812 passed", "Deploy to staging finished", "Alert resolved: disk usage on db-2",
+    ],
+}
+
+
+def _parse_mix(spec: str) -> Dict[str, float]:
+    mix = {"human": 0.0, "persona": 0.0, "bot": 0.0}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in mix:
+            raise argparse.ArgumentTypeError(f"Unknown message kind {kind!r} (expected human, persona or bot)")
+        mix[kind.strip()] = float(weight)
+    return mix
+
+
+class EventFactory:
+    """Builds Slack message events with the configured mix."""
+
+    def __init__(self, channels: Dict[str, str], mix: Dict[str, float], thread_ratio: float, seed: int = 0,
+                 clock=time.time):
+        from .persona_registry import PERSONAS, CHANNEL_POLICY
+        self.rng = random.Random(seed)
+        self.clock = clock
+        ids = list(channels)
+        self.channel_ids = ids
+        self.channel_weights = [CHANNEL_POLICY.get(channels[cid], {}).get("p_reply", 0.1) for cid in ids]
+        self.kinds = [k for k, w in mix.items() if w > 0]
+        self.kind_weights = [mix[k] for k in self.kinds]
+        self.thread_ratio = thread_ratio
+        self.personas = [p["username"] for p in PERSONAS.values()]
+        self._roots: Dict[str, List[str]] = {}  # channel -> recent top-level ts
+        self._seq = itertools.count()
+        self._last_ts = 0.0
+
+    def _ts(self) -> str:
+        self._last_ts = max(round(self.clock(), 6), round(self._last_ts + 0.000001, 6))
+        return f"{self._last_ts:.6f}"
+
+    def make(self) -> dict:
+        rng = self.rng
+        channel = rng.choices(self.channel_ids, weights=self.channel_weights)[0]
+        kind = rng.choices(self.kinds, weights=self.kind_weights)[0]
+        roots = self._roots.setdefault(channel, [])
+        in_thread = roots and rng.random() < self.thread_ratio
+        ts = self._ts()
+        event = {"type": "message", "channel": channel, "ts": ts}
+        if in_thread:
+            event["thread_ts"] = rng.choice(roots)
+        else:
+            roots.append(ts)
+            del roots[:-20]
+        if kind == "human":
+            event.update(user=f"U{rng.randrange(1, 50):07d}", client_msg_id=f"load-{next(self._seq)}",
+                         text=rng.choice(TEXTS["reply" if in_thread else "top"]))
+        elif kind == "persona":
+            event.update(subtype="bot_message", bot_id="BSTANDIN", username=rng.choice(self.personas),
+                         text=rng.choice(TEXTS["reply" if in_thread else "top"]))
+        else:
+            event.update(subtype="bot_message", bot_id="BLOADBOT", user="BLOADBOT", username="ci-bot",
+                         text=rng.choice(TEXTS["bot"]))
+        return event
+
+
+class Injector:
+    """Delivers events at their due time through Socket Mode dispatch or the Bolt handlers."""
+
+    def __init__(self, app, via: str = "socket"):
+        from . import bolt_app
+        self.app = app
+        self.via = via
+        self.handlers = (bolt_app.handle_message_events, bolt_app.handle_bot_messages)
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.delivered = 0
+        if via == "socket":
+            self._prime_authorization()
+        threading.Thread(target=self._run, daemon=True, name="loadgen-injector").start()
+
+    def _prime_authorization(self):
+        """Hand Bolt's authorization middleware the stand-in's auth.test result up front.
+
+        It otherwise calls auth.test over HTTP on the first request, which the
+        stand-in client can't intercept.
+        """
+        from slack_bolt.middleware.authorization import SingleTeamAuthorization
+        from slack_sdk.web import SlackResponse
+        client = self.app.client
+        result = SlackResponse(client=client, http_verb="POST", api_url="auth.test", req_args={},
+                               data={**client.auth_test(), "team_id": "TLOADGEN"}, headers={}, status_code=200)
+        for middleware in self.app._middleware_list:
+            if isinstance(middleware, SingleTeamAuthorization):
+                middleware.auth_test_result = result
+
+    def at(self, t: float, event: dict):
+        with self._cond:
+            heapq.heappush(self._heap, (t, next(self._seq), event))
+            self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._heap or self._heap[0][0] > time.time()):
+                    self._cond.wait(timeout=(self._heap[0][0] - time.time()) if self._heap else None)
+                if self._stopped:
+                    return
+                _, _, event = heapq.heappop(self._heap)
+            try:
+                self._deliver(event)
+            except Exception as e:
+                logger.error(f"[LOADGEN] Delivery failed: {e}")
+            self.delivered += 1
+
+    def _deliver(self, event: dict):
+        event_id = f"Ev{event['ts'].replace('.', '')}"
+        body = {"type": "event_callback", "team_id": "TLOADGEN", "api_app_id": "ALOADGEN", "event": event,
+                "event_id": event_id, "event_time": int(float(event["ts"]))}
+        if self.via == "socket":
+            # what SocketModeHandler does for each events_api envelope
+            from slack_bolt.request import BoltRequest
+            self.app.dispatch(BoltRequest(mode="socket_mode", body=body))
+            return
+        handle_message, handle_bot = self.handlers
+        handle_message(body=body, event=event, logger=logger, say=None)
+        if event.get("subtype") == "bot_message":
+            handle_bot(body=body, event=event, logger=logger, say=None)
+
+
+class LoadTest:
+    def __init__(self, mix: Dict[str, float], thread_ratio: float, via: str, seed: int = 0):
+        from .slack_client import app
+        from .persona_registry import CHANNEL_POLICY, CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
+        from .sim import StandInSlack
+        from . import bolt_app
+
+        channels = {f"CLOAD{i:03d}": name for i, name in enumerate(CHANNEL_POLICY)}
+        CHANNEL_ID_TO_NAME.update(channels)
+        CHANNEL_NAME_TO_ID.update({name: cid for cid, name in channels.items()})
+        self.slack = StandInSlack(channels, on_post=self._echo, max_messages=500)
+        app._client = self.slack
+        self.factory = EventFactory(channels, mix, thread_ratio, seed)
+        self.injector = Injector(app, via)
+        self.injected_at: Dict[str, float] = {}
+        self._lag = {"count": 0, "total": 0.0, "max": 0.0, "human": 0}
+        self._lock = threading.Lock()
+
+        # time from injection to the conductor, per event
+        conduct = bolt_app.maybe_handle_event
+
+        def _timed(event):
+            t0 = self.injected_at.pop(event.get("ts"), None)
+            if t0 is not None:
+                lag = time.time() - t0
+                with self._lock:
+                    self._lag["count"] += 1
+                    self._lag["total"] += lag
+                    self._lag["max"] = max(self._lag["max"], lag)
+                    self._lag["human"] += not event.get("subtype") and bool(event.get("user"))
+            return conduct(event)
+
+        bolt_app.maybe_handle_event = _timed
+
+    def _echo(self, msg: dict):
+        self.injected_at[msg["ts"]] = time.time() + ECHO_DELAY_S
+        self.injector.at(time.time() + ECHO_DELAY_S, msg)
+
+    def depth(self) -> int:
+        from .priority import POOL
+        from .admission import ADMISSION
+        from .conductor import CHANNEL_QUEUES
+        pending = sum(c["pending"] for c in POOL.stats().values())
+        return pending + ADMISSION.stats()["queued"] + sum(q.q.qsize() for q in list(CHANNEL_QUEUES.values()))
+
+    def _latency(self) -> dict:
+        from . import metrics
+        t = metrics.snapshot()["timings"].get("conductor.reply_latency_s", {"count": 0, "avg": 0.0, "max": 0.0})
+        return {"count": t["count"], "total": t["avg"] * t["count"], "max": t["max"]}
+
+    def _counters(self) -> dict:
+        """Work dropped so far (all SHED_COUNTERS), and replies planned for and posted to human messages."""
+        from . import metrics
+        counters = metrics.snapshot()["counters"]
+        return {"shed": sum(v for k, v in counters.items() if k.startswith(SHED_COUNTERS)),
+                "human_planned": counters.get("admission.admitted.human", 0) + counters.get("admission.rejected.human", 0),
+                "human_replies": counters.get("conductor.replies.human", 0)}
+
+    def step(self, rate: float, duration: float) -> dict:
+        """Inject at `rate` events/s for `duration` seconds and measure the step."""
+        lat0 = self._latency()
+        counts0 = self._counters()
+        with self._lock:
+            lag0 = dict(self._lag)
+            self._lag["max"] = 0.0
+        depth0 = self.depth()
+        start = time.time()
+        next_at, sent, depths = start, 0, []
+        next_sample = start
+        while True:
+            now = time.time()
+            if now >= start + duration:
+                break
+            if now >= next_sample:
+                depths.append(self.depth())
+                next_sample += SAMPLE_EVERY_S
+            if now < next_at:
+                time.sleep(min(next_at, next_sample) - now)
+                continue
+            event = self.factory.make()
+            self.slack.add_message(event)
+            self.injected_at[event["ts"]] = time.time()
+            self.injector.at(0, event)
+            sent += 1
+            next_at += 1.0 / rate
+        lat1 = self._latency()
+        counts1 = self._counters()
+        with self._lock:
+            lag1 = dict(self._lag)
+        # events that never reached the conductor (e.g. Bolt ignores the app's own bot_id)
+        cutoff = time.time() - 10 * LAG_BUDGET_S
+        for ts, t in list(self.injected_at.items()):
+            if t < cutoff:
+                self.injected_at.pop(ts, None)
+        replies = lat1["count"] - lat0["count"]
+        handled = lag1["count"] - lag0["count"]
+        humans = lag1["human"] - lag0["human"]
+        shed = counts1["shed"] - counts0["shed"]
+        planned = counts1["human_planned"] - counts0["human_planned"]
+        human_replies = counts1["human_replies"] - counts0["human_replies"]
+        return {
+            "rate": rate,
+            "achieved": round(sent / duration, 2),
+            "handled": handled,
+            "lag_avg_s": round((lag1["total"] - lag0["total"]) / handled, 3) if handled else None,
+            "lag_max_s": round(lag1["max"], 3),
+            "replies": replies,
+            "latency_avg_s": round((lat1["total"] - lat0["total"]) / replies, 2) if replies else None,
+            "latency_max_s": round(lat1["max"], 2),
+            "shed": shed,
+            "shed_per_event": round(shed / handled, 3) if handled else None,
+            "humans": humans,
+            "replies_per_human": round(human_replies / humans, 3) if humans else None,
+            "reply_yield": round(min(1.0, human_replies / planned), 3) if planned else None,
+            "depth_start": depth0,
+            "depth_end": self.depth(),
+            "depth_max": max(depths, default=0),
+        }
+
+
+def verdict(step: dict, lag_budget: float = LAG_BUDGET_S, latency_budget: float = LATENCY_BUDGET_S,
+            depth_budget: int = DEPTH_BUDGET, shed_budget: float = SHED_BUDGET,
+            base_yield: Optional[float] = None, yield_drop: float = YIELD_DROP) -> Optional[str]:
+    """Why a step is not sustainable, or None if it is; base_yield is the best earlier reply_yield."""
+    if step["achieved"] < MIN_ACHIEVED * step["rate"]:
+        return "injector fell behind"
+    if step["lag_avg_s"] is None or step["lag_avg_s"] > lag_budget:
+        return "events queued before the conductor"
+    if step["latency_avg_s"] is not None and step["latency_avg_s"] > latency_budget:
+        return "reply latency"
+    if step["depth_end"] > depth_budget:
+        return "queue depth"
+    if step["shed_per_event"] is not None and step["shed_per_event"] > shed_budget:
+        return "work shed or expired"
+    if base_yield and step["reply_yield"] is not None and step["reply_yield"] < (1 - yield_drop) * base_yield:
+        return "reply yield dropped"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ramp synthetic Slack events to find the saturation point")
+    parser.add_argument("--start", type=float, default=2.0, help="First step's rate (events/s)")
+    parser.add_argument("--factor", type=float, default=2.0, help="Rate multiplier per step")
+    parser.add_argument("--max-rate", type=float, default=1024.0)
+    parser.add_argument("--step", type=float, default=20.0, help="Seconds per step")
+    parser.add_argument("--mix", type=_parse_mix, default=_parse_mix("human=0.6,persona=0.3,bot=0.1"))
+    parser.add_argument("--thread-ratio", type=float, default=0.5, help="Share of messages posted in threads")
+    parser.add_argument("--via", choices=("socket", "handlers"), default="socket")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="Stub LLM seconds per call")
+    parser.add_argument("--lag-budget", type=float, default=LAG_BUDGET_S)
+    parser.add_argument("--latency-budget", type=float, default=LATENCY_BUDGET_S)
+    parser.add_argument("--depth-budget", type=int, default=DEPTH_BUDGET)
+    parser.add_argument("--shed-budget", type=float, default=SHED_BUDGET, help="Reply jobs dropped per handled event")
+    parser.add_argument("--yield-drop", type=float, default=YIELD_DROP,
+                        help="Tolerated drop in posted/planned human replies vs the best earlier step")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Also write the per-step results here as JSON")
+    args = parser.parse_args()
+
+    # Offline backends must be chosen before the app modules are imported
+    os.environ["SLACK_OFFLINE"] = "1"
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ["LLM_STUB_LATENCY_S"] = str(args.llm_latency)
+    os.environ.pop("EVENT_LOG", None)
+
+    from . import bolt_app  # noqa: F401  (registers the handlers; configures logging)
+    logging.disable(logging.INFO)  # per-event log lines would dominate the measurement
+    random.seed(args.seed)
+
+    test = LoadTest(args.mix, args.thread_ratio, args.via, args.seed)
+    steps, sustainable, rate = [], None, args.start
+    base_yield = None
+    while rate <= args.max_rate:
+        result = test.step(rate, args.step)
+        result["failed"] = verdict(result, args.lag_budget, args.latency_budget, args.depth_budget,
+                                   args.shed_budget, base_yield, args.yield_drop)
+        base_yield = max(filter(None, (base_yield, result["reply_yield"])), default=None)
+        steps.append(result)
+        print(json.dumps(result), flush=True)
+        if result["failed"]:
+            break
+        sustainable = rate
+        rate = round(rate * args.factor, 3)
+    test.injector.stop()
+
+    summary = {"max_sustainable_events_per_s": sustainable, "limit": steps[-1]["failed"] if steps else None,
+               "via": args.via, "mix": args.mix, "thread_ratio": args.thread_ratio, "llm_latency_s": args.llm_latency}
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "steps": steps}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Memory diagnostics for long runs (opt-in with MEMORY_DIAGNOSTICS=1).
+
+Every MEMDIAG_INTERVAL_S a tracemalloc snapshot is compared with the previous
+one and with the first one; the allocation sites that grew most are logged
+together with the size of the app's long-lived structures (thread state,
+cooldowns, post queues, dedup cache, ...). `dump()` writes the full report as
+JSON; it runs on SIGUSR1 and is served at http://127.0.0.1:MEMDIAG_PORT/memory
+when MEMDIAG_PORT is set.
+"""
+import os, sys, json, time, signal, threading, tracemalloc, logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+MEMDIAG = os.getenv("MEMORY_DIAGNOSTICS", "0") == "1"
+MEMDIAG_INTERVAL_S = float(os.getenv("MEMDIAG_INTERVAL_S", "600"))
+MEMDIAG_FRAMES = 10         # stack depth kept per allocation (more = slower, better attribution)
+MEMDIAG_TOP = 15            # allocation sites per report
+MEMDIAG_DIR = os.getenv("MEMDIAG_DIR", "data/memdiag")
+MEMDIAG_PORT = int(os.getenv("MEMDIAG_PORT", "0"))  # 0 = no endpoint
+
+
+def deep_size(obj, _seen=None) -> int:
+    """Approximate bytes held by a container and everything it references (strings, numbers, dicts, lists...)."""
+    seen = _seen if _seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in list(obj.items()))
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(v, seen) for v in list(obj))
+    return size
+
+
+def structure_sizes() -> Dict[str, Dict[str, int]]:
+    """Entry counts and approximate bytes of the app's long-lived in-memory structures."""
+    from . import conductor, autonomous_loop, pacing, ingest
+    from .speculation import SPECULATOR
+    from .admission import ADMISSION
+    from .context_cache import CONTEXT_CACHE
+
+    queues = list(conductor.CHANNEL_QUEUES.values())
+    out = {
+        "THREAD_STATE": {"entries": len(conductor.THREAD_STATE), "bytes": deep_size(conductor.THREAD_STATE)},
+        "PERSONA_COOLDOWN": {"entries": len(conductor.PERSONA_COOLDOWN), "bytes": deep_size(conductor.PERSONA_COOLDOWN)},
+        "CHANNEL_QUEUES": {"entries": len(queues), "queued": sum(q.q.qsize() for q in queues),
+                           "threads": threading.active_count()},
+        "SIMULATION_HISTORY": {"entries": len(autonomous_loop.SIMULATION_HISTORY),
+                               "bytes": deep_size(autonomous_loop.SIMULATION_HISTORY)},
+        "PACERS": {"entries": len(autonomous_loop.PACERS)},
+        "LAST_HUMAN_ACTIVITY": {"entries": len(pacing.LAST_HUMAN_ACTIVITY)},
+        "DEDUPER": {"entries": len(ingest.DEDUPER)},
+        "SPECULATOR": {"entries": len(SPECULATOR._entries), "heads": len(SPECULATOR._heads)},
+        "ADMISSION": {"queued": ADMISSION.stats()["queued"]},
+        "CONTEXT_CACHE": {"entries": len(CONTEXT_CACHE), "bytes": deep_size(CONTEXT_CACHE._entries)},
+        "metrics": {"entries": len(metrics.COUNTERS) + len(metrics.TIMINGS) + len(metrics.GAUGES)},
+    }
+    return out
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _top_growth(new: tracemalloc.Snapshot, old: tracemalloc.Snapshot, limit: int) -> List[Dict]:
+    stats = new.compare_to(old, "lineno")
+    return [
+        {"site": str(s.traceback[0]), "size_diff": s.size_diff, "size": s.size, "count_diff": s.count_diff}
+        for s in stats[:limit] if s.size_diff
+    ]
+
+
+class MemoryDiagnostics:
+    def __init__(self, frames: int = MEMDIAG_FRAMES, top: int = MEMDIAG_TOP, dump_dir: str = MEMDIAG_DIR):
+        self.frames = frames
+        self.top = top
+        self.dump_dir = dump_dir
+        self._first: Optional[tracemalloc.Snapshot] = None
+        self._last: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        # leave out tracemalloc's own bookkeeping
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        with self._lock:
+            self._first = self._last = self._snapshot()
+
+    def report(self) -> Dict:
+        """Snapshot now and compare with the previous report and with the start."""
+        if not tracemalloc.is_tracing():
+            self.start()
+        snap = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            since_last = _top_growth(snap, self._last, self.top)
+            since_start = _top_growth(snap, self._first, self.top)
+            self._last = snap
+        structures = structure_sizes()
+        metrics.gauge("memory.traced_bytes", current)
+        for name, info in structures.items():
+            metrics.gauge(f"memory.{name}.entries", info.get("entries", info.get("queued", 0)))
+        return {
+            "t": time.time(),
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "rss_bytes": _rss_bytes(),
+            "structures": structures,
+            "growth_since_last": since_last,
+            "growth_since_start": since_start,
+        }
+
+    def tick(self):
+        """Periodic job: log the headline numbers and the biggest growth sites."""
+        rep = self.report()
+        logger.info(f"[MEMDIAG] traced={rep['traced_bytes'] / 2**20:.1f}MiB rss={(rep['rss_bytes'] or 0) / 2**20:.1f}MiB "
+                    f"threads={rep['structures']['THREAD_STATE']['entries']} "
+                    f"cooldowns={rep['structures']['PERSONA_COOLDOWN']['entries']}")
+        for g in rep["growth_since_last"][:5]:
+            logger.info(f"[MEMDIAG]   {g['size_diff'] / 1024:+.1f}KiB {g['site']}")
+
+    def dump(self, path: Optional[str] = None) -> str:
+        """Write a full report as JSON and return its path."""
+        rep = self.report()
+        path = path or os.path.join(self.dump_dir, f"memdiag-{int(rep['t'])}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(rep, f, indent=2)
+        logger.info(f"[MEMDIAG] Wrote {path}")
+        return path
+
+
+DIAGNOSTICS = MemoryDiagnostics()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/memory":
+            self.send_error(404)
+            return
+        body = json.dumps(DIAGNOSTICS.report(), indent=2).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        logger.debug(f"[MEMDIAG] {fmt % args}")
+
+
+def start_memory_diagnostics(interval_s: float = MEMDIAG_INTERVAL_S, port: int = MEMDIAG_PORT):
+    """Start tracing, the periodic report, the SIGUSR1 dump and (with a port) the local endpoint.
+
+    Call from the main thread (signal handlers can only be installed there).
+    """
+    from .scheduler import SCHEDULER
+
+    DIAGNOSTICS.start()
+    SCHEDULER.every("memdiag", interval_s, DIAGNOSTICS.tick, first_delay=interval_s)
+    SCHEDULER.start()
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=DIAGNOSTICS.dump, daemon=True).start())
+    if port:
+        server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        threading.Thread(target=server.serve_forever, daemon=True, name="memdiag-http").start()
+    logger.info(f"[MEMDIAG] Tracing {MEMDIAG_FRAMES} frames; report every {interval_s:.0f}s, "
+                f"dump with `kill -USR1 {os.getpid()}`" + (f" or GET http://127.0.0.1:{port}/memory" if port else ""))
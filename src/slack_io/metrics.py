@@ -0,0 +1,58 @@
+"""
+Process-wide counters and timings for the simulation.
+
+Everything here is in-memory and cheap to update from any thread; call
+`snapshot()` to read the current values (e.g. from a log line or a debug hook).
+"""
+import threading, time
+from typing import Dict
+
+_LOCK = threading.Lock()
+COUNTERS: Dict[str, float] = {}
+TIMINGS: Dict[str, dict] = {}   # name -> {count, total, max}
+GAUGES: Dict[str, float] = {}
+STARTED_AT = time.time()
+
+def incr(name: str, n: float = 1):
+    with _LOCK:
+        COUNTERS[name] = COUNTERS.get(name, 0) + n
+
+def observe(name: str, value: float):
+    """Record one sample of a duration/size (count, total and max are kept)."""
+    with _LOCK:
+        t = TIMINGS.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["total"] += value
+        if value > t["max"]:
+            t["max"] = value
+
+def gauge(name: str, value: float):
+    with _LOCK:
+        GAUGES[name] = value
+
+def get(name: str, default: float = 0) -> float:
+    with _LOCK:
+        return COUNTERS.get(name, default)
+
+def get_gauge(name: str, default: float = 0) -> float:
+    with _LOCK:
+        return GAUGES.get(name, default)
+
+def snapshot() -> dict:
+    with _LOCK:
+        timings = {
+            k: {"count": v["count"], "avg": (v["total"] / v["count"]) if v["count"] else 0.0, "max": v["max"]}
+            for k, v in TIMINGS.items()
+        }
+        return {
+            "uptime_s": round(time.time() - STARTED_AT, 1),
+            "counters": dict(COUNTERS),
+            "gauges": dict(GAUGES),
+            "timings": timings,
+        }
+
+def reset():
+    with _LOCK:
+        COUNTERS.clear()
+        TIMINGS.clear()
+        GAUGES.clear()
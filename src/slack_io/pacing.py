@@ -0,0 +1,99 @@
+"""
+Adaptive pacing for autonomous posting.
+
+A `Pacer` aims for a configured message rate (per channel or for the whole
+workspace) and adjusts it from feedback: Slack 429s and slow or backed-up
+generation cut the rate multiplicatively, while quiet, healthy periods let it
+climb back additively toward the target (AIMD). Recent human activity caps
+the rate so the simulation doesn't talk over real people.
+"""
+import time, random, threading, logging
+from typing import Dict, Optional
+from . import metrics
+from .usage import LEDGER
+
+logger = logging.getLogger(__name__)
+
+# knobs
+MIN_RATE_PER_MIN = 0.2            # never slower than one message every 5 minutes
+RATE_LIMIT_BACKOFF = 0.5          # multiplier applied after any 429
+OVERLOAD_BACKOFF = 0.8            # multiplier when queues or latency are over budget
+RECOVERY_STEP = 0.25              # msgs/min regained per healthy tick
+QUEUE_DEPTH_BUDGET = 4            # pending autonomous jobs + queued replies before we back off
+LATENCY_BUDGET_S = 6.0            # average generation latency before we back off
+HUMAN_QUIET_S = 120               # humans count as "active" for this long after posting
+HUMAN_ACTIVE_FACTOR = 0.5         # share of the target allowed while humans are active
+JITTER = 0.15                     # +/- fraction applied to each interval
+
+_HUMAN_LOCK = threading.Lock()
+LAST_HUMAN_ACTIVITY: Dict[str, float] = {}  # channel name -> epoch seconds of last human message
+
+def note_human_activity(channel: str):
+    with _HUMAN_LOCK:
+        LAST_HUMAN_ACTIVITY[channel] = time.time()
+
+def _humans_active(channel: Optional[str], now: float) -> bool:
+    with _HUMAN_LOCK:
+        if channel is None:
+            return any(now - t < HUMAN_QUIET_S for t in LAST_HUMAN_ACTIVITY.values())
+        return now - LAST_HUMAN_ACTIVITY.get(channel, 0) < HUMAN_QUIET_S
+
+class Pacer:
+    """AIMD controller for one pacing scope (a channel, or the workspace when channel is None)."""
+
+    def __init__(self, target_per_min: float, channel: Optional[str] = None):
+        self.target_per_min = target_per_min
+        self.channel = channel
+        self.rate = target_per_min
+        self._lock = threading.Lock()
+        self._seen_429 = metrics.get("slack.rate_limited")
+        self._seen_llm = self._llm_totals()
+
+    @staticmethod
+    def _llm_totals():
+        t = metrics.snapshot()["timings"].get("llm.latency_s", {"count": 0, "avg": 0.0})
+        return t["count"], t["count"] * t["avg"]
+
+    def _signals(self) -> dict:
+        rate_limited = metrics.get("slack.rate_limited")
+        n, total = self._llm_totals()
+        seen_n, seen_total = self._seen_llm
+        latency = (total - seen_total) / (n - seen_n) if n > seen_n else None
+        out = {
+            "rate_limited": rate_limited - self._seen_429,
+            "latency_s": latency,
+            "queue_depth": metrics.get_gauge("priority.depth.autonomous") + metrics.get_gauge("admission.queued"),
+        }
+        self._seen_429 = rate_limited
+        self._seen_llm = (n, total)
+        return out
+
+    def next_interval(self) -> float:
+        """Update the rate from feedback since the last call and return seconds until the next message."""
+        with self._lock:
+            s = self._signals()
+            now = time.time()
+            if s["rate_limited"] > 0:
+                self.rate *= RATE_LIMIT_BACKOFF
+                reason = f"{s['rate_limited']:.0f} rate-limited calls"
+            elif s["queue_depth"] > QUEUE_DEPTH_BUDGET:
+                self.rate *= OVERLOAD_BACKOFF
+                reason = f"queue depth {s['queue_depth']:.0f}"
+            elif s["latency_s"] is not None and s["latency_s"] > LATENCY_BUDGET_S:
+                self.rate *= OVERLOAD_BACKOFF
+                reason = f"generation latency {s['latency_s']:.1f}s"
+            else:
+                self.rate += RECOVERY_STEP
+                reason = None
+            ceiling = self.target_per_min
+            if _humans_active(self.channel, now):
+                ceiling *= HUMAN_ACTIVE_FACTOR
+            # slow down as the token budget runs out (see usage.py)
+            ceiling *= LEDGER.budget_scale(self.channel)
+            self.rate = max(MIN_RATE_PER_MIN, min(self.rate, ceiling))
+            scope = self.channel or "workspace"
+            if reason:
+                logger.info(f"[PACING] {scope}: backing off to {self.rate:.2f} msgs/min ({reason})")
+            metrics.gauge(f"pacing.rate_per_min.{scope}", self.rate)
+            interval = 60.0 / self.rate
+            return interval * random.uniform(1 - JITTER, 1 + JITTER)
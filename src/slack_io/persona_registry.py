@@ -1,13 +1,76 @@
 PERSONAS = {
-    "Gabriella_PM": {"username": "Gabriella_PM", "icon": ":memo:", "channels": ["product","announcements"]},
-    "Mike_BE":      {"username": "Mike_BE",      "icon": ":gear:", "channels": ["eng-backend","sre-ops","deployments"]},
-    "Sarah_FE":     {"username": "Sarah_FE",     "icon": ":art:",  "channels": ["eng-frontend","product","random"]},
-    "Kevin_QA":     {"username": "Kevin_QA",     "icon": ":mag:",  "channels": ["qa-testing","eng-backend","eng-frontend","deployments"]},
-    "Nina_SRE":     {"username": "Nina_SRE",     "icon": ":helmet_with_white_cross:", "channels": ["sre-ops","deployments","eng-backend"]},
-    "Ravi_Staff":   {"username": "Ravi_Staff",   "icon": ":compass:", "channels": ["eng-backend","product","sre-ops"]},
-    "Dana_DS":      {"username": "Dana_DS",      "icon": ":bar_chart:", "channels": ["product","eng-backend","eng-frontend"]},
-    "Zoey_UX":      {"username": "Zoey_UX",      "icon": ":lipstick:", "channels": ["design-ux","product","eng-frontend"]},
-    "Tara_TPM":     {"username": "Tara_TPM",     "icon": ":calendar:", "channels": ["product","announcements","eng-backend","eng-frontend"]},
+    "Gabriella_PM": {
+        "username": "Gabriella_PM", "icon": ":memo:", "channels": ["product","announcements"],
+        "role": "Product Manager",
+        "knowledge_domains": ["roadmap", "prioritization", "customer feedback", "launch planning", "pricing", "requirements", "stakeholders"],
+        "behaviors": ["clarifies scope and acceptance criteria", "weighs customer impact against timelines", "summarizes decisions for stakeholders"],
+        "tone_ticks": ["quick gut check", "what's the customer impact?", "let's scope this"],
+        "seed_snippets": ["Can we get a rough estimate before Thursday's roadmap review?", "Customers on the enterprise plan keep asking about SSO, bumping it up the list."],
+    },
+    "Mike_BE": {
+        "username": "Mike_BE", "icon": ":gear:", "channels": ["eng-backend","sre-ops","deployments"],
+        "role": "Backend Engineer",
+        "knowledge_domains": ["api", "database", "postgres", "queries", "caching", "redis", "latency", "migrations", "endpoints", "services"],
+        "behaviors": ["digs into logs and query plans", "proposes concrete fixes with PRs", "flags schema and migration risks"],
+        "tone_ticks": ["looking into it", "root cause is", "PR incoming"],
+        "seed_snippets": ["p95 on /orders jumped after the migration, looks like a missing index.", "Cache hit rate dropped to 60%, checking the redis eviction policy."],
+    },
+    "Sarah_FE": {
+        "username": "Sarah_FE", "icon": ":art:", "channels": ["eng-frontend","product","random"],
+        "role": "Frontend Engineer",
+        "knowledge_domains": ["react", "ui", "css", "components", "browser", "bundle size", "accessibility", "page load"],
+        "behaviors": ["reproduces UI bugs across browsers", "ships small component fixes", "checks designs against implementation"],
+        "tone_ticks": ["on it", "repro'd in Safari", "quick fix up"],
+        "seed_snippets": ["The checkout button jumps on mobile Safari, fixing the flex layout now.", "Bundle size went up 80kb with the new chart lib, can we lazy load it?"],
+    },
+    "Kevin_QA": {
+        "username": "Kevin_QA", "icon": ":mag:", "channels": ["qa-testing","eng-backend","eng-frontend","deployments"],
+        "role": "QA Tester",
+        "knowledge_domains": ["testing", "regression", "test plan", "repro steps", "flaky tests", "staging", "edge cases", "bug"],
+        "behaviors": ["writes precise repro steps", "runs regression suites before release", "verifies fixes on staging"],
+        "tone_ticks": ["repro steps below", "verified on staging", "found an edge case"],
+        "seed_snippets": ["Can repro the login loop on staging with an expired token, steps in the ticket.", "Regression suite is green except two flaky upload tests."],
+    },
+    "Nina_SRE": {
+        "username": "Nina_SRE", "icon": ":helmet_with_white_cross:", "channels": ["sre-ops","deployments","eng-backend"],
+        "role": "SRE / DevOps",
+        "knowledge_domains": ["incident", "outage", "alerts", "monitoring", "kubernetes", "rollback", "deploy", "on-call", "error rate", "infrastructure"],
+        "behaviors": ["triages alerts and incidents", "proposes rollbacks and mitigations", "tracks error budgets and dashboards"],
+        "tone_ticks": ["paging in", "rolling back", "dashboards look"],
+        "seed_snippets": ["Error rate on api-gateway spiked to 4% after the 14:10 deploy, rolling back.", "Pods are OOMKilled on the worker pool, bumping memory limits for now."],
+    },
+    "Ravi_Staff": {
+        "username": "Ravi_Staff", "icon": ":compass:", "channels": ["eng-backend","product","sre-ops"],
+        "role": "Staff Engineer",
+        "knowledge_domains": ["architecture", "design doc", "scalability", "technical debt", "tradeoffs", "system design", "reliability"],
+        "behaviors": ["steps back to the architectural picture", "calls out long-term tradeoffs", "suggests design reviews"],
+        "tone_ticks": ["zooming out", "the tradeoff here", "worth a design doc"],
+        "seed_snippets": ["Zooming out, we keep patching the sync job; worth moving to an event queue.", "Let's write a short design doc before we add a third cache layer."],
+    },
+    "Dana_DS": {
+        "username": "Dana_DS", "icon": ":bar_chart:", "channels": ["product","eng-backend","eng-frontend"],
+        "role": "Data Scientist",
+        "knowledge_domains": ["metrics", "experiment", "a/b test", "conversion", "retention", "analytics", "dashboard", "data"],
+        "behaviors": ["backs claims with numbers", "designs and reads experiments", "flags tracking gaps"],
+        "tone_ticks": ["the data says", "stat sig", "let me pull the numbers"],
+        "seed_snippets": ["The new onboarding variant lifts day-7 retention by 3%, not stat sig yet.", "Conversion dipped Tuesday but it lines up with the tracking outage."],
+    },
+    "Zoey_UX": {
+        "username": "Zoey_UX", "icon": ":lipstick:", "channels": ["design-ux","product","eng-frontend"],
+        "role": "UX Designer",
+        "knowledge_domains": ["design", "figma", "usability", "user research", "mockups", "design system", "accessibility", "user flow"],
+        "behaviors": ["shares mockups and user research", "pushes for consistent patterns", "advocates for accessibility"],
+        "tone_ticks": ["from the user's side", "updated the figma", "usability test showed"],
+        "seed_snippets": ["Updated the Figma for the settings flow, the save state is clearer now.", "Usability tests showed people miss the filter toggle entirely."],
+    },
+    "Tara_TPM": {
+        "username": "Tara_TPM", "icon": ":calendar:", "channels": ["product","announcements","eng-backend","eng-frontend"],
+        "role": "TPM",
+        "knowledge_domains": ["timeline", "milestones", "dependencies", "blockers", "release", "planning", "status", "risks"],
+        "behaviors": ["tracks owners and dates", "surfaces cross-team dependencies", "keeps status updates moving"],
+        "tone_ticks": ["who owns this?", "ETA?", "adding to the tracker"],
+        "seed_snippets": ["Release is at risk if the API change slips past Wednesday, who owns it?", "Adding the migration and QA sign-off to the tracker for this sprint."],
+    },
 }
 
 # Lightweight policy: who is likely to respond in which channel
@@ -18,9 +81,9 @@ CHANNEL_POLICY = {
     "qa-testing":   {"candidates": ["Kevin_QA","Mike_BE","Sarah_FE"], "p_reply": 0.70},
     "product":      {"candidates": ["Gabriella_PM","Tara_TPM","Ravi_Staff","Sarah_FE","Dana_DS"], "p_reply": 0.55},
     "deployments":  {"candidates": ["Nina_SRE","Mike_BE","Kevin_QA","Tara_TPM"], "p_reply": 0.65},
-    "announcements":{"candidates": ["Tara_TPM","Gabriella_PM"], "p_reply": 0.25},  # usually proactive
+    "announcements":{"candidates": ["Tara_TPM","Gabriella_PM"], "p_reply": 0.25, "reply_threshold": 0.5},  # usually proactive
     "design-ux":    {"candidates": ["Zoey_UX","Sarah_FE"], "p_reply": 0.5},
-    "random":       {"candidates": ["Sarah_FE"], "p_reply": 0.2},
+    "random":       {"candidates": ["Sarah_FE"], "p_reply": 0.2, "reply_threshold": 0.5},
 }
 
 # conductor.py
@@ -1,6 +1,11 @@
+import math
 import random
-from typing import Dict, Any
+import re
+import zlib
+from typing import Dict, Any, List, Optional
+import numpy as np
 from .slack_client import post_message
+from .persona_registry import PERSONAS as PERSONA_PROFILES
 
 PERSONAS = {
     "Gabriella_PM": ("Gabriella_PM", ":memo:"),
@@ -14,11 +19,91 @@ PERSONAS = {
     "Tara_TPM":     ("Tara_TPM", ":calendar:"),
 }
 
+# Relevance routing knobs
+HASH_DIM = 1 << 14          # hashed feature space for unigrams + bigrams
+ROUTER_SHARPNESS = 2.0      # higher = stronger preference for the best-matching personas
+ROUTER_FLOOR = 0.05         # weight every candidate keeps, so off-topic personas still chime in sometimes
+PROFILE_FIELDS = ("role", "knowledge_domains", "behaviors", "seed_snippets")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by can for from has have i if in is it its me my of on or our so that the "
+    "this to up we what when with you your".split()
+)
+
+
+def _features(text: str) -> List[int]:
+    """Hashed unigram + bigram feature ids for text (crc32, so stable across processes)."""
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return [zlib.crc32(g.encode()) & (HASH_DIM - 1) for g in grams]
+
+
+def _profile_text(cfg: Dict[str, Any]) -> str:
+    parts = []
+    for field in PROFILE_FIELDS:
+        value = cfg.get(field, "")
+        parts.append(" ".join(value) if isinstance(value, list) else str(value))
+    return " ".join(parts)
+
+
+class PersonaRouter:
+    """Scores event text against persona profiles with hashed n-gram TF-IDF vectors.
+
+    Profiles are vectorized once into a (personas x HASH_DIM) matrix; an event is
+    reduced to its handful of feature ids, so scoring is a column gather plus a
+    small matrix-vector product across every candidate at once.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]]):
+        self.names = list(profiles)
+        self.row = {name: i for i, name in enumerate(self.names)}
+        tf = np.zeros((len(self.names), HASH_DIM), dtype=np.float32)
+        for i, name in enumerate(self.names):
+            np.add.at(tf[i], _features(_profile_text(profiles[name])), 1.0)
+        df = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1 + len(self.names)) / (1 + df)) + 1).astype(np.float32)
+        mat = np.log1p(tf) * self.idf
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        self.matrix = mat / np.maximum(norms, 1e-9)
+
+    def scores(self, text: str, candidates: List[str]) -> np.ndarray:
+        """Cosine similarity of text to each candidate's profile (0 for unknown personas)."""
+        rows = np.array([self.row.get(c, -1) for c in candidates])
+        out = np.zeros(len(candidates), dtype=np.float32)
+        ids, counts = np.unique(_features(text), return_counts=True)
+        known = rows >= 0
+        if not len(ids) or not known.any():
+            return out
+        q = np.log1p(counts.astype(np.float32)) * self.idf[ids]
+        q /= max(float(np.linalg.norm(q)), 1e-9)
+        out[known] = self.matrix[np.ix_(rows[known], ids)] @ q
+        return out
+
+    def weights(self, text: str, candidates: List[str]) -> np.ndarray:
+        s = self.scores(text, candidates)
+        top = float(s.max(initial=0.0))
+        if top <= 0:
+            return np.full(len(candidates), ROUTER_FLOOR)
+        return ROUTER_FLOOR + (s / top) ** ROUTER_SHARPNESS
+
+    def sample(self, text: str, candidates: List[str], k: int, rng: Optional[random.Random] = None) -> List[str]:
+        """Pick k distinct candidates, weighted by relevance, in sampled order (likelier ones tend to come first)."""
+        if k <= 0 or not candidates:
+            return []
+        rng = rng or random
+        # Efraimidis-Spirakis: top-k of u^(1/w) is weighted sampling without replacement
+        keys = [math.log(rng.random() or 1e-12) / float(w) for w in self.weights(text, candidates)]
+        order = sorted(range(len(candidates)), key=keys.__getitem__, reverse=True)
+        return [candidates[i] for i in order[:k]]
+
+
+ROUTER = PersonaRouter(PERSONA_PROFILES)
+
+
 def choose_responder(channel: str, event_text: str) -> str:
-    if channel.startswith("C"):
-        pass
     pool = list(PERSONAS.keys())
-    return random.choice(pool)
+    return ROUTER.sample(event_text, pool, 1)[0]
 
 
 def generate_reply_text(persona: str, event_text: str, recent_context: str) -> str:
@@ -29,4 +114,4 @@ def maybe_reply(channel: str, thread_ts: str, event_text: str, recent_context: s
     persona = choose_responder(channel, event_text)
     username, icon = PERSONAS[persona]
     text = generate_reply_text(persona, event_text, recent_context)
-    post_message(channel=channel, text=text, username=username, icon_emoji=icon, thread_ts=thread_ts)
\ No newline at end of file
+    post_message(channel=channel, text=text, username=username, icon_emoji=icon, thread_ts=thread_ts)
@@ -0,0 +1,160 @@
+"""
+Priority-aware worker pool shared by everything that generates content.
+
+Human-triggered replies, persona-to-persona replies, proactive posts, the
+autonomous loop and the seeders all submit their LLM+post work here instead
+of running it on their own threads. Each producer has a class; classes are
+served by weighted fair queuing (self-clocked: every job gets a virtual
+finish tag of `max(vtime, last tag of its class) + 1/weight` and the smallest
+tag runs next), so a saturated low class can't starve a high one. A few
+workers are reserved for human replies so they keep low latency even when
+every other worker is busy with autonomous generation.
+"""
+import time, heapq, itertools, threading, logging
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# class -> weight (share of workers under contention)
+PRIORITY_CLASSES = {
+    "human": 16,
+    "persona": 6,
+    "proactive": 2,
+    "autonomous": 2,
+    "seed": 1,
+    "speculative": 1,
+}
+# class -> max jobs waiting; beyond this, submit() refuses (None = unbounded)
+MAX_PENDING = {"human": None, "persona": None, "proactive": 2, "autonomous": 8, "seed": 4, "speculative": 4}
+
+# knobs
+POOL_WORKERS = 8
+RESERVED_WORKERS = 2          # only ever run "human" jobs
+RESERVED_CLASSES = ("human",)
+
+class _Task:
+    __slots__ = ("cls", "fn", "args", "kwargs", "future", "ready_at", "tag")
+
+    def __init__(self, cls, fn, args, kwargs, ready_at):
+        self.cls = cls
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.ready_at = ready_at
+        self.tag = 0.0
+
+class PriorityPool:
+    def __init__(self, workers: int = POOL_WORKERS, reserved: int = RESERVED_WORKERS, classes: Dict[str, float] = None):
+        self.classes = dict(classes or PRIORITY_CLASSES)
+        self._ready: Dict[str, deque] = {c: deque() for c in self.classes}
+        self._last_tag: Dict[str, float] = {c: 0.0 for c in self.classes}
+        self._vtime = 0.0
+        self._delayed = []          # heap of (ready_at, seq, task)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running: Dict[str, int] = {c: 0 for c in self.classes}
+        self._workers = []
+        reserved = min(reserved, max(workers - 1, 0))
+        for i in range(workers):
+            allowed = RESERVED_CLASSES if i < reserved else tuple(self.classes)
+            t = threading.Thread(target=self._worker, args=(allowed,), name=f"priority-{i}", daemon=True)
+            t.start()
+            self._workers.append(t)
+
+    def _pending(self, cls: str) -> int:
+        return len(self._ready[cls]) + sum(1 for _, _, t in self._delayed if t.cls == cls)
+
+    def submit(self, cls: str, fn, *args, delay_s: float = 0.0, **kwargs) -> Optional[Future]:
+        """Run `fn(*args, **kwargs)` on the pool under priority class `cls`.
+
+        Returns a Future, or None if the class is at its pending limit.
+        """
+        if cls not in self.classes:
+            raise ValueError(f"Unknown priority class: {cls}")
+        task = _Task(cls, fn, args, kwargs, time.time() + max(delay_s, 0.0))
+        with self._cond:
+            limit = MAX_PENDING.get(cls)
+            if limit is not None and self._pending(cls) >= limit:
+                metrics.incr(f"priority.refused.{cls}")
+                logger.info(f"[PRIORITY] Refusing {cls} job ({limit} already pending)")
+                return None
+            if delay_s > 0:
+                heapq.heappush(self._delayed, (task.ready_at, next(self._seq), task))
+            else:
+                self._make_ready(task)
+            metrics.incr(f"priority.submitted.{cls}")
+            self._cond.notify_all()
+        return task.future
+
+    def _make_ready(self, task: _Task):
+        task.tag = max(self._vtime, self._last_tag[task.cls]) + 1.0 / self.classes[task.cls]
+        self._last_tag[task.cls] = task.tag
+        self._ready[task.cls].append(task)
+        metrics.gauge(f"priority.depth.{task.cls}", len(self._ready[task.cls]))
+
+    def _promote_delayed(self, now: float):
+        while self._delayed and self._delayed[0][0] <= now:
+            _, _, task = heapq.heappop(self._delayed)
+            self._make_ready(task)
+
+    def _pick(self, allowed) -> Optional[_Task]:
+        best = None
+        for cls in allowed:
+            q = self._ready[cls]
+            if q and (best is None or q[0].tag < best[0].tag):
+                best = q
+        if best is None:
+            return None
+        task = best.popleft()
+        self._vtime = task.tag
+        metrics.gauge(f"priority.depth.{task.cls}", len(best))
+        return task
+
+    def _worker(self, allowed):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.time()
+                    self._promote_delayed(now)
+                    task = self._pick(allowed)
+                    if task:
+                        break
+                    timeout = (self._delayed[0][0] - now) if self._delayed else None
+                    self._cond.wait(timeout=timeout)
+                self._running[task.cls] += 1
+            metrics.observe(f"priority.wait_s.{task.cls}", time.time() - task.ready_at)
+            if not task.future.set_running_or_notify_cancel():
+                with self._cond:
+                    self._running[task.cls] -= 1
+                continue
+            try:
+                task.future.set_result(task.fn(*task.args, **task.kwargs))
+            except Exception as e:
+                logger.error(f"[PRIORITY] {task.cls} job failed: {e}", exc_info=True)
+                task.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._running[task.cls] -= 1
+
+    def busy(self, ignore=()) -> int:
+        """Jobs running or ready to run right now, not counting classes in `ignore`."""
+        with self._cond:
+            return sum(len(self._ready[c]) + self._running[c] for c in self.classes if c not in ignore)
+
+    def stats(self) -> dict:
+        timings = metrics.snapshot()["timings"]
+        with self._cond:
+            return {
+                cls: {
+                    "pending": self._pending(cls),
+                    "running": self._running[cls],
+                    "wait_s": timings.get(f"priority.wait_s.{cls}", {"count": 0, "avg": 0.0, "max": 0.0}),
+                }
+                for cls in self.classes
+            }
+
+POOL = PriorityPool()
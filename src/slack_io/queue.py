@@ -1,11 +1,17 @@
-import time, queue, threading
+import time, queue, threading, logging
+from concurrent.futures import Future
+from typing import Optional
 from slack_sdk.errors import SlackApiError
+from . import metrics
+from .coalesce import READS
+
+logger = logging.getLogger(__name__)
 
 class ChannelQueue:
-    def __init__(self, client, cooldown = 1.1):
+    def __init__(self, client, cooldown = 1.1, maxsize = 50):
         self.client = client
         self.cooldown = cooldown
-        self.q = queue.Queue()
+        self.q = queue.Queue(maxsize=maxsize)
         t = threading.Thread(target=self._worker, daemon=True)
         t.start()
 
@@ -13,20 +19,39 @@ class ChannelQueue:
     def _worker(self):
         last = 0.0
         while True:
-            fn, kwargs = self.q.get()
+            fn, kwargs, fut = self.q.get()
             delay = max(0.0, self.cooldown - (time.time() - last))
             if delay > 0: time.sleep(delay)
             try:
-                fn(**kwargs)
+                fut.set_result(fn(**kwargs))
             except SlackApiError as e:
                 if e.response.status_code == 429:
+                    # Pacing controllers watch this counter to slow producers down
+                    metrics.incr("slack.rate_limited")
                     wait = int(e.response.headers.get("Retry-After", "1"))
                     time.sleep(wait + 0.1)
-                    fn(**kwargs)
+                    try:
+                        fut.set_result(fn(**kwargs))
+                    except SlackApiError as e2:
+                        logger.warning(f"[QUEUE] Retry failed for {kwargs.get('channel')}: {e2}")
+                        fut.set_exception(e2)
                 else:
-                    pass
+                    fut.set_exception(e)
+            except Exception as e:
+                fut.set_exception(e)
+            # reads cached before this post are stale now
+            READS.invalidate(kwargs.get("channel"))
             last = time.time()
             self.q.task_done()
 
-    def enqueue(self, fn, **kwargs):
-        self.q.put((fn, kwargs))
\ No newline at end of file
+    def enqueue(self, fn, **kwargs) -> Optional[Future]:
+        """Queue a Slack call; returns a Future for its response, or None if dropped."""
+        # Never block the producer; a full queue means Slack can't keep up anyway
+        fut = Future()
+        try:
+            self.q.put_nowait((fn, kwargs, fut))
+            return fut
+        except queue.Full:
+            metrics.incr("queue.dropped")
+            logger.warning(f"[QUEUE] Dropping post to {kwargs.get('channel')} (queue full: {self.q.maxsize})")
+            return None
\ No newline at end of file
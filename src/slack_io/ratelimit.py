@@ -0,0 +1,71 @@
+"""
+Token-bucket rate limiting shared by the scraper, exporter and importer.
+
+A bucket refills at `rate` tokens per second up to `capacity`; `acquire()`
+blocks until a token is available. `KeyedRateLimiter` keeps one bucket per
+key (a host, a channel, an API tier...).
+"""
+import time, threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Tokens added per second (<= 0 disables limiting)
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens`, sleeping as long as needed. Returns the time spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so nothing is granted for `seconds` (e.g. after a Retry-After)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+class KeyedRateLimiter:
+    """One token bucket per key, created on first use."""
+
+    def __init__(self, rate: float, capacity: float = 1.0, overrides: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.overrides = overrides or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.overrides.get(key, self.rate), self.capacity)
+            return self._buckets[key]
+
+    def acquire(self, key: str, tokens: float = 1.0) -> float:
+        return self.bucket(key).acquire(tokens)
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
@@ -0,0 +1,102 @@
+"""
+Replay a recorded event log (see event_log.py) offline and deterministically.
+
+Events go back through the Bolt handlers on a virtual clock, against the
+stand-in Slack client and the stub LLM provider, with seeded randomness (see
+sim.py). The run prints a digest of everything the personas posted; two runs of
+the same log and seed on the same code give the same digest, so a change in
+the digest across versions means a behaviour change.
+
+    python -m slack_io.replay events.jsonl --speed max --seed 7 --out transcript.jsonl
+"""
+import os, sys, json, time, hashlib, argparse, logging
+
+REPLAY_HASH_SEED = "0"      # set/frozenset iteration order must match across runs
+
+
+def _parse_speed(value: str) -> float:
+    return 0.0 if value in ("max", "0") else float(value)
+
+
+def digest(posts) -> str:
+    h = hashlib.sha256()
+    for p in posts:
+        h.update(json.dumps([p["channel"], p["thread_ts"], p["ts"], p["username"], p["text"]],
+                            ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def replay(path: str, speed: float = 0.0, seed: int = 0, include_bot_events: bool = False, tail_s: float = 120.0):
+    """Run the log through the app; returns (simulation, summary dict)."""
+    from .event_log import read_log
+    from .sim import Simulation
+    from . import metrics
+
+    header, records, torn = read_log(path)
+    sim = Simulation(start=header.get("started", 0.0), channels=header.get("channels", {}), seed=seed).install()
+    skipped = 0
+    for rec in records:
+        event = rec["e"]
+        if event.get("subtype") == "bot_message" and not include_bot_events:
+            # our own posts: the stand-in echoes the replayed ones instead
+            skipped += 1
+            continue
+        body = {"event": event, "event_id": rec.get("id")}
+        sim.at(sim.clock.now + rec["t"], sim.deliver, event, body, rec["src"])
+
+    end = sim.clock.now + (records[-1]["t"] if records else 0.0) + tail_s
+    t0 = time.time()
+    sim.run(until=end, speed=speed)
+    counters = metrics.snapshot()["counters"]
+    summary = {
+        "events": len(records),
+        "torn_lines": torn,
+        "skipped_bot_events": skipped,
+        "delivered": sim.events_delivered,
+        "posts": len(sim.slack.posts),
+        "llm_calls": sum(v for k, v in counters.items() if k.startswith("llm.requests.")),
+        "slack_calls": dict(sorted(sim.slack.calls.items())),
+        "virtual_s": round(sim.clock.now - header.get("started", 0.0), 1),
+        "wall_s": round(time.time() - t0, 2),
+        "digest": digest(sim.slack.posts),
+    }
+    return sim, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Slack event log offline")
+    parser.add_argument("log", help="Event log written with EVENT_LOG=path")
+    parser.add_argument("--speed", default="max", help="'max' (default), 1 for real time, or N for N× speed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the persona posts (the transcript) here as JSONL")
+    parser.add_argument("--include-bot-events", action="store_true",
+                        help="Also replay recorded persona posts instead of relying on the stand-in's echoes")
+    parser.add_argument("--tail", type=float, default=120.0, help="Seconds to keep running after the last event")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    if os.environ.get("PYTHONHASHSEED") != REPLAY_HASH_SEED:
+        os.environ["PYTHONHASHSEED"] = REPLAY_HASH_SEED
+        os.execv(sys.executable, [sys.executable, "-m", "slack_io.replay"] + sys.argv[1:])
+
+    # Offline backends must be chosen before the app modules are imported
+    os.environ["SLACK_OFFLINE"] = "1"
+    os.environ["LLM_PROVIDER"] = "stub"
+    os.environ.pop("EVENT_LOG", None)
+    os.environ.pop("LLM_RECORD", None)
+    os.environ.pop("LLM_REPLAY", None)
+
+    from . import bolt_app  # noqa: F401  (registers the handlers; configures logging)
+    if not args.verbose:
+        logging.disable(logging.INFO)
+
+    sim, summary = replay(args.log, _parse_speed(args.speed), args.seed, args.include_bot_events, args.tail)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for p in sim.slack.posts:
+                f.write(json.dumps(p, ensure_ascii=False) + "\n")
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Reply-worthiness gate.
+
+Runs in the conductor before repliers are picked: decides whether a message is
+worth spending LLM calls on at all, and whether it warrants more responders
+than the channel's usual fan-out (or just one, when addressed to someone). Obvious
+noise (join/leave events, emoji-only posts, "ok"/"thanks" acks) is dropped by
+rules; everything else is scored by a small logistic model over hashed token
+features plus a few shape features (question, mention, link, length).
+"""
+import math, re, zlib, logging
+from typing import Dict, NamedTuple, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# knobs
+REPLY_THRESHOLD = 0.35      # default minimum score to reply; override per channel with CHANNEL_POLICY "reply_threshold"
+HASH_DIM = 1 << 12          # hashed token feature space
+RESPONDER_SCORES = (0.85, 0.97)  # scores from which a message draws at least a second / third responder
+
+NOISE_SUBTYPES = {
+    "channel_join", "channel_leave", "channel_topic", "channel_purpose", "channel_name",
+    "message_changed", "message_deleted", "pinned_item", "unpinned_item", "reminder_add",
+}
+ACKS = {
+    "ok", "okay", "k", "kk", "thanks", "thank you", "thx", "ty", "tysm", "cool", "nice", "lgtm", "+1",
+    "yep", "yup", "yes", "no", "nope", "sure", "got it", "sounds good", "will do", "done", "lol", "haha",
+    "great", "awesome", "np", "ack", "on it", "noted", "perfect",
+}
+_EMOJI_ONLY_RE = re.compile(r"^(\s*(:[a-z0-9_+\-']+:|[^\w\s]))+\s*$")
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_MENTION_RE = re.compile(r"<[@!][A-Za-z0-9|^]+>")
+_URL_RE = re.compile(r"<?https?://")
+
+# Logistic model: bias, shape feature weights and per-token weights (hashed at import)
+BIAS = -0.6
+SHAPE_WEIGHTS = {
+    "question": 1.6,     # contains "?"
+    "mention": 1.2,      # @-mentions someone
+    "link": 0.3,
+    "log_words": 0.45,   # log(1 + word count)
+    "short": -1.2,       # three words or fewer
+}
+TOKEN_WEIGHTS = {
+    # asks and problems pull replies
+    "how": 0.7, "why": 0.8, "what": 0.5, "anyone": 0.9, "can": 0.4, "could": 0.4, "should": 0.5,
+    "help": 1.0, "thoughts": 1.0, "review": 0.8, "blocked": 1.1, "blocker": 1.1, "urgent": 1.2,
+    "error": 1.0, "errors": 1.0, "broken": 1.1, "fails": 1.0, "failing": 1.0, "bug": 0.9, "down": 0.9,
+    "outage": 1.3, "incident": 1.2, "spike": 0.9, "rollback": 0.9, "regression": 0.9, "slow": 0.7,
+    "latency": 0.7, "deploy": 0.5, "release": 0.5, "proposal": 0.7, "idea": 0.5, "eta": 0.8, "decide": 0.7,
+    # closure and chatter push away from replies
+    "thanks": -1.2, "thank": -1.0, "thx": -1.2, "lol": -0.9, "haha": -0.9, "lgtm": -1.0, "fixed": -0.4,
+    "done": -0.5, "merged": -0.5, "resolved": -0.8, "fyi": -0.6, "bye": -1.0, "morning": -0.4,
+}
+
+
+def _bucket(token: str) -> int:
+    return zlib.crc32(token.encode()) & (HASH_DIM - 1)
+
+
+_TOKEN_VECTOR = [0.0] * HASH_DIM
+for _tok, _w in TOKEN_WEIGHTS.items():
+    _TOKEN_VECTOR[_bucket(_tok)] += _w
+
+
+class GateDecision(NamedTuple):
+    reply: bool
+    score: float
+    responders: int     # fewest repliers the message warrants (0 when not replying)
+    reason: str
+    addressed: bool = False  # @-mentions someone: one reply, whatever the fan-out
+
+
+def score(text: str) -> float:
+    """Probability-like reply-worthiness of a message (0..1)."""
+    words = _TOKEN_RE.findall(text.lower())
+    z = BIAS
+    z += SHAPE_WEIGHTS["question"] * ("?" in text)
+    z += SHAPE_WEIGHTS["mention"] * bool(_MENTION_RE.search(text))
+    z += SHAPE_WEIGHTS["link"] * bool(_URL_RE.search(text))
+    z += SHAPE_WEIGHTS["log_words"] * math.log1p(len(words))
+    z += SHAPE_WEIGHTS["short"] * (len(words) <= 3)
+    z += sum(_TOKEN_VECTOR[_bucket(w)] for w in set(words))
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _rule(text: str, subtype: Optional[str]) -> Optional[str]:
+    """Reason to drop a message outright, or None."""
+    if subtype in NOISE_SUBTYPES:
+        return f"subtype:{subtype}"
+    stripped = text.strip()
+    if not stripped:
+        return "empty"
+    if _EMOJI_ONLY_RE.match(stripped):
+        return "emoji"
+    if " ".join(_TOKEN_RE.findall(stripped.lower())) in ACKS:
+        return "ack"
+    return None
+
+
+def evaluate(text: str, subtype: Optional[str] = None, threshold: float = REPLY_THRESHOLD,
+             max_responders: int = 3) -> GateDecision:
+    """Decide whether a message warrants a reply and how many responders it needs at least."""
+    reason = _rule(text, subtype)
+    if reason:
+        return GateDecision(False, 0.0, 0, reason)
+    s = score(text)
+    if s < threshold:
+        return GateDecision(False, s, 0, "score")
+    if _MENTION_RE.search(text):
+        return GateDecision(True, s, 1, "score", addressed=True)
+    responders = 1 + sum(s >= cut for cut in RESPONDER_SCORES)
+    return GateDecision(True, s, min(responders, max_responders), "score")
+
+
+def record(decision: GateDecision, planned_calls: int):
+    """Count the gate outcome; planned_calls is how many generations would have run without it."""
+    metrics.observe("reply_gate.score", decision.score)
+    if not decision.reply:
+        metrics.incr(f"reply_gate.blocked.{decision.reason.split(':')[0]}")
+        metrics.incr("reply_gate.llm_calls_avoided", planned_calls)
+        return
+    metrics.incr("reply_gate.passed")
+    if decision.addressed and planned_calls > 1:
+        metrics.incr("reply_gate.llm_calls_avoided", planned_calls - 1)
+    elif decision.responders > planned_calls:
+        metrics.incr("reply_gate.fanout_raised")
+
+
+def stats() -> Dict[str, int]:
+    snap = metrics.snapshot()["counters"]
+    return {k[len("reply_gate."):]: v for k, v in snap.items() if k.startswith("reply_gate.")}
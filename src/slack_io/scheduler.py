@@ -0,0 +1,202 @@
+"""
+Time-based job scheduler.
+
+One thread keeps a min-heap of next-fire times for every registered job and
+sleeps until the earliest one is due; fired jobs are handed to the shared
+priority pool, so nothing here ever blocks on the LLM or Slack. Jobs can be
+fixed-interval, cron-like, random (Poisson) arrivals, or driven by any
+callable that returns the next delay (e.g. an adaptive pacer).
+"""
+import time, heapq, random, itertools, threading, logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set
+from .priority import POOL
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+class CronSpec:
+    """Five-field cron expression: minute hour day-of-month month day-of-week.
+
+    Each field accepts `*`, `*/n`, `a`, `a-b`, `a-b/n` and comma lists of
+    those. Day-of-week uses 0 (or 7) for Sunday. As in cron, when both day
+    fields are restricted a day matches if either does.
+    """
+    _RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, spec: str):
+        fields = spec.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron spec needs 5 fields, got {len(fields)}: {spec!r}")
+        self.spec = spec
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self._RANGES)]
+        self.minutes, self.hours, self.days, self.months, dows = parsed
+        self.dows = {d % 7 for d in dows}
+        self.dom_any = fields[2] == "*"
+        self.dow_any = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> Set[int]:
+        out = set()
+        for part in field.split(","):
+            rng, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if rng == "*":
+                a, b = lo, hi
+            elif "-" in rng:
+                a, b = (int(x) for x in rng.split("-", 1))
+            else:
+                a = b = int(rng)
+            if a < lo or b > hi or a > b or step < 1:
+                raise ValueError(f"Bad cron field {field!r} (allowed {lo}-{hi})")
+            out.update(range(a, b + 1, step))
+        return out
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.dows
+        if self.dom_any and self.dow_any:
+            return True
+        if self.dom_any:
+            return dow
+        if self.dow_any:
+            return dom
+        return dom or dow
+
+    def next_after(self, t: float) -> float:
+        """Epoch seconds of the first matching minute strictly after `t` (local time)."""
+        dt = datetime.fromtimestamp(t).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt.timestamp()
+        raise ValueError(f"Cron spec {self.spec!r} never fires")
+
+class Job:
+    def __init__(self, name: str, fn: Callable, next_fire: Callable[[float], float], priority: str,
+                 jitter_s: float = 0.0, max_instances: int = 1):
+        self.name = name
+        self.fn = fn
+        self.next_fire = next_fire      # now -> epoch seconds of the next run (before jitter)
+        self.priority = priority
+        self.jitter_s = jitter_s
+        self.max_instances = max_instances
+        self.running = 0
+        self.cancelled = False
+        self.fired = 0
+        self.skipped = 0
+
+    def __repr__(self):
+        return f"Job({self.name}, {self.priority})"
+
+class Scheduler:
+    def __init__(self, pool=POOL):
+        self.pool = pool
+        self._heap = []             # (fire_at, seq, job)
+        self._jobs: Dict[str, Job] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    # --- registration -------------------------------------------------
+
+    def add(self, name: str, fn: Callable, next_delay: Callable[[], float], priority: str = "seed",
+            first_delay: Optional[float] = None, jitter_s: float = 0.0, max_instances: int = 1) -> Job:
+        """Register a job whose spacing comes from `next_delay()` (called after every fire)."""
+        job = Job(name, fn, lambda now: now + next_delay(), priority, jitter_s, max_instances)
+        first = time.time() + (first_delay if first_delay is not None else next_delay())
+        return self._register(job, first)
+
+    def every(self, name: str, seconds: float, fn: Callable, priority: str = "seed",
+              jitter_s: float = 0.0, first_delay: Optional[float] = None, **kw) -> Job:
+        return self.add(name, fn, lambda: seconds, priority, first_delay, jitter_s, **kw)
+
+    def cron(self, name: str, spec: str, fn: Callable, priority: str = "seed", jitter_s: float = 0.0, **kw) -> Job:
+        cs = CronSpec(spec)
+        job = Job(name, fn, cs.next_after, priority, jitter_s, **kw)
+        return self._register(job, cs.next_after(time.time()))
+
+    def poisson(self, name: str, mean_s: float, fn: Callable, priority: str = "seed", **kw) -> Job:
+        """Random arrivals averaging one per `mean_s` (replaces "wake often, fire with probability p")."""
+        return self.add(name, fn, lambda: random.expovariate(1.0 / mean_s), priority, **kw)
+
+    def remove(self, name: str):
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if job:
+                job.cancelled = True
+                self._cond.notify_all()
+
+    def jobs(self) -> List[Job]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def _register(self, job: Job, first_fire: float) -> Job:
+        with self._cond:
+            if job.name in self._jobs:
+                self._jobs[job.name].cancelled = True
+            self._jobs[job.name] = job
+            self._push(job, first_fire)
+            self._cond.notify_all()
+        self.start()
+        logger.info(f"[SCHEDULER] Registered {job.name} ({job.priority}), first run in {first_fire - time.time():.0f}s")
+        return job
+
+    def _push(self, job: Job, fire_at: float):
+        if job.jitter_s:
+            fire_at += random.uniform(-job.jitter_s, job.jitter_s)
+        heapq.heappush(self._heap, (fire_at, next(self._seq), job))
+
+    # --- dispatch -----------------------------------------------------
+
+    def start(self):
+        with self._cond:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    now = time.time()
+                    if self._heap and self._heap[0][0] <= now:
+                        _, _, job = heapq.heappop(self._heap)
+                        break
+                    self._cond.wait(timeout=(self._heap[0][0] - now) if self._heap else None)
+                metrics.incr("scheduler.wakeups")
+                try:
+                    self._push(job, job.next_fire(now))
+                except Exception as e:
+                    logger.error(f"[SCHEDULER] Could not reschedule {job.name}, dropping it: {e}", exc_info=True)
+                    self._jobs.pop(job.name, None)
+                if job.running >= job.max_instances:
+                    job.skipped += 1
+                    metrics.incr(f"scheduler.skipped.{job.priority}")
+                    logger.info(f"[SCHEDULER] Skipping {job.name}: previous run still in progress")
+                    continue
+                job.running += 1
+            job.fired += 1
+            if self.pool.submit(job.priority, self._call, job) is None:
+                with self._cond:
+                    job.running -= 1
+
+    def _call(self, job: Job):
+        try:
+            return job.fn()
+        finally:
+            with self._cond:
+                job.running -= 1
+
+SCHEDULER = Scheduler()
@@ -3,5 +3,6 @@ Web scraping modules for Slack simulation.
 """
 
 from .slack_api_scraper import SlackAPIMethodsScraper
+from .http_cache import HTTPCache, diff_catalogs
 
-__all__ = ['SlackAPIMethodsScraper']
+__all__ = ['SlackAPIMethodsScraper', 'HTTPCache', 'diff_catalogs']
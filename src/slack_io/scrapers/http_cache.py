@@ -0,0 +1,182 @@
+"""
+On-disk HTTP cache for the docs scraper.
+
+Bodies are stored content-addressed (by SHA-256) under `objects/`, so an
+unchanged page is stored once no matter how often it is fetched. `index.json`
+maps each URL to its current body hash plus the validators (ETag,
+Last-Modified) needed for conditional requests, and `parsed.json` memoizes
+parse results by content hash so unchanged pages never need re-parsing.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class HTTPCache:
+    """Content-addressed page store with per-URL validators."""
+
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the cache, loading any existing index.
+
+        Args:
+            cache_dir: Directory holding objects/, index.json and parsed.json
+        """
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.parsed_path = os.path.join(cache_dir, 'parsed.json')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.index: Dict[str, Dict] = self._load_json(self.index_path)
+        self.parsed: Dict[str, object] = self._load_json(self.parsed_path)
+        self._parsed_used = set()  # memo keys read or written since loading
+
+    @staticmethod
+    def _load_json(path: str) -> Dict:
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path: str, data):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.objects_dir, sha[:2], sha)
+
+    def entry(self, url: str) -> Optional[Dict]:
+        """Return the index entry for url (sha, etag, last_modified, fetched_at) or None."""
+        with self._lock:
+            entry = self.index.get(url)
+            return dict(entry) if entry else None
+
+    def validators(self, url: str) -> Dict[str, str]:
+        """Headers for a conditional GET of url, empty if nothing is cached."""
+        entry = self.entry(url)
+        if not entry or not os.path.exists(self._object_path(entry['sha'])):
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read(self, url: str) -> Optional[tuple]:
+        """Return (text, sha) for the cached body of url, or None."""
+        entry = self.entry(url)
+        if not entry:
+            return None
+        path = self._object_path(entry['sha'])
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read(), entry['sha']
+
+    def touch(self, url: str):
+        """Mark a cached entry as revalidated now (after a 304)."""
+        with self._lock:
+            if url in self.index:
+                self.index[url]['fetched_at'] = time.time()
+
+    def store(self, url: str, text: str, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> tuple:
+        """
+        Store a freshly downloaded body.
+
+        Returns:
+            (sha, changed) where changed is True if the body differs from the
+            previously cached one (or nothing was cached)
+        """
+        data = text.encode('utf-8')
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        with self._lock:
+            previous = self.index.get(url, {}).get('sha')
+            self.index[url] = {
+                'sha': sha,
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': time.time(),
+            }
+        return sha, previous != sha
+
+    def get_parsed(self, key: str):
+        with self._lock:
+            if key in self.parsed:
+                self._parsed_used.add(key)
+            return self.parsed.get(key)
+
+    def put_parsed(self, key: str, value):
+        with self._lock:
+            self.parsed[key] = value
+            self._parsed_used.add(key)
+
+    def prune_parsed(self, kinds) -> int:
+        """
+        Drop memoized parses of the given page kinds not used since loading.
+
+        Memo keys are "<kind>:<page>:<sha>", so after a run that visited every
+        page of a kind, the unused ones belong to pages that left the catalog or
+        to old versions of pages that changed.
+
+        Returns:
+            Number of entries dropped
+        """
+        kinds = set(kinds)
+        with self._lock:
+            stale = [k for k in self.parsed if k.split(':', 1)[0] in kinds and k not in self._parsed_used]
+            for key in stale:
+                del self.parsed[key]
+        return len(stale)
+
+    def save(self):
+        """Persist the index and parse memo (bodies are written as they arrive)."""
+        with self._lock:
+            self._write_json(self.index_path, self.index)
+            self._write_json(self.parsed_path, self.parsed)
+
+
+def diff_catalogs(previous: list, current: list) -> Dict:
+    """
+    Compare two method catalogs by method name.
+
+    Args:
+        previous: Method dictionaries from the earlier run
+        current: Method dictionaries from this run
+
+    Returns:
+        Dictionary with added/removed method names and, for methods present in
+        both, the fields whose values changed
+    """
+    old = {m['name']: m for m in previous}
+    new = {m['name']: m for m in current}
+    changed = []
+    for name in sorted(old.keys() & new.keys()):
+        fields = sorted(k for k in old[name].keys() | new[name].keys()
+                        if old[name].get(k) != new[name].get(k))
+        if fields:
+            changed.append({
+                'name': name,
+                'fields': {k: {'old': old[name].get(k), 'new': new[name].get(k)} for k in fields},
+            })
+    return {
+        'added': sorted(new.keys() - old.keys()),
+        'removed': sorted(old.keys() - new.keys()),
+        'changed': changed,
+    }
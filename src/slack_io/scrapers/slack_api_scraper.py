@@ -6,49 +6,195 @@ method names, categories, descriptions, and other data.
 """
 
 import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Callable, Dict, List, Optional
+import copy
 import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin
 
+from ..ratelimit import KeyedRateLimiter, host_of
+from .http_cache import HTTPCache
+
+
+# Only the tags each page kind is read for; everything else is skipped while parsing
+PARSE_ONLY = {
+    'list': SoupStrainer('a', href=True),
+    'category': SoupStrainer('a', href=True),
+    'details': SoupStrainer(['meta', 'h1', 'h2', 'p', 'table', 'code']),
+}
+
 
 class SlackAPIMethodsScraper:
     """Scrapes Slack API methods documentation."""
 
     BASE_URL = "https://docs.slack.dev/reference/methods/"
 
-    def __init__(self, rate_limit_delay: float = 1.0):
+    def __init__(self, rate_limit_delay: float = 1.0, max_workers: int = 8, burst: int = 2,
+                 cache_dir: Optional[str] = None, offline: bool = False, incremental: bool = False,
+                 max_age: float = 0, parser: str = 'lxml', targeted: bool = True):
         """
         Initialize the scraper.
 
         Args:
-            rate_limit_delay: Delay in seconds between requests to respect rate limits
+            rate_limit_delay: Average delay in seconds between requests to the same host
+                (0 disables rate limiting)
+            max_workers: Number of pages fetched concurrently
+            burst: Requests a host may receive back-to-back before the average rate applies
+            cache_dir: Directory for the on-disk HTTP cache (None disables caching)
+            offline: Serve pages only from the cache, never touching the network
+            incremental: Reuse parse results for pages whose content hasn't changed
+            max_age: Seconds a cached page is trusted without revalidating it
+            parser: BeautifulSoup tree builder ('lxml' or 'html.parser')
+            targeted: Parse only the tags each page kind needs (see PARSE_ONLY)
         """
+        self.parser = parser
+        self.targeted = targeted
+        if (offline or incremental) and not cache_dir:
+            raise ValueError("offline and incremental modes need a cache_dir")
+        self.cache = HTTPCache(cache_dir) if cache_dir else None
+        self.offline = offline
+        self.incremental = incremental
+        self.max_age = max_age
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'from_cache': 0, 'changed': 0,
+                      'parsed': 0, 'parse_reused': 0}
+        self._stats_lock = threading.Lock()
         self.rate_limit_delay = rate_limit_delay
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = KeyedRateLimiter(
+            rate=(1.0 / rate_limit_delay) if rate_limit_delay > 0 else 0,
+            capacity=burst,
+        )
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
+        # One keep-alive connection per worker, shared by all threads
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
 
-    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch_text(self, url: str) -> Optional[tuple]:
         """
-        Fetch and parse a webpage.
+        Fetch a page body, going through the HTTP cache when one is configured.
+
+        Cached pages are revalidated with If-None-Match/If-Modified-Since; a
+        304 reuses the stored body. In offline mode only the cache is used.
 
         Args:
             url: URL to fetch
 
         Returns:
-            BeautifulSoup object or None if request fails
+            (text, sha) tuple, sha being None without a cache, or None if unavailable
         """
+        if self.cache:
+            entry = self.cache.entry(url)
+            fresh = entry and (time.time() - entry['fetched_at']) < self.max_age
+            if self.offline or fresh:
+                cached = self.cache.read(url)
+                if cached:
+                    self._count('from_cache')
+                    return cached
+                if self.offline:
+                    print(f"Not in cache (offline): {url}")
+                    return None
         try:
-            response = self.session.get(url, timeout=10)
+            headers = self.cache.validators(url) if self.cache else {}
+            self.rate_limiter.acquire(host_of(url))
+            response = self.session.get(url, timeout=10, headers=headers)
+            if response.status_code == 304 and self.cache:
+                cached = self.cache.read(url)
+                if cached:
+                    self.cache.touch(url)
+                    self._count('not_modified')
+                    return cached
+                # the body went missing from the cache: fetch it in full, within the host's limit too
+                self.rate_limiter.acquire(host_of(url))
+                response = self.session.get(url, timeout=10)
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            self._count('downloaded')
+            if not self.cache:
+                return response.text, None
+            sha, changed = self.cache.store(
+                url, response.text,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified'),
+            )
+            if changed:
+                self._count('changed')
+            return response.text, sha
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}")
             return None
 
+    def fetch_page(self, url: str) -> Optional[BeautifulSoup]:
+        """
+        Fetch and parse a webpage.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            BeautifulSoup object or None if request fails
+        """
+        page = self.fetch_text(url)
+        if page is None:
+            return None
+        return BeautifulSoup(page[0], self.parser)
+
+    def make_soup(self, text: str, kind: Optional[str] = None) -> BeautifulSoup:
+        """
+        Parse HTML with the configured backend.
+
+        Args:
+            text: Page HTML
+            kind: Page kind ('list', 'category' or 'details'); when targeted
+                parsing is on, only the tags that kind needs are built
+
+        Returns:
+            BeautifulSoup object
+        """
+        parse_only = PARSE_ONLY.get(kind) if self.targeted else None
+        return BeautifulSoup(text, self.parser, parse_only=parse_only)
+
+    def _scrape(self, kind: str, key: str, url: str, parse: Callable[[BeautifulSoup], object]):
+        """
+        Fetch url and run parse on it, reusing an earlier parse of identical content
+        when running incrementally.
+
+        Returns:
+            The parse result, or None if the page couldn't be fetched
+        """
+        page = self.fetch_text(url)
+        if page is None:
+            return None
+        text, sha = page
+        # Parse results are always memoized when caching, so a later incremental run can reuse them
+        memo_key = f"{kind}:{key}:{sha}" if sha else None
+        if memo_key and self.incremental:
+            hit = self.cache.get_parsed(memo_key)
+            if hit is not None:
+                self._count('parse_reused')
+                return copy.deepcopy(hit)
+        result = parse(self.make_soup(text, kind))
+        self._count('parsed')
+        if memo_key:
+            self.cache.put_parsed(memo_key, copy.deepcopy(result))
+        return result
+
+    def save_cache(self):
+        """Persist the HTTP cache index and parse memo, if caching is enabled."""
+        if self.cache:
+            self.cache.save()
+
     def scrape_category_methods(self, category: str, sample_method: str) -> List[Dict[str, str]]:
         """
         Scrape all methods from a specific category by visiting a sample method page.
@@ -64,11 +210,11 @@ class SlackAPIMethodsScraper:
         """
         # Visit the sample method page to see the sidebar with all category methods
         method_url = urljoin(self.BASE_URL, sample_method)
-        soup = self.fetch_page(method_url)
-
-        if not soup:
-            return []
+        return self._scrape('category', category, method_url,
+                            lambda soup: self._parse_category_methods(soup, category)) or []
 
+    def _parse_category_methods(self, soup: BeautifulSoup, category: str) -> List[Dict[str, str]]:
+        """Extract the methods of one category from a method page's sidebar."""
         methods = []
 
         # Find all links - the sidebar should contain all methods in this category
@@ -109,10 +255,10 @@ class SlackAPIMethodsScraper:
         Returns:
             List of dictionaries containing method information
         """
-        soup = self.fetch_page(self.BASE_URL)
-        if not soup:
-            return []
+        return self._scrape('list', 'all', self.BASE_URL, self._parse_methods_list) or []
 
+    def _parse_methods_list(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
+        """Extract method links from the main methods page."""
         methods = []
 
         # Find all links on the page
@@ -179,11 +325,11 @@ class SlackAPIMethodsScraper:
             Dictionary containing method details or None if not found
         """
         url = urljoin(self.BASE_URL, method_name)
-        soup = self.fetch_page(url)
-
-        if not soup:
-            return None
+        return self._scrape('details', method_name, url,
+                            lambda soup: self._parse_method_details(soup, method_name, url))
 
+    def _parse_method_details(self, soup: BeautifulSoup, method_name: str, url: str) -> Dict:
+        """Extract description, parameters and examples from a method page."""
         details = {
             'name': method_name,
             'url': url,
@@ -227,17 +373,84 @@ class SlackAPIMethodsScraper:
 
         return details
 
-    def scrape_all_methods(self, include_details: bool = False, deep_scrape: bool = True) -> List[Dict]:
+    def _run_concurrent(self, fn: Callable, items: List, label: Callable[[object], str]) -> List:
+        """
+        Apply fn to every item on the worker pool.
+
+        Results come back in the same order as items, whatever order the
+        requests finish in, so output stays deterministic.
+
+        Args:
+            fn: Function called with one item
+            items: Items to process
+            label: Formats an item for progress lines
+
+        Returns:
+            List of results, aligned with items
+        """
+        results = [None] * len(items)
+        if not items:
+            return results
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(fn, item): i for i, item in enumerate(items)}
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"Error processing {label(items[i])}: {e}")
+                print(f"[{done}/{len(items)}] {label(items[i])}")
+        return results
+
+    def _load_checkpoint(self, path: Optional[str]) -> Dict:
+        if not path or not os.path.exists(path):
+            return {'categories': {}, 'details': {}}
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        print(f"Resuming from {path}: {len(state.get('categories', {}))} categories, "
+              f"{len(state.get('details', {}))} method details already done")
+        state.setdefault('categories', {})
+        state.setdefault('details', {})
+        return state
+
+    def _save_checkpoint(self, path: Optional[str], state: Dict):
+        if not path:
+            return
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def scrape_all_methods(self, include_details: bool = False, deep_scrape: bool = True,
+                           resume_path: Optional[str] = None, checkpoint_every: int = 20) -> List[Dict]:
         """
         Scrape all Slack API methods.
 
+        Category and detail pages are fetched concurrently (see max_workers),
+        each host limited by its token bucket.
+
         Args:
             include_details: If True, fetch detailed information for each method
             deep_scrape: If True, scrape each category page for all methods
+            resume_path: Optional checkpoint file; finished pages are recorded there
+                and skipped when the same file is passed again
+            checkpoint_every: Write the checkpoint after this many finished pages
 
         Returns:
             List of method dictionaries
         """
+        state = self._load_checkpoint(resume_path)
+        lock = threading.Lock()
+        pending = [0]
+
+        def record(section: str, key: str, value):
+            with lock:
+                state[section][key] = value
+                pending[0] += 1
+                if pending[0] >= checkpoint_every:
+                    self._save_checkpoint(resume_path, state)
+                    pending[0] = 0
+
         print("Scraping Slack API methods list...")
         initial_methods = self.scrape_methods_list()
         print(f"Found {len(initial_methods)} methods from main page")
@@ -246,14 +459,21 @@ class SlackAPIMethodsScraper:
             # Create a mapping of category to sample method
             category_samples = {m['category']: m['name'] for m in initial_methods}
             print(f"Found {len(category_samples)} categories, scraping each...")
+            todo = [c for c in sorted(category_samples.items()) if c[0] not in state['categories']]
 
-            all_methods = []
-            for i, (category, sample_method) in enumerate(sorted(category_samples.items())):
-                print(f"[{i+1}/{len(category_samples)}] Scraping {category} category using {sample_method}...")
+            def scrape_category(item):
+                category, sample_method = item
                 category_methods = self.scrape_category_methods(category, sample_method)
-                print(f"  Found {len(category_methods)} methods in {category}")
-                all_methods.extend(category_methods)
-                time.sleep(self.rate_limit_delay)
+                if category_methods:  # an empty result is a failed fetch; retry it on resume
+                    record('categories', category, category_methods)
+                return category_methods
+
+            self._run_concurrent(scrape_category, todo, label=lambda c: f"{c[0]} category via {c[1]}")
+            self._save_checkpoint(resume_path, state)
+
+            all_methods = []
+            for category in sorted(category_samples):
+                all_methods.extend(state['categories'].get(category) or [])
 
             # Remove duplicates across all methods
             seen = set()
@@ -270,15 +490,31 @@ class SlackAPIMethodsScraper:
 
         if include_details:
             print("Fetching detailed information for each method...")
-            for i, method in enumerate(methods):
-                print(f"[{i+1}/{len(methods)}] Fetching details for {method['name']}...")
-                details = self.scrape_method_details(method['name'])
+            todo = [m['name'] for m in methods if m['name'] not in state['details']]
+
+            def scrape_details(name):
+                details = self.scrape_method_details(name)
                 if details:
-                    method.update(details)
+                    record('details', name, details)
+                return details
 
-                # Rate limiting
-                time.sleep(self.rate_limit_delay)
+            self._run_concurrent(scrape_details, todo, label=lambda name: f"details for {name}")
+            self._save_checkpoint(resume_path, state)
+
+            for method in methods:
+                details = state['details'].get(method['name'])
+                if details:
+                    method.update(details)
 
+        if self.cache:
+            # every page of these kinds was visited, so memos the run didn't use are stale
+            kinds = ['list'] + ['category'] * deep_scrape + ['details'] * include_details
+            pruned = self.cache.prune_parsed(kinds)
+            if pruned:
+                print(f"Dropped {pruned} stale parse results")
+        self.save_cache()
+        if self.cache:
+            print(f"Cache: {self.stats}")
         return methods
 
     def get_methods_by_category(self, methods: List[Dict]) -> Dict[str, List[Dict]]:
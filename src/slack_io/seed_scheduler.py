@@ -1,24 +1,43 @@
-import threading, time, random
-from typing import Optional
-from .slack_client import app as bolt_app
+import random, time, logging
+from concurrent.futures import Future
+from typing import Callable, Optional
+from .slack_client import app as bolt_app, READ_CLIENT
+from .usage import LEDGER, cached_tokens
 from .persona_registry import PERSONAS, CHANNEL_NAME_TO_ID
-from .conductor import mark_persona_cooldown, schedule_followups_for_thread
+from .conductor import mark_persona_cooldown, schedule_followups_for_thread, queue_for
 from .agent_engine import client as llm_client, MODEL
+from .scheduler import SCHEDULER
+from .content_backlog import BACKLOG
 
-def _post_root(persona: str, channel_name: str, text:str) -> Optional[str]:
+logger = logging.getLogger(__name__)
+
+def _post_root(persona: str, channel_name: str, text:str,
+               on_posted: Optional[Callable[[str], None]] = None) -> Optional[Future]:
+    """Queue a root post on the channel's rate-limited queue; `on_posted(ts)` runs once it is sent."""
     ch_id = CHANNEL_NAME_TO_ID.get(channel_name)
     if not ch_id:
         return None
     username = PERSONAS[persona]["username"]
     icon = PERSONAS[persona]["icon"]
-    resp = bolt_app.client.chat_postMessage(channel=ch_id, text=text, username=username, icon_emoji=icon)
-    ts = resp["ts"]
+    fut = queue_for(ch_id).enqueue(
+        bolt_app.client.chat_postMessage,
+        channel=ch_id, text=text, username=username, icon_emoji=icon
+    )
+    if not fut:
+        return None
     mark_persona_cooldown(persona)
-    return ts
+
+    def _done(f):
+        if f.exception():
+            logger.error(f"[SEED] Post in #{channel_name} failed: {f.exception()}")
+        elif on_posted:
+            on_posted(f.result()["ts"])
+    fut.add_done_callback(_done)
+    return fut
 
 def _digest_recent(ch_id: str, limit: int = 12) -> str:
     try:
-        r = bolt_app.client.conversations_history(channel=ch_id, limit=limit)
+        r = READ_CLIENT.conversations_history(channel=ch_id, limit=limit)
         lines = []
         for m in reversed(r.get("messages", [])):
             u = m.get("user") or m.get("username", "user")
@@ -34,88 +53,113 @@ def _llm_root(persona: str, channel_name: str, prompt_goal: str, digest: str) ->
     user = (f"Goal: {prompt_goal}\n\n"
             f"Recent context (optional):\n{digest}\n\n"
             f"Rules:\n- Start a new thread (no replies).\n- No citations or IDs.\n")
+    messages = [{"role":"system","content":sys},{"role":"user","content":user}]
+    t0 = time.time()
     resp = llm_client.chat.completions.create(
         model=MODEL,
-        messages=[{"role":"system","content":sys},{"role":"user","content":user}],
+        messages=messages,
         temperature=0.5,
         max_tokens=120,
     )
+    usage = getattr(resp, "usage", None)
+    LEDGER.record(persona, channel_name, "seed", {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "cached_tokens": cached_tokens(usage),
+    }, time.time() - t0, messages)
     return resp.choices[0].message.content.strip()
 
-def standup_loop(minutes: int = 60):
-    def run():
-        while True:
-            try:
-                ch_name = random.choice(["eng-backend","eng-frontend","qa-testing","product","deployments","design-ux"])
-                ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
-                if not ch_id:
-                    time.sleep(minutes*60); continue
-                persona = random.choice(["Gabriella_PM","Tara_TPM","Mike_BE","Sarah_FE"])
-                digest = _digest_recent(ch_id, limit=10)
-                text = _llm_root(
-                    persona, ch_name,
-                    "Kick off a quick standup thread. Ask for blockers and today’s focus.",
-                    digest
-                )
-                ts = _post_root(persona, ch_name, text)
-                if ts:
-                    # Let 1–2 others reply in the thread
-                    schedule_followups_for_thread(ch_name, ch_id, persona, text, thread_ts=ts, max_repliers=2)
-            except Exception:
-                pass
-            time.sleep(minutes*60)
-    threading.Thread(target=run, daemon=True).start()
+def _post_item(item: dict, on_posted: Optional[Callable[[str], None]] = None):
+    """Post a popped backlog item; it only counts as consumed once it is queued, else it goes back."""
+    if _post_root(item["persona"], item["channel"], item["text"], on_posted=on_posted):
+        BACKLOG.consume(item)
+    else:
+        BACKLOG.restore(item)
 
-def announcements_loop(minutes: int = 90):
+def _standup_once():
+    # Pre-generated standups (see content_backlog.py) are posted as-is; generate live when there are none
+    item = BACKLOG.pop("standup", channels=list(CHANNEL_NAME_TO_ID), consume=False)
+    if item:
+        ch_name, persona, text = item["channel"], item["persona"], item["text"]
+        ch_id = CHANNEL_NAME_TO_ID[ch_name]
+    else:
+        ch_name = random.choice(["eng-backend","eng-frontend","qa-testing","product","deployments","design-ux"])
+        ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
+        if not ch_id or not LEDGER.budget_scale(ch_name):  # nothing live once the token budget is spent
+            return
+        persona = random.choice(["Gabriella_PM","Tara_TPM","Mike_BE","Sarah_FE"])
+        digest = _digest_recent(ch_id, limit=10)
+        text = _llm_root(
+            persona, ch_name,
+            "Kick off a quick standup thread. Ask for blockers and today’s focus.",
+            digest
+        )
+    # Let 1–2 others reply in the thread once it is posted
+    on_posted = lambda ts: schedule_followups_for_thread(ch_name, ch_id, persona, text, thread_ts=ts, max_repliers=2)
+    if item:
+        _post_item(item, on_posted)
+    else:
+        _post_root(persona, ch_name, text, on_posted=on_posted)
+
+def standup_loop(minutes: int = 60, cron: Optional[str] = None):
+    """Kick off a standup thread now and then every `minutes` (or on a cron spec, e.g. "0 9 * * 1-5")."""
+    if cron:
+        return SCHEDULER.cron("seed:standup", cron, _standup_once, jitter_s=60)
+    return SCHEDULER.every("seed:standup", minutes*60, _standup_once, first_delay=0)
+
+def _announcement_once():
+    ch_name = "announcements"
+    ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
+    if not ch_id:
+        return
+    item = BACKLOG.pop("announcement", ch_name, consume=False)
+    if item:
+        _post_item(item)
+        return
+    if not LEDGER.budget_scale(ch_name):
+        return
+    persona = random.choice(["Tara_TPM","Gabriella_PM"])
+    digest = _digest_recent(ch_id, limit=8)  # you could also pull from product/eng channels
+    text = _llm_root(
+        persona, ch_name,
+        "Post a concise status update summarizing key decisions and next steps.",
+        digest
+    )
+    _post_root(persona, ch_name, text)
+    # Typically no immediate follow-ups needed in announcements, but you could add one:
+    # _post_root(..., on_posted=lambda ts: schedule_followups_for_thread(ch_name, ch_id, persona, text, thread_ts=ts, max_repliers=1))
+
+def announcements_loop(minutes: int = 90, cron: Optional[str] = None):
     """Periodically post an announcements summary from PM/TPM."""
-    def run():
-        while True:
-            try:
-                ch_name = "announcements"
-                ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
-                if not ch_id:
-                    time.sleep(minutes*60); continue
-                persona = random.choice(["Tara_TPM","Gabriella_PM"])
-                digest = _digest_recent(ch_id, limit=8)  # you could also pull from product/eng channels
-                text = _llm_root(
-                    persona, ch_name,
-                    "Post a concise status update summarizing key decisions and next steps.",
-                    digest
-                )
-                ts = _post_root(persona, ch_name, text)
-                # Typically no immediate follow-ups needed in announcements, but you could add one:
-                # if ts: schedule_followups_for_thread(ch_name, ch_id, persona, text, thread_ts=ts, max_repliers=1)
-            except Exception:
-                pass
-            time.sleep(minutes*60)
-    threading.Thread(target=run, daemon=True).start()
+    if cron:
+        return SCHEDULER.cron("seed:announcements", cron, _announcement_once, jitter_s=60)
+    return SCHEDULER.every("seed:announcements", minutes*60, _announcement_once, first_delay=0)
+
+NOISE_LINKS = [
+    "https://example.com/blog/how-we-cut-p95",
+    "https://example.com/meme/latency-cat",
+    "https://example.com/paper/caching-tradeoffs",
+    "https://example.com/music/lofi"
+]
+
+def _noise_once():
+    ch_name = "random"
+    ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
+    if not ch_id:
+        return
+    persona = random.choice(["Sarah_FE"])  # or "NoiseBot" if you use a bot identity
+    link = random.choice(NOISE_LINKS)
+    text = f"TIL: {link}"
+    _post_root(persona, ch_name, text)
+    # usually no follow-ups for noise
 
 def noise_loop(every_seconds: int = 20, prob: float = 0.03):
-    """Occasional #random post."""
-    LINKS = [
-        "https://example.com/blog/how-we-cut-p95",
-        "https://example.com/meme/latency-cat",
-        "https://example.com/paper/caching-tradeoffs",
-        "https://example.com/music/lofi"
-    ]
-    def run():
-        while True:
-            time.sleep(every_seconds)
-            try:
-                if random.random() >= prob:
-                    continue
-                ch_name = "random"
-                ch_id = CHANNEL_NAME_TO_ID.get(ch_name)
-                if not ch_id:
-                    continue
-                persona = random.choice(["Sarah_FE"])  # or "NoiseBot" if you use a bot identity
-                link = random.choice(LINKS)
-                text = f"TIL: {link}"
-                ts = _post_root(persona, ch_name, text)
-                # usually no follow-ups for noise
-            except Exception:
-                pass
-    threading.Thread(target=run, daemon=True).start()
+    """Occasional #random post.
+
+    Same average rate as checking every `every_seconds` and posting with
+    probability `prob`, but as random arrivals: no wakeups in between.
+    """
+    return SCHEDULER.poisson("seed:noise", every_seconds / prob, _noise_once)
 
 def start_seeders(standup_every_min=60, announcements_every_min=90, noise_every_s=20, noise_prob=0.03):
     standup_loop(standup_every_min)
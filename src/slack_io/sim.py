@@ -0,0 +1,308 @@
+"""
+Deterministic, offline harness for the app.
+
+`Simulation.install()` swaps the live pieces for stand-ins so a run depends only
+on its input events and random seed:
+
+- a virtual clock replaces `time` in the app modules (sleeps advance it),
+- an inline pool and inline per-channel queues replace the worker threads; all
+  work runs on one thread in (virtual time, submission order),
+- `StandInSlack` replaces the Web API client: it stores posts, serves history
+  and replies from them, and echoes persona posts back as `bot_message` events
+  through the Bolt handlers, like Slack does.
+
+Set SLACK_OFFLINE=1 and LLM_PROVIDER=stub before the app modules are imported
+(`slack_io.replay` and `slack_io.loadgen` do this).
+"""
+import heapq, itertools, logging, random, threading, time as _time
+from concurrent.futures import Future
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules whose `time` is replaced by the virtual clock
+CLOCKED_MODULES = ("admission", "agent_engine", "autonomous_loop", "coalesce", "conductor", "context_cache", "ingest",
+                   "llm_provider", "pacing", "priority", "queue", "speculation", "usage")
+ECHO_DELAY_S = 0.4          # Slack delivers our own posts back after roughly this long
+QUEUE_COOLDOWN_S = 0.8      # same spacing as conductor.queue_for
+
+
+class VirtualClock:
+    def __init__(self, start: float):
+        self.now = start
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += max(seconds, 0.0)
+
+    def module(self):
+        """Stand-in for the `time` module as the app uses it."""
+        return SimpleNamespace(time=self.time, sleep=self.sleep, monotonic=self.time, perf_counter=self.time,
+                               strftime=_time.strftime, localtime=_time.localtime, gmtime=_time.gmtime)
+
+
+class InlinePool:
+    """PriorityPool stand-in: tasks run on the simulation thread at their ready time."""
+
+    def __init__(self, sim: "Simulation"):
+        from .priority import PRIORITY_CLASSES, MAX_PENDING
+        self.sim = sim
+        self.classes = dict(PRIORITY_CLASSES)
+        self.max_pending = dict(MAX_PENDING)
+        self._pending: Dict[str, int] = {c: 0 for c in self.classes}
+
+    def submit(self, cls: str, fn, *args, delay_s: float = 0.0, **kwargs) -> Optional[Future]:
+        from . import metrics
+        if cls not in self.classes:
+            raise ValueError(f"Unknown priority class: {cls}")
+        limit = self.max_pending.get(cls)
+        if limit is not None and self._pending[cls] >= limit:
+            metrics.incr(f"priority.refused.{cls}")
+            return None
+        future = Future()
+        self._pending[cls] += 1
+        metrics.incr(f"priority.submitted.{cls}")
+
+        def _run():
+            self._pending[cls] -= 1
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                logger.error(f"[SIM] {cls} job failed: {e}", exc_info=True)
+                future.set_exception(e)
+
+        self.sim.after(delay_s, _run)
+        return future
+
+    def busy(self, ignore=()) -> int:
+        return sum(n for c, n in self._pending.items() if c not in ignore)
+
+    def stats(self) -> dict:
+        return {cls: {"pending": n, "running": 0} for cls, n in self._pending.items()}
+
+
+class InlineQueue:
+    """ChannelQueue stand-in: posts are sent at least `cooldown` apart, in order."""
+
+    def __init__(self, sim: "Simulation", cooldown: float = QUEUE_COOLDOWN_S):
+        self.sim = sim
+        self.cooldown = cooldown
+        self._next_free = 0.0
+
+    def enqueue(self, fn, **kwargs) -> Future:
+        future = Future()
+        at = max(self.sim.clock.now, self._next_free)
+        self._next_free = at + self.cooldown
+
+        def _send():
+            try:
+                future.set_result(fn(**kwargs))
+            except Exception as e:
+                logger.error(f"[SIM] Post failed: {e}")
+                future.set_exception(e)
+
+        self.sim.at(at, _send)
+        return future
+
+
+class StandInSlack:
+    """Minimal in-memory Slack Web API: enough for posting, history and replies.
+
+    `on_post(message)` is called for every chat_postMessage, e.g. to echo it
+    back as an event; `max_messages` caps what is kept per channel.
+    """
+
+    # read by Bolt when it builds the per-request client during dispatch
+    base_url, timeout, ssl, proxy, headers, retry_handlers = "https://slack.invalid/api/", 30, None, None, {}, None
+    logger = logger
+
+    def __init__(self, channels: Dict[str, str], clock: Callable[[], float] = _time.time,
+                 on_post: Optional[Callable[[dict], None]] = None, max_messages: Optional[int] = None):
+        self.channels = dict(channels)          # id -> name
+        self.clock = clock
+        self.on_post = on_post
+        self.max_messages = max_messages
+        self.messages: Dict[str, List[dict]] = {}
+        self.posts: List[dict] = []             # everything chat_postMessage sent, in order
+        self._last_ts = 0.0
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, method: str):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def _store(self, channel: str, msg: dict):
+        msgs = self.messages.setdefault(channel, [])
+        msgs.append(msg)
+        if self.max_messages and len(msgs) > self.max_messages:
+            del msgs[:len(msgs) - self.max_messages]
+
+    def chat_postMessage(self, channel: str, text: str = "", username: str = None, icon_emoji: str = None,
+                         thread_ts: str = None, **kwargs):
+        self._count("chat.postMessage")
+        with self._lock:
+            # unique, increasing ts like Slack's
+            self._last_ts = max(round(self.clock(), 6), round(self._last_ts + 0.000001, 6))
+            ts = f"{self._last_ts:.6f}"
+            msg = {"type": "message", "subtype": "bot_message", "bot_id": "BSTANDIN", "channel": channel,
+                   "ts": ts, "text": text, "username": username}
+            if thread_ts:
+                msg["thread_ts"] = thread_ts
+            self._store(channel, msg)
+            self.posts.append({"ts": ts, "channel": channel, "thread_ts": thread_ts, "username": username, "text": text})
+        if self.on_post:
+            self.on_post(dict(msg))
+        return {"ok": True, "channel": channel, "ts": ts, "message": msg}
+
+    def add_message(self, event: dict):
+        """Record an incoming (human) event so later history/replies calls see it."""
+        if event.get("channel") and event.get("ts"):
+            with self._lock:
+                self._store(event["channel"], dict(event))
+
+    def _channel_messages(self, channel: str) -> List[dict]:
+        with self._lock:
+            return list(self.messages.get(channel, []))
+
+    @staticmethod
+    def _page(msgs: List[dict], limit: int, cursor: Optional[str]) -> dict:
+        # cursors are plain offsets here; Slack's are opaque strings
+        start = int(cursor or 0)
+        more = len(msgs) > start + limit
+        return {"ok": True, "messages": msgs[start:start + limit], "has_more": more,
+                "response_metadata": {"next_cursor": str(start + limit) if more else ""}}
+
+    def conversations_history(self, channel: str, limit: int = 100, oldest: str = None, latest: str = None,
+                              cursor: str = None, **kwargs):
+        self._count("conversations.history")
+        msgs = self._channel_messages(channel)
+        replies: Dict[str, int] = {}
+        for m in msgs:
+            if m.get("thread_ts") and m["thread_ts"] != m["ts"]:
+                replies[m["thread_ts"]] = replies.get(m["thread_ts"], 0) + 1
+        msgs = [dict(m, reply_count=replies[m["ts"]]) if m["ts"] in replies else m
+                for m in msgs if not m.get("thread_ts") or m["thread_ts"] == m["ts"]]
+        if oldest:
+            msgs = [m for m in msgs if float(m["ts"]) > float(oldest)]
+        if latest:
+            msgs = [m for m in msgs if float(m["ts"]) < float(latest)]
+        msgs = sorted(msgs, key=lambda m: float(m["ts"]), reverse=True)
+        return self._page(msgs, limit, cursor)
+
+    def conversations_replies(self, channel: str, ts: str, limit: int = 100, oldest: str = None,
+                              cursor: str = None, **kwargs):
+        self._count("conversations.replies")
+        msgs = [m for m in self._channel_messages(channel) if m["ts"] == ts or m.get("thread_ts") == ts]
+        if oldest:
+            msgs = [m for m in msgs if float(m["ts"]) > float(oldest) or m["ts"] == ts]
+        msgs = sorted(msgs, key=lambda m: float(m["ts"]))
+        return self._page(msgs, limit, cursor)
+
+    def conversations_info(self, channel: str, **kwargs):
+        self._count("conversations.info")
+        return {"ok": True, "channel": {"id": channel, "name": self.channels.get(channel, channel)}}
+
+    def conversations_list(self, **kwargs):
+        self._count("conversations.list")
+        return {"ok": True, "channels": [{"id": cid, "name": name} for cid, name in self.channels.items()],
+                "response_metadata": {"next_cursor": ""}}
+
+    def auth_test(self, **kwargs):
+        return {"ok": True, "user_id": "USTANDIN", "bot_id": "BSTANDIN"}
+
+
+class Simulation:
+    """Discrete-event loop on a virtual clock; `speed` > 0 paces it against the wall clock."""
+
+    def __init__(self, start: float, channels: Dict[str, str], seed: int = 0, echo: bool = True):
+        self.clock = VirtualClock(start)
+        self.seed = seed
+        self.channels = dict(channels)
+        self._heap = []
+        self._seq = itertools.count()
+        self.events_delivered = 0
+        on_post = (lambda msg: self.after(ECHO_DELAY_S, self.deliver_bot_message, msg)) if echo else None
+        self.slack = StandInSlack(channels, clock=self.clock.time, on_post=on_post)
+        self.pool = InlinePool(self)
+        self._queues: Dict[str, InlineQueue] = {}
+        self._handlers = None
+
+    def at(self, t: float, fn: Callable, *args):
+        heapq.heappush(self._heap, (t, next(self._seq), fn, args))
+
+    def after(self, delay_s: float, fn: Callable, *args):
+        self.at(self.clock.now + max(delay_s, 0.0), fn, *args)
+
+    def queue_for(self, channel_id: str) -> InlineQueue:
+        if channel_id not in self._queues:
+            self._queues[channel_id] = InlineQueue(self)
+        return self._queues[channel_id]
+
+    def install(self):
+        """Point the app at the virtual clock, inline pool/queues and stand-in Slack."""
+        import importlib
+        from . import slack_client, conductor, autonomous_loop, speculation, bolt_app, seed_scheduler
+        from .context_cache import CONTEXT_CACHE
+        from .coalesce import READS
+        from .usage import LEDGER
+        from .persona_registry import CHANNEL_ID_TO_NAME, CHANNEL_NAME_TO_ID
+
+        clock = self.clock.module()
+        for name in CLOCKED_MODULES:
+            importlib.import_module(f"{__package__}.{name}").time = clock
+        slack_client.app._client = self.slack
+        conductor.POOL = self.pool
+        speculation.POOL = self.pool
+        conductor.queue_for = self.queue_for
+        autonomous_loop.queue_for = self.queue_for
+        seed_scheduler.queue_for = self.queue_for
+        CHANNEL_ID_TO_NAME.clear()
+        CHANNEL_NAME_TO_ID.clear()
+        CHANNEL_ID_TO_NAME.update(self.channels)
+        CHANNEL_NAME_TO_ID.update({name: cid for cid, name in self.channels.items()})
+        self._handlers = (bolt_app.handle_message_events, bolt_app.handle_bot_messages)
+        # Same starting state for every run
+        conductor.LAST_PROACTIVE_CHECK = self.clock.now
+        CONTEXT_CACHE.clear()
+        READS.clear()
+        LEDGER.log_path = ""  # simulated hours stay out of the real usage log
+        random.seed(self.seed)
+        return self
+
+    def deliver(self, event: dict, body: Optional[dict] = None, source: str = "message"):
+        """Hand an event to the Bolt handler it was recorded from."""
+        body = body or {"event": event}
+        handle_message, handle_bot = self._handlers
+        self.events_delivered += 1
+        if source == "message":
+            if event.get("subtype") != "bot_message":
+                self.slack.add_message(event)
+            handle_message(body=body, event=event, logger=logger, say=None)
+        else:
+            handle_bot(body=body, event=event, logger=logger, say=None)
+
+    def deliver_bot_message(self, event: dict):
+        # Slack runs both listeners for a bot message; the deduper keeps one
+        body = {"event": event, "event_id": f"Ev{event['ts']}"}
+        self.deliver(event, body, "message")
+        self.deliver(event, body, "bot_message")
+
+    def run(self, until: Optional[float] = None, speed: float = 0.0):
+        """Process events in time order (up to `until`); speed 1 = real time, 0 = as fast as possible."""
+        wall0, virt0 = _time.time(), self.clock.now
+        while self._heap and (until is None or self._heap[0][0] <= until):
+            t, _, fn, args = heapq.heappop(self._heap)
+            if speed > 0:
+                wait = (t - virt0) / speed - (_time.time() - wall0)
+                if wait > 0:
+                    _time.sleep(wait)
+            self.clock.now = max(self.clock.now, t)
+            fn(*args)
+        if until is not None:
+            self.clock.now = max(self.clock.now, until)
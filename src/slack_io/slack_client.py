@@ -3,6 +3,9 @@ from slack_bolt.adapter.socket_mode import SocketModeHandler
 from slack_bolt import App
 from slack_sdk.errors import SlackApiError
 import os, logging
+from .ratelimit import KeyedRateLimiter
+from . import metrics
+from .coalesce import CoalescedClient
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -10,7 +13,17 @@ load_dotenv(os.path.join(os.path.dirname(__file__), '..', '..', '.env'))
 
 log = logging.getLogger(__name__)
 
-app = App(token=os.getenv("SLACK_BOT_TOKEN"))
+# SLACK_OFFLINE=1 skips the auth.test call at startup so the app can be built
+# without network access (replays and load tests swap in a stand-in client)
+OFFLINE = os.getenv("SLACK_OFFLINE", "0") == "1"
+
+if OFFLINE:
+    app = App(token=os.getenv("SLACK_BOT_TOKEN") or "xoxb-offline", token_verification_enabled=False)
+else:
+    app = App(token=os.getenv("SLACK_BOT_TOKEN"))
+
+# app.client with identical concurrent reads shared (see coalesce.py)
+READ_CLIENT = CoalescedClient(lambda: app.client)
 
 def post_message(channel: str, text: str, username: str, icon_emoji: str=None, thread_ts: str=None):
     args = {
@@ -22,7 +35,7 @@ def post_message(channel: str, text: str, username: str, icon_emoji: str=None, t
     if icon_emoji:
         args["icon_emoji"] = icon_emoji
     if thread_ts:
-        args["threads_ts"] = thread_ts
+        args["thread_ts"] = thread_ts
     while True:
         try:
             return app.client.chat_postMessage(**args)
@@ -33,9 +46,91 @@ def post_message(channel: str, text: str, username: str, icon_emoji: str=None, t
                 continue
             raise
 
-def fetch_history(channel: str, oldest: str=None, latest: str=None, limit: int=200):
-    return app.client.conversations.history(channel=channel, oldest=oldest, latest=latest, limit=limit)
+# Web API rate-limit tiers (requests per minute, per method and workspace)
+TIER_PER_MIN = {1: 1, 2: 20, 3: 50, 4: 100}
+METHOD_TIERS = {
+    "conversations.history": 3,
+    "conversations.replies": 3,
+    "conversations.list": 2,
+    "conversations.info": 3,
+    "users.info": 4,
+}
+TIER_BURST = 3          # calls a method may make back-to-back before its tier rate applies
+TIER_LIMITER = KeyedRateLimiter(
+    rate=TIER_PER_MIN[3] / 60, capacity=TIER_BURST,
+    overrides={m: TIER_PER_MIN[t] / 60 for m, t in METHOD_TIERS.items()},
+)
+
+def call_api(method: str, key: str = None, limiter: KeyedRateLimiter = TIER_LIMITER, **kwargs):
+    """Call a Web API method within its rate-limit bucket (`key`, default the method), retrying 429s."""
+    bucket = limiter.bucket(key or method)
+    fn = getattr(app.client, method.replace(".", "_"))
+    while True:
+        bucket.acquire()
+        try:
+            return fn(**kwargs)
+        except SlackApiError as e:
+            if e.response.status_code != 429:
+                raise
+            wait = int(e.response.headers.get("Retry-After", "1"))
+            metrics.incr("slack.rate_limited")
+            log.warning(f"[SLACK] {method} rate limited; retrying in {wait}s")
+            # everyone sharing the bucket backs off, not just this caller
+            bucket.penalize(wait)
+
+def fetch_history(channel: str, oldest: str=None, latest: str=None, limit: int=200, cursor: str=None):
+    """One page of a channel's top-level messages (newest first)."""
+    args = {"channel": channel, "limit": limit}
+    for k, v in (("oldest", oldest), ("latest", latest), ("cursor", cursor)):
+        if v:
+            args[k] = v
+    return call_api("conversations.history", **args)
+
+def fetch_thread(channel: str, parent_ts: str, limit: int=200, cursor: str=None, oldest: str=None):
+    """One page of a thread (oldest first; the parent message comes first on the first page)."""
+    args = {"channel": channel, "ts": parent_ts, "limit": limit}
+    for k, v in (("cursor", cursor), ("oldest", oldest)):
+        if v:
+            args[k] = v
+    return call_api("conversations.replies", **args)
+
+def next_cursor(resp) -> str:
+    return (resp.get("response_metadata") or {}).get("next_cursor") or ""
+
+def iter_history(channel: str, oldest: str=None, latest: str=None, limit: int=200, cursor: str=None):
+    """Yield (page messages, cursor for the next page) until the channel is exhausted."""
+    while True:
+        resp = fetch_history(channel, oldest=oldest, latest=latest, limit=limit, cursor=cursor)
+        cursor = next_cursor(resp)
+        yield resp.get("messages", []), cursor
+        if not cursor:
+            return
+
+def iter_thread(channel: str, parent_ts: str, limit: int=200):
+    """Yield every message of a thread, page by page (parent first)."""
+    cursor = None
+    while True:
+        resp = fetch_thread(channel, parent_ts, limit=limit, cursor=cursor)
+        yield from resp.get("messages", [])
+        cursor = next_cursor(resp)
+        if not cursor:
+            return
+    
 
-def fetch_thread(channel: str, parent_ts: str, limit: int=200):
-    return app.client.conversations.replies(channel=channel, ts=parent_ts, limit=limit)
-    
\ No newline at end of file
+def resolve_channels(names):
+    """id -> name for the given channel names, listing the workspace for any the app hasn't seen yet."""
+    from .persona_registry import CHANNEL_NAME_TO_ID, CHANNEL_ID_TO_NAME
+    if any(n not in CHANNEL_NAME_TO_ID for n in names):
+        cursor = None
+        while True:
+            resp = call_api("conversations.list", limit=200, cursor=cursor, types="public_channel,private_channel")
+            for ch in resp.get("channels", []):
+                CHANNEL_ID_TO_NAME[ch["id"]] = ch["name"]
+                CHANNEL_NAME_TO_ID[ch["name"]] = ch["id"]
+            cursor = next_cursor(resp)
+            if not cursor:
+                break
+    missing = [n for n in names if n not in CHANNEL_NAME_TO_ID]
+    if missing:
+        log.warning(f"[SLACK] Channels not in the workspace: {missing}")
+    return {CHANNEL_NAME_TO_ID[n]: n for n in names if n in CHANNEL_NAME_TO_ID}
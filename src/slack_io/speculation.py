@@ -0,0 +1,147 @@
+"""
+Speculative reply pre-generation (opt-in with SPECULATIVE_REPLIES=1).
+
+When a persona posts into an active thread, its own post comes back as the
+next event and the most likely responders are predictable. While the pool is
+otherwise idle, their replies are generated ahead of time and parked here,
+together with how many messages the thread had at the time. A parked reply
+is served instead of an LLM call only if it answers the same text and the
+thread has moved on by at most SPEC_MAX_DRIFT messages (sibling replies to the
+same post); anything else is discarded as stale, and its tokens are counted as
+wasted.
+"""
+import os, time, threading, hashlib, logging
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+from . import metrics
+from .priority import POOL
+
+logger = logging.getLogger(__name__)
+
+# knobs
+SPECULATIVE = os.getenv("SPECULATIVE_REPLIES", "0") == "1"
+SPEC_MIN_P_REPLY = 0.6      # only channels at least this likely to reply
+SPEC_TOP_K = 2              # responders pre-generated per post
+SPEC_TTL_S = 90             # parked replies older than this are stale
+SPEC_MAX_ENTRIES = 64
+SPEC_MAX_BUSY = 2           # speculate only while at most this many other pool jobs are ready/running
+SPEC_MAX_DRIFT = 2          # newer messages a parked reply tolerates before it is stale
+
+
+def _text_key(text: str) -> str:
+    return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
+
+
+def _tokens(result: Dict) -> int:
+    usage = result.get("usage") or {}
+    return (usage.get("prompt_tokens") or 0) + (usage.get("completion_tokens") or 0)
+
+
+class Speculator:
+    def __init__(self, enabled: bool = SPECULATIVE, ttl_s: float = SPEC_TTL_S, max_entries: int = SPEC_MAX_ENTRIES):
+        self.enabled = enabled
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()  # (persona, thread_ts, text key) -> entry
+        self._inflight = set()
+        self._heads: Dict[str, tuple] = {}                        # thread_ts -> (newest message ts, messages seen)
+        self._lock = threading.Lock()
+
+    def _discard(self, key: tuple, reason: str):
+        entry = self._entries.pop(key)
+        metrics.incr(f"speculation.discarded.{reason}")
+        metrics.incr("speculation.wasted_tokens", _tokens(entry["result"]))
+
+    def _position(self, thread_ts: str) -> int:
+        return self._heads.get(thread_ts, ("0", 0))[1]
+
+    def note_message(self, thread_ts: str, ts: str):
+        """A message landed in a thread; replies speculated too many messages ago go stale."""
+        with self._lock:
+            last_ts, seen = self._heads.get(thread_ts, ("0", 0))
+            if float(ts) <= float(last_ts):
+                return
+            self._heads[thread_ts] = (ts, seen + 1)
+            if len(self._heads) > self.max_entries * 4:
+                self._heads.pop(next(iter(self._heads)))
+            for key in [k for k, e in self._entries.items() if k[1] == thread_ts and seen + 1 - e["position"] > SPEC_MAX_DRIFT]:
+                self._discard(key, "stale")
+
+    def idle(self) -> bool:
+        return POOL.busy(ignore=("speculative",)) <= SPEC_MAX_BUSY
+
+    def speculate(self, persona: str, thread_ts: str, head_ts: str, event_text: str,
+                  generate: Callable[[Callable[[], bool]], Dict]) -> bool:
+        """Pre-generate persona's reply to event_text (posted at head_ts) in the background, if idle.
+
+        `generate(should_cancel)` runs the LLM call; should_cancel turns true as soon
+        as the thread drifts too far past head_ts.
+        """
+        if not self.enabled or not self.idle():
+            return False
+        key = (persona, thread_ts, _text_key(event_text))
+        with self._lock:
+            if key in self._inflight or key in self._entries:
+                return False
+            self._inflight.add(key)
+            position = self._position(thread_ts)
+
+        def stale() -> bool:
+            return self._position(thread_ts) - position > SPEC_MAX_DRIFT
+
+        def _run():
+            try:
+                if stale():
+                    metrics.incr("speculation.skipped")
+                    return
+                result = generate(stale)
+                metrics.incr("speculation.generated")
+                with self._lock:
+                    self._entries[key] = {"head": head_ts, "position": position, "result": result, "created": time.time()}
+                    if result.get("cancelled") or stale():
+                        self._discard(key, "stale")
+                    while len(self._entries) > self.max_entries:
+                        self._discard(next(iter(self._entries)), "evicted")
+            finally:
+                with self._lock:
+                    self._inflight.discard(key)
+
+        if POOL.submit("speculative", _run) is None:
+            with self._lock:
+                self._inflight.discard(key)
+            return False
+        return True
+
+    def take(self, persona: str, thread_ts: str, event_text: str) -> Optional[Dict]:
+        """Return a parked reply that is still valid for this thread and text, or None."""
+        if not self.enabled:
+            return None
+        key = (persona, thread_ts, _text_key(event_text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                metrics.incr("speculation.miss")
+                return None
+            if self._position(thread_ts) - entry["position"] > SPEC_MAX_DRIFT:
+                reason = "stale"
+            elif time.time() - entry["created"] > self.ttl_s:
+                reason = "expired"
+            else:
+                self._entries.pop(key)
+                metrics.incr("speculation.hit")
+                metrics.incr("speculation.saved_tokens", _tokens(entry["result"]))
+                return entry["result"]
+            self._discard(key, reason)
+            metrics.incr("speculation.miss")
+            return None
+
+    def stats(self) -> dict:
+        counters = metrics.snapshot()["counters"]
+        hits, misses = counters.get("speculation.hit", 0), counters.get("speculation.miss", 0)
+        out = {k[len("speculation."):]: v for k, v in counters.items() if k.startswith("speculation.")}
+        out["hit_rate"] = round(hits / (hits + misses), 3) if hits + misses else 0.0
+        with self._lock:
+            out["parked"] = len(self._entries)
+        return out
+
+SPECULATOR = Speculator()
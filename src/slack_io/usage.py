@@ -0,0 +1,235 @@
+"""
+LLM usage accounting and token budgets.
+
+Every completion is recorded with its persona, channel and producer (reply,
+proactive, speculation, autonomous, seed, backlog): prompt, completion and
+cached prompt tokens, latency and an estimated cost, aggregated per hour.
+A stream we hang up on early never gets its usage chunk: its prompt tokens are
+then estimated from the messages sent, and the request is counted under
+`estimated` so the totals say how much of them is a guess.
+Totals go to the metrics surface as they happen; finished hours are appended
+to USAGE_LOG as JSON lines (one per hour/persona/channel/producer) as soon as
+the next hour's first completion is recorded. At startup today's rows are read
+back, so a restart doesn't reset the day's spend.
+
+Budgets are daily token limits (UTC days) for the whole workspace
+(DAILY_TOKEN_BUDGET) and per channel (CHANNEL_TOKEN_BUDGETS, e.g.
+"eng-backend=200000,random=20000"). Past BUDGET_SOFT_FRAC of a budget,
+`budget_scale()` falls linearly from 1 to 0; the conductor multiplies p_reply
+and fan-out by it and the pacers cap autonomous cadence with it, so spending
+tapers off instead of stopping at a cliff. At 0 nothing new is generated.
+"""
+import os, json, time, atexit, threading, logging
+from typing import Dict, List, Optional
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_budgets(spec: str) -> Dict[str, int]:
+    out = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, tokens = part.partition("=")
+        out[name.strip().lstrip("#")] = int(tokens)
+    return out
+
+
+# knobs
+USAGE_LOG = os.getenv("USAGE_LOG", "data/usage.jsonl")              # hourly rollups ("" = off)
+USAGE_FLUSH_EVERY_S = 300
+DAILY_TOKEN_BUDGET = int(os.getenv("DAILY_TOKEN_BUDGET", "0"))       # 0 = unlimited
+CHANNEL_TOKEN_BUDGETS = _parse_budgets(os.getenv("CHANNEL_TOKEN_BUDGETS", ""))
+BUDGET_SOFT_FRAC = 0.8      # share of a budget after which activity is scaled down
+# USD per million tokens (defaults: gpt-4o-mini list prices)
+PROMPT_PRICE_PER_M = float(os.getenv("PROMPT_PRICE_PER_M", "0.15"))
+CACHED_PRICE_PER_M = float(os.getenv("CACHED_PRICE_PER_M", "0.075"))
+COMPLETION_PRICE_PER_M = float(os.getenv("COMPLETION_PRICE_PER_M", "0.60"))
+
+FIELDS = ("requests", "estimated", "prompt_tokens", "completion_tokens", "cached_tokens", "latency_s", "cost_usd")
+
+
+def cached_tokens(usage) -> Optional[int]:
+    """Cached prompt tokens from an OpenAI-style usage object (None if the backend doesn't report them)."""
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(details, dict):
+        return details.get("cached_tokens")
+    return getattr(details, "cached_tokens", None)
+
+
+def estimate_prompt_tokens(messages) -> int:
+    """Prompt tokens of chat messages by the stub provider's rule of thumb (~4 characters a token)."""
+    from .llm_provider import _approx_tokens
+    return sum(_approx_tokens(m.get("content") or "") for m in messages)
+
+
+def cost_usd(prompt: int, completion: int, cached: int) -> float:
+    return ((prompt - cached) * PROMPT_PRICE_PER_M + cached * CACHED_PRICE_PER_M
+            + completion * COMPLETION_PRICE_PER_M) / 1e6
+
+
+def _scale(used: float, budget: int) -> float:
+    if budget <= 0:
+        return 1.0
+    frac = used / budget
+    if frac <= BUDGET_SOFT_FRAC:
+        return 1.0
+    return max(0.0, (1.0 - frac) / (1.0 - BUDGET_SOFT_FRAC))
+
+
+class UsageLedger:
+    def __init__(self, log_path: str = USAGE_LOG, daily_budget: int = DAILY_TOKEN_BUDGET,
+                 channel_budgets: Optional[Dict[str, int]] = None):
+        self.log_path = log_path
+        self.daily_budget = daily_budget
+        self.channel_budgets = dict(CHANNEL_TOKEN_BUDGETS if channel_budgets is None else channel_budgets)
+        self._hours: Dict[tuple, Dict[str, float]] = {}    # (hour, persona, channel, producer) -> totals
+        self._hour = None                                   # hour of the latest record
+        self._day = None
+        self._day_tokens = 0
+        self._day_cost = 0.0
+        self._day_channel_tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _roll_day(self, now: float):
+        day = int(now // 86400)
+        if day != self._day:
+            self._day, self._day_tokens, self._day_cost = day, 0, 0.0
+            self._day_channel_tokens = {}
+
+    def load_today(self) -> int:
+        """Add today's rows from the usage log to the day totals (after a restart); returns rows read."""
+        if not self.log_path or not os.path.exists(self.log_path):
+            return 0
+        now = time.time()
+        rows = []
+        try:
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue  # torn line from a crash
+                    if int(row.get("hour", 0) // 86400) == int(now // 86400):
+                        rows.append(row)
+        except OSError as e:
+            logger.warning(f"[USAGE] Could not read {self.log_path}: {e}")
+            return 0
+        with self._lock:
+            self._roll_day(now)
+            for row in rows:
+                tokens = row.get("prompt_tokens", 0) + row.get("completion_tokens", 0)
+                self._day_tokens += tokens
+                self._day_cost += row.get("cost_usd", 0.0)
+                channel = row.get("channel")
+                self._day_channel_tokens[channel] = self._day_channel_tokens.get(channel, 0) + tokens
+        if rows:
+            logger.info(f"[USAGE] Resuming today's spend: {self._day_tokens} tokens from {len(rows)} rows")
+        return len(rows)
+
+    def record(self, persona: str, channel: str, producer: str, usage: Optional[Dict], latency_s: float = 0.0,
+               messages: Optional[List[Dict]] = None):
+        """Account one completion; `usage` is the dict generate_reply returns.
+
+        Missing prompt tokens are estimated from `messages`, and the request is marked as estimated
+        (as it is when usage["estimated"] is set); a missing completion count is 0.
+        """
+        usage = usage or {}
+        prompt = usage.get("prompt_tokens")
+        estimated = bool(usage.get("estimated")) or prompt is None
+        if prompt is None:
+            prompt = estimate_prompt_tokens(messages or [])
+        completion = usage.get("completion_tokens") or 0
+        cached = usage.get("cached_tokens") or 0
+        cost = cost_usd(prompt, completion, cached)
+        tokens = prompt + completion
+        now = time.time()
+        hour = int(now // 3600) * 3600
+        with self._lock:
+            # first record of a new hour: the previous ones are finished
+            rolled = self._hour is not None and hour > self._hour
+            self._hour = max(hour, self._hour or hour)
+            self._roll_day(now)
+            self._day_tokens += tokens
+            self._day_cost += cost
+            self._day_channel_tokens[channel] = self._day_channel_tokens.get(channel, 0) + tokens
+            row = self._hours.setdefault((hour, persona, channel, producer), dict.fromkeys(FIELDS, 0))
+            for k, v in (("requests", 1), ("estimated", int(estimated)), ("prompt_tokens", prompt), ("completion_tokens", completion),
+                         ("cached_tokens", cached), ("latency_s", latency_s), ("cost_usd", cost)):
+                row[k] += v
+            day_tokens, day_cost = self._day_tokens, self._day_cost
+        if rolled:
+            self.flush()
+        metrics.incr("llm.tokens.prompt", prompt)
+        metrics.incr("llm.tokens.cached", cached)
+        metrics.incr("llm.tokens.completion", completion)
+        if estimated:
+            metrics.incr("usage.estimated")
+        metrics.incr(f"usage.tokens.persona.{persona}", tokens)
+        metrics.incr(f"usage.tokens.channel.{channel}", tokens)
+        metrics.incr(f"usage.tokens.producer.{producer}", tokens)
+        metrics.gauge("usage.day_tokens", day_tokens)
+        metrics.gauge("usage.day_cost_usd", round(day_cost, 6))
+        metrics.gauge(f"usage.budget_scale.{channel}", self.budget_scale(channel))
+
+    def budget_scale(self, channel: Optional[str] = None) -> float:
+        """1.0 while under BUDGET_SOFT_FRAC of the day's budgets, falling to 0.0 when one is spent."""
+        with self._lock:
+            self._roll_day(time.time())
+            scale = _scale(self._day_tokens, self.daily_budget)
+            if channel in self.channel_budgets:
+                scale = min(scale, _scale(self._day_channel_tokens.get(channel, 0), self.channel_budgets[channel]))
+        return scale
+
+    def summary(self) -> Dict:
+        """Today's totals, budgets, and totals per persona/channel/producer since the last flush."""
+        with self._lock:
+            self._roll_day(time.time())
+            by = {"persona": {}, "channel": {}, "producer": {}}
+            for (_, persona, channel, producer), row in self._hours.items():
+                for dim, key in (("persona", persona), ("channel", channel), ("producer", producer)):
+                    agg = by[dim].setdefault(key, dict.fromkeys(FIELDS, 0))
+                    for k in FIELDS:
+                        agg[k] += row[k]
+            return {"day_tokens": self._day_tokens, "day_cost_usd": round(self._day_cost, 6),
+                    "daily_budget": self.daily_budget, "channel_budgets": dict(self.channel_budgets),
+                    "channel_day_tokens": dict(self._day_channel_tokens), **by}
+
+    def flush(self, everything: bool = False) -> int:
+        """Append finished hours (or all, e.g. at exit) to the usage log and drop them; returns rows written."""
+        current = int(time.time() // 3600) * 3600
+        with self._lock:
+            done = [k for k in self._hours if everything or k[0] < current]
+            rows = [dict(zip(("hour", "persona", "channel", "producer"), k), **self._hours.pop(k)) for k in done]
+        if not rows or not self.log_path:
+            return 0
+        for r in rows:
+            r["latency_s"] = round(r["latency_s"], 3)
+            r["cost_usd"] = round(r["cost_usd"], 6)
+        try:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(r) + "\n" for r in rows))
+        except OSError as e:
+            logger.warning(f"[USAGE] Could not write {self.log_path}: {e}")
+        return len(rows)
+
+    def tick(self):
+        """Periodic job: flush finished hours and log today's spend."""
+        self.flush()
+        s = self.summary()
+        budget = f"/{s['daily_budget']}" if s["daily_budget"] else ""
+        logger.info(f"[USAGE] today: {s['day_tokens']}{budget} tokens, ~${s['day_cost_usd']:.4f}; "
+                    f"scale={self.budget_scale():.2f}")
+
+
+LEDGER = UsageLedger()
+
+
+def start_usage_reporting(interval_s: float = USAGE_FLUSH_EVERY_S):
+    """Pick up today's logged spend, then flush and log usage periodically, and once more at exit."""
+    from .scheduler import SCHEDULER
+
+    LEDGER.load_today()
+    SCHEDULER.every("usage", interval_s, LEDGER.tick, first_delay=interval_s)
+    SCHEDULER.start()
+    atexit.register(LEDGER.flush, True)